@@ -43,7 +43,7 @@ setup(
     version = "0.8beta1",
     package_dir={'pyNN': 'src'},
     packages = ['pyNN','pyNN.nest', 'pyNN.pcsim', 'pyNN.neuron', 'pyNN.nineml',
-                'pyNN.brian','pyNN.nemo', 'pyNN.common', 'pyNN.mock',
+                'pyNN.brian','pyNN.nemo', 'pyNN.common', 'pyNN.mock', 'pyNN.numpy_sim',
                 'pyNN.recording', 'pyNN.standardmodels', 'pyNN.descriptions',
                 'pyNN.nest.standardmodels', 'pyNN.pcsim.standardmodels',
                 'pyNN.neuron.standardmodels', 'pyNN.brian.standardmodels',
@@ -53,7 +53,8 @@ Classes for creating, connecting, modifying and recording from neurons
                 GutigWeightDependence, SpikePairRule
                 (not all combinations area available for all simulator backends).
     Current injection: DCSource, ACSource, StepCurrentSource, NoisyCurrentSource.
-    File types: StandardTextFile, PickleFile, NumpyBinaryFile, HDF5ArrayFile
+    File types: StandardTextFile, PickleFile, NumpyBinaryFile, BinaryConnectionFile,
+                HDF5ArrayFile
 
 Available simulator modules:
     nest
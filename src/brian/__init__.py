@@ -7,7 +7,7 @@ Brian implementation of the PyNN API.
 
 import logging
 import brian
-from pyNN import common, space
+from pyNN import common, space, profiling
 from pyNN.connectors import *
 from . import simulator
 from .standardmodels.cells import *
@@ -50,10 +50,12 @@ def end(compatible_output=True):
         io = get_io(filename)
         population.write_data(io, variables)
     simulator.state.clear()
+    profiling.write_report()
     # should have common implementation of end()
 
 
 run, run_until = common.build_run(simulator)
+run_async = common.build_run_async(simulator, run_until)
 run_for = run
 
 reset = common.build_reset(simulator)
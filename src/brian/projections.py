@@ -81,7 +81,7 @@ class Projection(common.Projection):
                 self._brian_synapses[i][j] = syn_obj
                 simulator.state.network.add(syn_obj)
         # connect the populations
-        connector.connect(self)
+        self._make_connections()
         # special-case: the Tsodyks-Markram short-term plasticity model takes
         #               a parameter value from the post-synaptic response model
         if isinstance(self.synapse_type, TsodyksMarkramSynapse):
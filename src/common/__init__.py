@@ -17,8 +17,12 @@ Base classes to be sub-classed by individual backends:
     PopulationView
     Assembly
     Projection
+    ConnectionView
+    ArrayConnectionStore
     
 Function-factories to generate backend-specific API functions:
+    build_run()
+    build_run_async()
     build_reset()
     build_state_queries()
     build_create()
@@ -29,6 +33,9 @@ Common implementation of API functions:
     set()
     initialize()
 
+Callbacks for run():
+    PeriodicCallback
+
 Function skeletons to be extended by backends:
     setup()
     end()
@@ -45,6 +52,7 @@ Global constants:
 """
 
 from .populations import IDMixin, BasePopulation, Population, PopulationView, Assembly, is_conductance
-from .projections import Projection
+from .projections import Projection, ConnectionView, ArrayConnectionStore
 from .procedural_api import build_create, build_connect, set, build_record, initialize
-from .control import setup, end, build_run, build_reset, build_state_queries
+from .control import setup, end, build_run, build_run_async, build_reset, build_state_queries, \
+                     PeriodicCallback
@@ -6,12 +6,26 @@ This module contains:
   * partial implementations of API functions which can be reused by
     backend-specific implementations (in some cases only the docstring
     is intended to be reused)
-  * function factories for generating backend-specific API functions.
+  * function factories for generating backend-specific API functions
+  * the scheduler for run() callbacks.
 
 :copyright: Copyright 2006-2013 by the PyNN team, see AUTHORS.
 :license: CeCILL, see LICENSE for details.
 """
 
+import sys
+import time
+import heapq
+import math
+import itertools
+import threading
+from collections import namedtuple
+try:
+    import queue
+except ImportError:  # Python 2
+    import Queue as queue
+from pyNN import profiling
+
 DEFAULT_MAX_DELAY = 10.0
 DEFAULT_TIMESTEP = 0.1
 DEFAULT_MIN_DELAY = DEFAULT_TIMESTEP
@@ -30,6 +44,7 @@ class BaseState(object):
         self.t_start = 0
         self.write_on_end = [] # a list of (population, variable, filename) combinations that should be written to file on end()
         self.recorders = set([])
+        self.callback_statistics = {}  # time spent in each run() callback, see CallbackScheduler
 
 
 def setup(timestep=DEFAULT_TIMESTEP, min_delay=DEFAULT_MIN_DELAY,
@@ -41,7 +56,16 @@ def setup(timestep=DEFAULT_TIMESTEP, min_delay=DEFAULT_MIN_DELAY,
     `timestep`, `min_delay` and `max_delay` should all be in milliseconds.
 
     `extra_params` contains any keyword arguments that are required by a given
-    simulator but not by others.
+    simulator but not by others. The following are common to all simulators:
+
+    `profile`:
+        if True, measure the time spent in the different phases of building
+        and running the network, and print a report when `end()` is called.
+        If a filename, write the report to that file.
+    `profile_memory`:
+        if True, also measure the memory allocated in each phase, when
+        profiling. This is off by default, as it slows down the code being
+        timed.
     """
     invalid_extra_params = ('mindelay', 'maxdelay', 'dt')
     for param in invalid_extra_params:
@@ -52,6 +76,11 @@ def setup(timestep=DEFAULT_TIMESTEP, min_delay=DEFAULT_MIN_DELAY,
             raise Exception("min_delay has to be less than or equal to max_delay.")
         if min_delay < timestep:
             raise Exception("min_delay (%g) must be greater than timestep (%g)" % (min_delay, timestep))
+    if extra_params.get('profile'):
+        profiling.clear()
+        profile = extra_params['profile']
+        profiling.enable(track_memory=extra_params.get('profile_memory', False),
+                         filename=None if profile is True else profile)
 
 
 def end(compatible_output=True):
@@ -59,34 +88,194 @@ def end(compatible_output=True):
     raise NotImplementedError
 
 
+class PeriodicCallback(object):
+    """
+    A run() callback which calls `function(t)` every `interval` ms, starting
+    at `start` (by default, at the start of the run).
+
+    If `coalesce` is True, the simulation is not interrupted for this
+    callback: whenever the simulation stops for another callback, or at the
+    end of the run, the function is called once for each interval that has
+    elapsed, with the time at which each call was due. This is suitable for
+    callbacks which only analyse recorded data, and allows consecutive
+    intervals to be simulated with a single call to the simulator.
+    """
+
+    def __init__(self, function, interval, start=None, coalesce=False):
+        if interval <= 0:
+            raise ValueError("The interval of a periodic callback must be positive")
+        self.function = function
+        self.interval = float(interval)
+        self.start = start
+        self.coalesce = coalesce
+        self.name = getattr(function, "__name__", type(function).__name__)
+        self._next = None  # time of the next call, kept between runs
+
+    def _first_due(self, t):
+        """
+        Return the time of the first call at or after the current time `t`.
+        This continues the schedule of the previous run, if it was left at
+        most one interval ahead of `t` (i.e. unless the simulation has been
+        reset), otherwise it is given by `start` and `interval`.
+        """
+        if self._next is not None and self._next - self.interval <= t + 1e-9:
+            return self._next
+        if self.start is None or self.start >= t:
+            return t if self.start is None else self.start
+        return self.start + self.interval * math.ceil((t - self.start) / float(self.interval) - 1e-9)
+
+    def __call__(self, t):
+        # allows use as a plain callback
+        self.function(t)
+        return t + self.interval
+
+
+class CallbackScheduler(object):
+    """
+    Priority queue of the times at which run() callbacks are due.
+
+    Plain callbacks are callables which accept the current time as an argument
+    and return the next time they wish to be called. :class:`PeriodicCallback`
+    objects are called at fixed intervals, without drift. Callbacks due
+    within the same time step `dt` are called together.
+
+    The number of calls to each callback and the time spent in them are
+    accumulated in `statistics`, a dict of :class:`pyNN.profiling.PhaseStats`
+    objects keyed by callback name.
+    """
+
+    def __init__(self, dt, statistics=None):
+        self.dt = dt
+        self._events = []     # heap of (time, sequence number, callback) of the callbacks that stop the simulation
+        self._coalesced = []  # heap of the same for coalesced periodic callbacks
+        self._sequence = itertools.count()  # callbacks due at the same time are called in the order they were added
+        self.statistics = {} if statistics is None else statistics
+        self._callbacks = []  # every callback added, so that each is only added once
+
+    def __len__(self):
+        return len(self._events) + len(self._coalesced)
+
+    def add(self, callback, t):
+        """
+        Add `callback`, calling it at the current time `t` if it is due.
+        Adding a callback which has already been added has no effect.
+        """
+        if callback in self._callbacks:
+            return
+        self._callbacks.append(callback)
+        if isinstance(callback, PeriodicCallback):
+            due = callback._first_due(t)
+            if due <= t + 1e-9:
+                self._call(callback, t)
+                due += callback.interval
+            self._schedule(callback, due)
+        else:
+            self._schedule(callback, self._call(callback, t))
+
+    def next_stop(self):
+        """
+        Return the time of the next callback that requires the simulation to
+        stop, or None if there is no such callback.
+        """
+        if self._events:
+            return self._events[0][0]
+        return None
+
+    def pop_next_stop(self):
+        """
+        Remove and return the callbacks due at the time of the next stop,
+        collapsing those that are due within the same time step.
+        """
+        next, _, callback = heapq.heappop(self._events)
+        active_callbacks = [(next, callback)]
+        while self._events and self._events[0][0] - next < self.dt:
+            due, _, callback = heapq.heappop(self._events)
+            active_callbacks.append((due, callback))
+        return active_callbacks
+
+    def call(self, t, active_callbacks=()):
+        """
+        Call the coalesced callbacks due at or before the current time `t`,
+        then the `active_callbacks` (a list of (due time, callback) pairs, as
+        returned by `pop_next_stop()`), and schedule their next calls.
+        """
+        while self._coalesced and self._coalesced[0][0] <= t + 1e-9:
+            due, _, callback = heapq.heappop(self._coalesced)
+            self._call(callback, due)
+            self._schedule(callback, due + callback.interval)
+        for due, callback in active_callbacks:
+            if isinstance(callback, PeriodicCallback):
+                if due - t < self.dt:  # not if the run ended before it was due
+                    self._call(callback, t)
+                    due += callback.interval  # no drift
+                self._schedule(callback, due)
+            else:
+                self._schedule(callback, self._call(callback, t))
+
+    def _schedule(self, callback, t):
+        if isinstance(callback, PeriodicCallback):
+            callback._next = t  # so that the next run continues the schedule
+        if isinstance(callback, PeriodicCallback) and callback.coalesce:
+            queue = self._coalesced
+        else:
+            queue = self._events
+        heapq.heappush(queue, (t, next(self._sequence), callback))
+
+    def _call(self, callback, t):
+        if isinstance(callback, PeriodicCallback):
+            name, function = callback.name, callback.function
+        else:
+            name, function = getattr(callback, "__name__", type(callback).__name__), callback
+        stats = self.statistics.setdefault(name, profiling.PhaseStats())
+        start_time = time.time()
+        with profiling.span("callback: %s" % name):
+            result = function(t)
+        elapsed_time = time.time() - start_time
+        stats.count += 1
+        stats.total_time += elapsed_time
+        stats.self_time += elapsed_time
+        return result
+
+
 def build_run(simulator):
-    def run_until(time_point, callbacks=None):
+    def run_until(time_point, callbacks=None, scheduler=None):
         """
         Run the simulation until `time_point` (in ms).
         
         `callbacks` is an optional list of callables, each of which should
         accept the current time as an argument, and return the next time it
-        wishes to be called.
+        wishes to be called, or of :class:`PeriodicCallback` objects.
+
+        `scheduler` is an optional :class:`CallbackScheduler` to which the
+        callbacks are added, so that callbacks it already contains continue
+        their schedule rather than being called again at the current time.
         """
+        with profiling.span("run_until"):
+            return _run_until(time_point, callbacks, scheduler)
+    def _run_until(time_point, callbacks, scheduler):
         now = simulator.state.t
         if time_point - now < -simulator.state.dt/2.0:  # allow for floating point error
             raise ValueError("Time %g is in the past (current time %g)" % (time_point, now))
-        if callbacks:
-            callback_events = [(callback(simulator.state.t), callback)
-                               for callback in callbacks]
+        # recorders in streaming mode flush their data to disk at regular intervals
+        callbacks = list(callbacks or [])
+        callbacks.extend(recorder._stream_callback for recorder in simulator.state.recorders
+                         if recorder.streaming)
+        if callbacks or scheduler is not None:
+            if scheduler is None:
+                scheduler = CallbackScheduler(simulator.state.dt, simulator.state.callback_statistics)
+            for callback in callbacks:
+                scheduler.add(callback, now)
             while simulator.state.t + 1e-9 < time_point:
-                callback_events.sort(key=lambda cbe: cbe[0], reverse=True)
-                next, callback = callback_events.pop()
-                # collapse multiple events that happen within the same timestep
-                active_callbacks = [callback]
-                while len(callback_events) > 0 and\
-                        abs(next - callback_events[-1][0]) < simulator.state.dt:
-                    active_callbacks.append(callback_events.pop()[1])
-
-                next = min(next, time_point)
-                simulator.state.run_until(next)
-                callback_events.extend((callback(simulator.state.t), callback)
-                        for callback in active_callbacks)
+                next = scheduler.next_stop()
+                if next is None or next - time_point >= simulator.state.dt:
+                    # nothing intervenes before the end of the run, other than coalesced callbacks
+                    simulator.state.run_until(time_point)
+                    scheduler.call(simulator.state.t)
+                else:
+                    # collapse multiple events that happen within the same timestep
+                    active_callbacks = scheduler.pop_next_stop()
+                    simulator.state.run_until(min(next, time_point))
+                    scheduler.call(simulator.state.t, active_callbacks)
         else:
             simulator.state.run_until(time_point)
         return simulator.state.t
@@ -96,12 +285,132 @@ def build_run(simulator):
         
         `callbacks` is an optional list of callables, each of which should
         accept the current time as an argument, and return the next time it
-        wishes to be called.
+        wishes to be called, or of :class:`PeriodicCallback` objects.
         """
         return run_until(simulator.state.t + simtime, callbacks)
     return run, run_until
 
 
+Chunk = namedtuple("Chunk", ["t_start", "t_stop", "segments"])
+
+
+class AsyncRun(object):
+    """
+    Handle on a simulation running on a worker thread, returned by
+    `run_async()`.
+
+    Iterating over it yields a :class:`Chunk` for each completed chunk of the
+    simulation, containing the start and stop times and, for each recorded
+    population (keyed by the Population object), a list of Neo `Segment`
+    objects containing the data recorded during that chunk.
+    """
+    _sentinel = object()
+
+    def __init__(self, run_chunk, recorders, t_start, t_stop, chunk, max_pending,
+                 stop_streaming=()):
+        self._recorders = recorders
+        self._stop_streaming = stop_streaming  # recorders to switch out of streaming mode at the end
+        self._chunks = queue.Queue(maxsize=max_pending)
+        self._cancelled = threading.Event()
+        self._exc_info = None
+        self.t = t_start
+        self._thread = threading.Thread(target=self._run,
+                                        args=(run_chunk, t_start, t_stop, chunk),
+                                        name="pyNN.run_async")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self, run_chunk, t_start, t_stop, chunk):
+        try:
+            while t_start + 1e-9 < t_stop and not self._cancelled.is_set():
+                self.t = run_chunk(min(t_start + chunk, t_stop))
+                segments = {}
+                for recorder in self._recorders:
+                    if float(recorder._recording_start_time) + 1e-9 < self.t:  # not already flushed by a stream callback
+                        recorder.flush()
+                    segments[recorder.population] = recorder._flushed_segments
+                    recorder._flushed_segments = []
+                self._chunks.put(Chunk(t_start, self.t, segments))
+                t_start = self.t
+        except Exception:
+            self._exc_info = sys.exc_info()
+        finally:
+            for recorder in self._recorders:
+                recorder._flushed_segments = None
+            for recorder in self._stop_streaming:
+                recorder.stop_streaming()
+            self._chunks.put(self._sentinel)
+
+    def __iter__(self):
+        while True:
+            chunk = self._chunks.get()
+            if chunk is self._sentinel:
+                self._chunks.put(chunk)  # so that iterating again, or wait(), does not block
+                break
+            yield chunk
+        self._raise_worker_exception()
+
+    def _raise_worker_exception(self):
+        if self._exc_info is not None:
+            exc_info, self._exc_info = self._exc_info, None
+            if hasattr(exc_info[1], "with_traceback"):
+                raise exc_info[1].with_traceback(exc_info[2])
+            raise exc_info[1]
+
+    def done(self):
+        """Return True if the simulation has finished."""
+        return not self._thread.is_alive()
+
+    def cancel(self):
+        """Stop the simulation at the end of the current chunk."""
+        self._cancelled.set()
+
+    def wait(self):
+        """
+        Wait for the simulation to finish, discarding any chunks that have
+        not been consumed, and return the simulation time.
+        """
+        for chunk in self:
+            pass
+        self._thread.join()
+        return self.t
+
+
+def build_run_async(simulator, run_until):
+    def run_async(simtime, chunk, callbacks=None, max_pending=2):
+        """
+        Run the simulation for `simtime` ms on a worker thread, in chunks of
+        `chunk` ms, and return an :class:`AsyncRun` object. Iterating over this
+        yields the data recorded during each chunk as soon as it is complete,
+        while the next chunk is being simulated, for online analysis, writing
+        to file or plotting.
+
+        Each recorded population streams its data (see `Population.record()`)
+        during the run, so that `get_data()` returns all of the data once the
+        run has finished. Populations which were not already streaming are
+        switched back out of streaming mode at the end of the run.
+
+        At most `max_pending` completed chunks are held waiting to be
+        consumed, after which the simulation pauses. `callbacks` are scheduled
+        as for `run_until()`, across all the chunks. No other PyNN functions
+        should be called until the run has finished (see :meth:`AsyncRun.wait`).
+        """
+        if chunk <= 0:
+            raise ValueError("chunk must be positive")
+        recorders = [recorder for recorder in simulator.state.recorders if recorder.recorded]
+        not_streaming = [recorder for recorder in recorders if not recorder.streaming]
+        for recorder in not_streaming:
+            recorder.stream(chunk)
+        for recorder in recorders:
+            recorder._flushed_segments = []
+        t_start = simulator.state.t
+        scheduler = CallbackScheduler(simulator.state.dt, simulator.state.callback_statistics)
+        return AsyncRun(lambda t: run_until(t, callbacks, scheduler), recorders,
+                        t_start, t_start + simtime, chunk, max_pending,
+                        stop_streaming=not_streaming)
+    return run_async
+
+
 def build_reset(simulator):
     def reset(annotations={}):
         """
@@ -19,7 +19,7 @@ try:
 except NameError:
     basestring = str
     from functools import reduce
-from pyNN import random, recording, errors, standardmodels, core, space, descriptions
+from pyNN import random, recording, errors, standardmodels, core, space, descriptions, profiling
 from pyNN.models import BaseCellType
 from pyNN.parameters import ParameterSpace, LazyArray
 from pyNN.recording import files
@@ -274,31 +274,44 @@ class BasePopulation(object):
         else:
             return_list = True
         if isinstance(self.celltype, standardmodels.StandardCellType):
-            if any(name in self.celltype.computed_parameters() for name in parameter_names):
-                native_names = self.celltype.get_native_names() # need all parameters in order to calculate values
-            else:
-                native_names = self.celltype.get_native_names(*parameter_names)
+            # fetch only the native parameters needed to calculate the requested values
+            native_names = self.celltype.get_native_dependencies(*parameter_names)
             native_parameter_space = self._get_parameters(*native_names)
-            parameter_space = self.celltype.reverse_translate(native_parameter_space)
+            parameter_space = self.celltype.reverse_translate(native_parameter_space,
+                                                              names=parameter_names)
         else:
             parameter_space = self._get_parameters(*self.celltype.get_parameter_names())
-        parameter_space.evaluate(simplify=True) # what if parameter space is homogeneous on some nodes but not on others?
-
-        parameters = dict(parameter_space.items())
+        # what if parameter space is homogeneous on some nodes but not on others?
+        parameters = dict((name, parameter_space[name].evaluate(simplify=True))
+                          for name in parameter_names)
         if gather == True and self._simulator.state.num_processes > 1:
-            # seems inefficient to do it in a loop - should do as single operation
+            # numerical parameters are gathered as binary arrays, in a single
+            # operation, other values (e.g. Sequences) have to be pickled
+            local_ids = self.local_cells.astype(int)
+            numerical_names = []
+            columns = [local_ids]
+            for name in parameter_names:
+                values = parameters[name]
+                if numpy.asarray(values).dtype.kind in 'biuf':
+                    numerical_names.append(name)
+                    columns.append(values * numpy.ones(local_ids.size))
+            columns = recording.gather_arrays(columns)
+            idx = numpy.argsort(columns[0])
+            for name, values in zip(numerical_names, columns[1:]):
+                parameters[name] = values[idx]
             for name in parameter_names:
-                values = parameter_space[name]
-                all_values  = { self._simulator.state.mpi_rank: values.tolist() }
-                all_indices = { self._simulator.state.mpi_rank: self.local_cells.tolist() }
-                all_values  = recording.gather_dict(all_values)
-                all_indices = recording.gather_dict(all_indices)
-                if self._simulator.state.mpi_rank == 0:
-                    values  = reduce(operator.add, all_values.values())
-                    indices = reduce(operator.add, all_indices.values())
-                idx    = numpy.argsort(indices)
-                values = numpy.array(values)[idx]
-            parameters[name] = values
+                if name not in numerical_names:
+                    values = parameters[name]
+                    if not isinstance(values, numpy.ndarray):
+                        values = [values] * local_ids.size
+                    all_values  = { self._simulator.state.mpi_rank: (local_ids, list(values)) }
+                    all_values  = recording.gather_dict(all_values)
+                    if self._simulator.state.mpi_rank == 0:
+                        ranks   = sorted(all_values)
+                        indices = numpy.hstack([all_values[rank][0] for rank in ranks])
+                        values  = reduce(operator.add, [all_values[rank][1] for rank in ranks])
+                        values  = numpy.array(values)[numpy.argsort(indices)]
+                    parameters[name] = values
         values = [parameters[name] for name in parameter_names]
         if return_list:
             return values
@@ -330,7 +343,7 @@ class BasePopulation(object):
         """
         # TODO: add example using of function of (x,y,z) and Population.position_generator
         if (isinstance(self.celltype, standardmodels.StandardCellType)
-            and any(name in self.celltype.computed_parameters() for name in parameters)):
+            and set(parameters).intersection(self.celltype.computed_parameters())):
             # need to get existing parameter space of models so we can perform calculations
             native_names = self.celltype.get_native_names()
             parameter_space = self.celltype.reverse_translate(self._get_parameters(*native_names))
@@ -398,7 +411,8 @@ class BasePopulation(object):
         """Determine whether `variable` can be recorded from this population."""
         return self.celltype.can_record(variable)
 
-    def record(self, variables, to_file=None, sampling_interval=None):
+    def record(self, variables, to_file=None, sampling_interval=None,
+               stream_interval=None, stream_dir=None, max_in_memory=recording._DEFAULT):
         """
         Record the specified variable or variables for all cells in the
         Population or view.
@@ -412,6 +426,16 @@ class BasePopulation(object):
         
         `sampling_interval` should be a value in milliseconds, and an integer
         multiple of the simulation timestep.
+
+        If `stream_interval` (in ms) is given, recorded data are moved from the
+        simulator to an on-disk store at this interval during `run()`, and read
+        back by `get_data()` and `write_data()`. This limits memory use in long
+        simulations. The store is created under `stream_dir`, if given,
+        otherwise in a temporary directory.
+
+        `max_in_memory` is the number of segments completed by `reset()` that
+        are kept in memory; older segments are written to a temporary
+        directory. `None` keeps all segments in memory.
         """
         if variables is None: # reset the list of things to record
                               # note that if record(None) is called on a view of a population
@@ -423,6 +447,10 @@ class BasePopulation(object):
                 self.recorder.record(variables, self.all_cells, sampling_interval)
             else:
                 self.recorder.record(variables, self._record_filter, sampling_interval)
+        if stream_interval is not None:
+            self.recorder.stream(stream_interval, stream_dir)
+        if max_in_memory is not recording._DEFAULT:
+            self.recorder.cache.max_in_memory = max_in_memory
         if isinstance(to_file, basestring):
             self.recorder.file = to_file
 
@@ -594,6 +622,7 @@ class Population(BasePopulation):
     """
     _nPop = 0
 
+    @profiling.profiled("Population.__init__")
     def __init__(self, size, cellclass, cellparams=None, structure=None,
                  initial_values={}, label=None):
         """
@@ -636,7 +665,8 @@ class Population(BasePopulation):
         # Cells on the local node are represented as ID objects, other cells by integers
         # All are stored in a single numpy array for easy lookup by address
         # The local cells are also stored in a list, for easy iteration
-        self._create_cells()
+        with profiling.span("Population._create_cells"):
+            self._create_cells()
         self.first_id = self.all_cells[0]
         self.last_id = self.all_cells[-1]
         self.initial_values = {}
@@ -1182,7 +1212,8 @@ class Assembly(object):
     def rset(self, parametername, rand_distr):
         self.set(parametername=rand_distr)
 
-    def record(self, variables, to_file=None, sampling_interval=None):
+    def record(self, variables, to_file=None, sampling_interval=None,
+               stream_interval=None, stream_dir=None, max_in_memory=recording._DEFAULT):
         """
         Record the specified variable or variables for all cells in the Assembly.
 
@@ -1192,9 +1223,13 @@ class Assembly(object):
 
         If specified, `to_file` should be a Neo IO instance and `write_data()`
         will be automatically called when `end()` is called.
+
+        See `Population.record()` for the meaning of `sampling_interval`,
+        `stream_interval`, `stream_dir` and `max_in_memory`.
         """
         for p in self.populations:
-            p.record(variables, to_file, sampling_interval)
+            p.record(variables, to_file, sampling_interval, stream_interval,
+                     stream_dir, max_in_memory)
 
     @deprecated("record('v')")
     def record_v(self, to_file=True):
@@ -17,10 +17,10 @@ except NameError:
     xrange = range
 import numpy
 import logging
-import operator
 from copy import copy
-from pyNN import recording, errors, models, core, descriptions
+from pyNN import recording, errors, models, core, descriptions, profiling
 from pyNN.parameters import ParameterSpace, LazyArray
+from pyNN.random import RandomDistribution
 from pyNN.space import Space
 from pyNN.standardmodels import StandardSynapseType
 from .populations import BasePopulation, Assembly
@@ -95,6 +95,14 @@ class Projection(object):
                 self.label = "%s→%s" % (self.pre.label, self.post.label)
         Projection._nProj += 1
 
+    def _make_connections(self):
+        """
+        Create the connections using the connector. To be called by the
+        backend-specific `__init__()`, once it is ready to create connections.
+        """
+        with profiling.span("Connector.connect"):
+            self._connector.connect(self)
+
     def __len__(self):
         """Return the total number of local connections."""
         raise NotImplementedError
@@ -127,6 +135,33 @@ class Projection(object):
         for i in range(len(self)):
             yield self[i]
 
+    def _connect_block(self, presynaptic_indices, postsynaptic_indices,
+                       **connection_parameters):
+        """
+        Create the connections for a block of (pre, post) index pairs.
+
+        `presynaptic_indices` and `postsynaptic_indices` are 1D integer arrays
+        of the same length, in which all connections to a given post-synaptic
+        cell are contiguous. Each connection parameter is either a single value
+        or a 1D array of the same length.
+
+        This implementation calls `_convergent_connect()` once for each
+        post-synaptic cell. Backends that can create many connections in a
+        single call should override it.
+        """
+        boundaries = numpy.flatnonzero(numpy.diff(postsynaptic_indices)) + 1
+        starts = numpy.hstack(([0], boundaries))
+        stops = numpy.hstack((boundaries, [postsynaptic_indices.size]))
+        for start, stop in zip(starts, stops):
+            parameters = {}
+            for name, value in connection_parameters.items():
+                if isinstance(value, numpy.ndarray):
+                    value = value[start:stop]
+                parameters[name] = value
+            self._convergent_connect(presynaptic_indices[start:stop],
+                                     postsynaptic_indices[start],
+                                     **parameters)
+
     # --- Methods for setting connection parameters ---------------------------
 
     def set(self, **attributes):
@@ -219,7 +254,7 @@ class Projection(object):
             name of the attributes whose values are wanted, or a list of such
             names.
         `format`:
-            "list" or "array".
+            "list", "array", "arrays" or "sparse".
 
         With list format, returns a list of tuples. Each tuple contains the
         indices of the pre- and post-synaptic cell followed by the attribute
@@ -241,6 +276,24 @@ class Projection(object):
             >>> weights.shape
             TODO
 
+        With arrays format, returns a tuple of 1D NumPy arrays, one for each
+        name in `attribute_names`, each containing the values for all
+        connections, preceded, if `with_address` is True, by arrays containing
+        the indices of the pre- and post-synaptic cells. This contains the same
+        information as the list format, but is much more efficient for large
+        projections. Example::
+
+            >>> i, j, weights = prj.get("weight", format="arrays")
+
+        With sparse format, returns a tuple of sparse matrices, one for each
+        name in `attribute_names`, containing the same values as the array
+        format but without storing the non-existent connections. These are
+        :class:`scipy.sparse.csr_matrix` objects if SciPy is available,
+        otherwise :class:`pyNN.core.SparseMatrix` objects. Example::
+
+            >>> weights = prj.get("weight", format="sparse")
+            >>> weights.nnz
+
         TODO: document "with_address"
 
         Values will be expressed in the standard PyNN units (i.e. millivolts,
@@ -257,30 +310,39 @@ class Projection(object):
             names = list(attribute_names)
             if with_address:
                 names = ["presynaptic_index", "postsynaptic_index"] + names
-            values = self._get_attributes_as_list(*names)
             if gather and self._simulator.state.num_processes > 1:
-                all_values = { self._simulator.state.mpi_rank: values }
-                all_values = recording.gather_dict(all_values, all=(gather=='all'))
-                if gather == 'all' or self._simulator.state.mpi_rank == 0:
-                    values = reduce(operator.add, all_values.values())
+                columns = self._gather_columns(self._get_attributes_as_columns(*names), gather)
+                values = list(zip(*[column.tolist() for column in columns]))
+                if with_address:
+                    values = [(int(v[0]), int(v[1])) + v[2:] for v in values]
+            else:
+                values = self._get_attributes_as_list(*names)
             if not with_address and return_single:
                 values = [val[0] for val in values]
             return values
+        elif format == 'arrays':
+            names = list(attribute_names)
+            if with_address:
+                names = ["presynaptic_index", "postsynaptic_index"] + names
+            values = self._get_attributes_as_columns(*names)
+            if gather and self._simulator.state.num_processes > 1:
+                values = self._gather_columns(values, gather)
+            if with_address:
+                values[0] = values[0].astype(int)
+                values[1] = values[1].astype(int)
+            if not with_address and return_single:
+                return values[0]
+            return tuple(values)
         elif format == 'array':
             if gather and self._simulator.state.num_processes > 1:
                 # Node 0 is the only one creating a full connection matrix, and returning it (saving memory)
-                # Slaves nodes are returning list of connections, so this may be inconsistent...
+                # Slaves nodes are returning their columns of connection data, so this may be inconsistent...
                 names      = list(attribute_names)
                 names      = ["presynaptic_index", "postsynaptic_index"] + names
-                values     = self._get_attributes_as_list(*names)
-                all_values = { self._simulator.state.mpi_rank: values }
-                all_values = recording.gather_dict(all_values, all=(gather=='all'))
+                values     = self._get_attributes_as_columns(*names)
+                values     = self._gather_columns(values, gather)
                 if gather == 'all' or self._simulator.state.mpi_rank == 0:
-                    tmp_values = reduce(operator.add, all_values.values())
-                    values     = self._get_attributes_as_arrays(*attribute_names)
-                    tmp_values = numpy.array(tmp_values)
-                    for i in xrange(len(values)):
-                        values[i][tmp_values[:, 0].astype(int), tmp_values[:, 1].astype(int)] = tmp_values[:, 2+i]
+                    values = self._columns_to_arrays(values)
             else:
                 values = self._get_attributes_as_arrays(*attribute_names)
             if return_single:
@@ -289,27 +351,79 @@ class Projection(object):
                 return values[0]
             else:
                 return values
+        elif format == 'sparse':
+            names  = ["presynaptic_index", "postsynaptic_index"] + list(attribute_names)
+            values = self._get_attributes_as_columns(*names)
+            if gather and self._simulator.state.num_processes > 1:
+                values = self._gather_columns(values, gather)
+            rows, columns = values[0].astype(int), values[1].astype(int)
+            values = [core.sparse_matrix(value, rows, columns, self.shape)
+                      for value in values[2:]]
+            if return_single:
+                return values[0]
+            else:
+                return values
         else:
-            raise Exception("format must be 'list' or 'array'")
+            raise Exception("format must be 'list', 'array', 'arrays' or 'sparse'")
+
+    def _gather_columns(self, columns, gather):
+        """
+        Gather the arrays returned by `_get_attributes_as_columns()` from all
+        MPI nodes onto node 0 (or onto all nodes, if `gather` is 'all'). Other
+        nodes get their local columns back.
+        """
+        # indices are sent as floats, so that all nodes send the same types
+        # even if they have no connections
+        return recording.gather_arrays([numpy.asarray(column, dtype=float) for column in columns],
+                                       all=(gather=='all'))
 
     def _get_attributes_as_list(self, *names):
         return [c.as_tuple(*names) for c in self.connections]
 
+    def _get_attributes_as_columns(self, *names):
+        """
+        Return a list of 1D arrays, one for each name in `names`, containing
+        the values of that attribute for all local connections. Backends may
+        override this to obtain the values more efficiently.
+        """
+        values = numpy.array(self._get_attributes_as_list(*names), dtype=float)
+        if values.size == 0:
+            return [numpy.zeros((0,)) for name in names]
+        return [values[:, i] for i in range(len(names))]
+
     def _get_attributes_as_arrays(self, *names):
-        all_values = []
+        attribute_names = []
         for attribute_name in names:
-            values = numpy.nan * numpy.ones((self.pre.size, self.post.size))
             if attribute_name[-1] == "s":  # weights --> weight, delays --> delay
                 attribute_name = attribute_name[:-1]
-            for c in self.connections:
-                value = getattr(c, attribute_name)
-                addr = (c.presynaptic_index, c.postsynaptic_index)
-                if numpy.isnan(values[addr]):
-                    values[addr] = value
-                else:
-                    values[addr] += value   # addition is only appropriate for certain variables
-                                            # e.g. weight. Not appropriate for delays.
-                                            # What about synaptic parameters, e.g. wmax?
+            attribute_names.append(attribute_name)
+        columns = self._get_attributes_as_columns("presynaptic_index",
+                                                  "postsynaptic_index",
+                                                  *attribute_names)
+        return self._columns_to_arrays(columns)
+
+    def _columns_to_arrays(self, columns):
+        """
+        Given arrays of pre- and post-synaptic indices followed by arrays of
+        attribute values, return a list of 2D arrays, one per attribute, with
+        NaN for non-existent connections.
+        """
+        addr = (columns[0].astype(int), columns[1].astype(int))
+        exists = numpy.zeros((self.pre.size, self.post.size), dtype=bool)
+        exists[addr] = True
+        flat_addr = addr[0] * self.post.size + addr[1]
+        all_values = []
+        for column in columns[2:]:
+            # where there are multiple connections between the same pair of
+            # cells, the values are summed. This is only appropriate for certain
+            # variables, e.g. weight. Not appropriate for delays.
+            # What about synaptic parameters, e.g. wmax?
+            if flat_addr.size > 0:
+                values = numpy.bincount(flat_addr, weights=column, minlength=exists.size)
+                values = values.reshape(exists.shape)
+            else:
+                values = numpy.zeros(exists.shape)
+            values[~exists] = numpy.nan
             all_values.append(values)
         return all_values
 
@@ -403,3 +517,122 @@ class Projection(object):
         if self.synapse_type:
             context.update(plasticity=self.synapse_type.describe(template=None))
         return descriptions.render(engine, template, context)
+
+
+class ConnectionView(object):
+    """
+    Provide an interface that allows access to the weight and delay of a
+    single connection, whose data are held in arrays owned by a projection
+    using `ArrayConnectionStore`. Views are only created when a connection is
+    accessed individually.
+    """
+
+    def __init__(self, projection, i):
+        self.projection = projection
+        self.i = i
+
+    @property
+    def presynaptic_index(self):
+        return self.projection._connection_data['presynaptic_index'][self.i]
+
+    @property
+    def postsynaptic_index(self):
+        return self.projection._connection_data['postsynaptic_index'][self.i]
+
+    @property
+    def presynaptic_cell(self):
+        return self.projection.pre[self.presynaptic_index]
+
+    @property
+    def postsynaptic_cell(self):
+        return self.projection.post[self.postsynaptic_index]
+
+    def _set_weight(self, w):
+        self.projection._connection_data['weight'][self.i] = w
+
+    def _get_weight(self):
+        return self.projection._connection_data['weight'][self.i]
+
+    def _set_delay(self, d):
+        self.projection._connection_data['delay'][self.i] = d
+
+    def _get_delay(self):
+        return self.projection._connection_data['delay'][self.i]
+
+    weight = property(_get_weight, _set_weight)
+    delay = property(_get_delay, _set_delay)
+
+    def as_tuple(self, *attribute_names):
+        return tuple(getattr(self, name) for name in attribute_names)
+
+
+class ArrayConnectionStore(object):
+    """
+    Mixin for Projection classes which hold the indices, weights and delays of
+    static connections in NumPy arrays, rather than in an object for each
+    connection. Sub-classes must set `self._connection_chunks = []` before
+    creating any connections.
+    """
+    _connection_names = ('presynaptic_index', 'postsynaptic_index', 'weight', 'delay')
+
+    @property
+    def _connection_data(self):
+        """
+        Dict of arrays containing the pre- and post-synaptic indices, weights
+        and delays of all connections held in arrays.
+        """
+        if len(self._connection_chunks) != 1:
+            if self._connection_chunks:
+                data = dict((name, numpy.hstack([chunk[name] for chunk in self._connection_chunks]))
+                            for name in self._connection_names)
+            else:
+                data = {'presynaptic_index': numpy.zeros((0,), dtype=int),
+                        'postsynaptic_index': numpy.zeros((0,), dtype=int),
+                        'weight': numpy.zeros((0,)),
+                        'delay': numpy.zeros((0,))}
+            self._connection_chunks = [data]
+        return self._connection_chunks[0]
+
+    def _store_connections(self, presynaptic_indices, postsynaptic_indices,
+                           weight, delay):
+        """
+        Append connections to the arrays. `weight` and `delay` may be single
+        values or 1D arrays of the same length as the indices. Return the dict
+        of arrays for the new connections.
+        """
+        presynaptic_indices = numpy.asarray(presynaptic_indices, dtype=int)
+        n = presynaptic_indices.size
+        chunk = {'presynaptic_index': presynaptic_indices,
+                 'postsynaptic_index': numpy.asarray(postsynaptic_indices, dtype=int),
+                 'weight': weight * numpy.ones(n),
+                 'delay': delay * numpy.ones(n)}
+        self._connection_chunks.append(chunk)
+        return chunk
+
+    def _set_array_attributes(self, parameter_space):
+        """
+        Set connection attributes in the arrays, evaluating the parameters only
+        at the addresses of existing connections. Return a dict containing the
+        new arrays of values.
+        """
+        data = self._connection_data
+        addresses = (data['presynaptic_index'], data['postsynaptic_index'])
+        new_values = {}
+        for name, value in parameter_space.items():
+            if value.is_homogeneous:
+                values = value.evaluate(simplify=True) * numpy.ones(addresses[0].size)
+            else:
+                if isinstance(value.base_value, RandomDistribution) and value.base_value.rng.parallel_safe:
+                    value = value.evaluate()  # can't partially evaluate if using parallel safe
+                values = value[addresses]
+            data[name][:] = values
+            new_values[name] = data[name]
+        return new_values
+
+    def _get_array_attributes_as_columns(self, *names):
+        data = self._connection_data
+        return [data[name].astype(float) for name in names]
+
+    def _get_array_attributes_as_list(self, *names):
+        data = self._connection_data
+        return list(zip(*[data[name].tolist() for name in names]))
@@ -12,7 +12,7 @@ from __future__ import division
 from pyNN.random import RandomDistribution, AbstractRNG, NumpyRNG, get_mpi_config
 from pyNN.common.populations import is_conductance
 from pyNN.core import IndexBasedExpression
-from pyNN import errors, descriptions
+from pyNN import errors, descriptions, profiling
 from pyNN.recording import files
 from pyNN.parameters import LazyArray
 from pyNN.standardmodels import StandardSynapseType
@@ -26,7 +26,9 @@ try:
 except NameError:
     basestring = str
 from itertools import repeat
+from functools import partial
 import logging
+import os
 from copy import copy, deepcopy
 
 from lazyarray import arccos, arcsin, arctan, arctan2, ceil, cos, cosh, exp, \
@@ -52,6 +54,48 @@ def _get_rng(rng):
         raise Exception("rng must be either None, or a subclass of pyNN.random.AbstractRNG")
 
 
+def _batches(sizes, max_elements):
+    """
+    Split a sequence of sample sizes into consecutive slices, each with a total
+    size of no more than `max_elements` (or containing a single sample).
+    """
+    ends = numpy.cumsum(sizes)
+    start = 0
+    while start < len(sizes):
+        offset = ends[start - 1] if start > 0 else 0
+        stop = max(start + 1, numpy.searchsorted(ends, offset + max_elements, side='right'))
+        yield slice(start, stop)
+        start = stop
+
+
+def _sample_without_replacement(rng, population_size, sample_sizes):
+    """
+    For each value in `sample_sizes`, draw a random subset of that size from
+    ``range(population_size)``. Returns a list of arrays.
+
+    The subsets are drawn together: all candidates are drawn as random
+    integers, then those which duplicate an earlier candidate in the same
+    subset are redrawn, for all subsets at once, until no duplicates remain.
+    This is efficient when the sample sizes are no more than about half the
+    population size. The random numbers consumed depend only on
+    `sample_sizes`, not on the MPI node.
+    """
+    sample_sizes = numpy.asarray(sample_sizes, dtype=int)
+    owner = numpy.repeat(numpy.arange(sample_sizes.size), sample_sizes)
+    values = rng.next(owner.size, 'uniform_int', {"low": 0, "high": population_size},
+                      mask_local=False).astype(int)
+    while values.size > 1:
+        key = owner * population_size + values
+        order = numpy.argsort(key, kind='mergesort')  # stable, so the first occurrence is kept
+        sorted_key = key[order]
+        duplicates = order[1:][sorted_key[1:] == sorted_key[:-1]]
+        if duplicates.size == 0:
+            break
+        values[duplicates] = rng.next(duplicates.size, 'uniform_int',
+                                      {"low": 0, "high": population_size}, mask_local=False)
+    return numpy.split(values, numpy.cumsum(sample_sizes)[:-1])
+
+
 class Connector(object):
     """
     Base class for connectors.
@@ -140,8 +184,54 @@ class MapConnector(Connector):
     Abstract base class for Connectors based on connection maps, where a map is a 2D lazy array
     containing either the (boolean) connectivity matrix (aka adjacency matrix, connection set mask, etc.)
     or the values of a synaptic connection parameter.
+
+    By default, the connection map is evaluated, and connections created, one
+    post-synaptic cell (column) at a time. Setting the `column_block_size`
+    attribute to a value greater than one evaluates the connection map and
+    the synaptic parameters for that many columns at once, and passes all the
+    resulting connections to the projection in a single call to
+    `_connect_block()`. The random numbers drawn are the same in both modes.
+
+    Connectors which are able to do so may also produce the connection map
+    directly in sparse form, as arrays of (source, target) coordinates, so
+    that neither the connectivity matrix nor the synaptic parameters need to
+    be evaluated for pairs of cells which are not connected. This is enabled
+    by setting the `sparse` attribute to True, and also works block by block.
+    For `FixedProbabilityConnector`, the sparse mode uses a different
+    sampling method, and so creates different connections for a given seed.
     """
+    column_block_size = 1
+    sparse = False
 
+    def _get_column_block_size(self, projection):
+        """
+        Return the number of columns to be handled at once. Blocking is only
+        used if it cannot change the order in which random numbers are drawn
+        from any one RNG, i.e. if no RNG is shared between the connector and
+        the synaptic parameters, nor between two synaptic parameters.
+        """
+        block_size = self._requested_column_block_size(projection)
+        if block_size <= 1:
+            return 1
+        connector_rngs = set()
+        if hasattr(self, "rng"):
+            connector_rngs.add(id(self.rng))
+        if isinstance(getattr(self, "n", None), RandomDistribution):
+            connector_rngs.add(id(self.n.rng))
+        parameter_rngs = set()
+        for name, map in projection.synapse_type.native_parameters.items():
+            if isinstance(map.base_value, RandomDistribution):
+                rng_id = id(map.base_value.rng)
+                if rng_id in connector_rngs or rng_id in parameter_rngs:
+                    logger.debug("Shared RNG, connecting column by column.")
+                    return 1
+                parameter_rngs.add(rng_id)
+        return block_size
+
+    def _requested_column_block_size(self, projection):
+        return self.column_block_size
+
+    @profiling.profiled("MapConnector._standard_connect")
     def _standard_connect(self, projection, connection_map_generator, distance_map=None):
 
         column_indices = numpy.arange(projection.post.size)
@@ -167,6 +257,11 @@ class MapConnector(Connector):
 
         parameter_space = self._parameters_from_synapse_type(projection, distance_map)
 
+        block_size = self._get_column_block_size(projection)
+        if block_size > 1:
+            self._connect_by_block(projection, components, parameter_space, block_size)
+            return
+
         # Loop over columns of the connection_map array (equivalent to looping over post-synaptic neurons)
         for count, (col, local, source_mask) in enumerate(izip(*components)):
             # `col`: index of the post-synaptic neuron
@@ -210,10 +305,181 @@ class MapConnector(Connector):
                 if local:
                     # Connect the neurons
                     logger.debug("Connecting to %d from %s" % (col, source_mask))
-                    projection._convergent_connect(source_mask, col, **connection_parameters)
+                    with profiling.span("Projection._convergent_connect"):
+                        projection._convergent_connect(source_mask, col, **connection_parameters)
                     if self.callback:
                         self.callback(count/projection.post.local_size)
 
+    def _connect_by_block(self, projection, components, parameter_space, block_size):
+        """
+        Blocked version of the column loop in `_standard_connect()`.
+
+        The source indices for up to `block_size` columns are gathered into a
+        pair of (sources, targets) arrays, ordered column by column, so that the
+        synaptic parameter lazy arrays can be evaluated for the whole block at
+        once while drawing random numbers in the same order as the column loop.
+        """
+        all_sources = numpy.arange(projection.pre.size, dtype=int)
+
+        def connect_block(sources, targets, local):
+            if sources:
+                self._connect_coo_block(projection, parameter_space,
+                                        numpy.hstack(sources),
+                                        numpy.hstack(targets),
+                                        numpy.hstack(local))
+
+        sources, targets, local_flags = [], [], []
+        n_columns = n_local_columns = 0
+        for col, local, source_mask in izip(*components):
+            if not isinstance(source_mask, numpy.ndarray):  # a single boolean
+                source_mask = all_sources if source_mask else all_sources[:0]
+            elif source_mask.dtype == bool:
+                source_mask = source_mask.nonzero()[0]
+            if source_mask.size > 0:
+                sources.append(source_mask)
+                targets.append(numpy.repeat(col, source_mask.size))
+                local_flags.append(numpy.repeat(bool(local), source_mask.size))
+            n_columns += 1
+            if local:
+                n_local_columns += 1
+            if n_columns % block_size == 0:
+                connect_block(sources, targets, local_flags)
+                sources, targets, local_flags = [], [], []
+                if self.callback:
+                    self.callback(n_local_columns/projection.post.local_size)
+        connect_block(sources, targets, local_flags)
+        if self.callback:
+            self.callback(n_local_columns/projection.post.local_size)
+
+    def _connect_coo_block(self, projection, parameter_space, sources, targets, local):
+        """
+        Create the connections given in coordinate (COO) format by the arrays
+        `sources` and `targets`, ordered by target, evaluating the synaptic
+        parameter lazy arrays only at these coordinates. `local` is a boolean
+        array indicating which of the connections should be created on this
+        MPI node.
+        """
+        if sources.size == 0:
+            return
+        connection_parameters = {}
+        for name, map in parameter_space.items():
+            if map.is_homogeneous:
+                connection_parameters[name] = map.evaluate(simplify=True)
+            else:
+                value = map[sources, targets]
+                if not isinstance(value, numpy.ndarray) or value.shape != sources.shape:
+                    value = numpy.array([value])  # block containing a single connection
+                connection_parameters[name] = value[local]
+        sources = sources[local]
+        targets = targets[local]
+        if sources.size > 0:
+            logger.debug("Connecting block of %d connections" % sources.size)
+            with profiling.span("Projection._connect_block"):
+                projection._connect_block(sources, targets, **connection_parameters)
+
+    def _connect_sparse(self, projection, distance_map=None):
+        """
+        Create connections using the sparse representation of the connection
+        map produced by the connector's `_sparse_connection_map()` method,
+        which must generate, for successive blocks of post-synaptic cells, a
+        tuple `(columns, sources, targets)` giving the indices of the columns
+        in the block and the coordinates of the connections within it, ordered
+        by target.
+        """
+        logger.debug("Connecting %s using a sparse connection map" % projection.label)
+        if (projection.synapse_type.native_parameters.parallel_safe
+            or hasattr(self, "rng") and self.rng.parallel_safe):
+            # as for _standard_connect(), random numbers are drawn for all
+            # post-synaptic cells, and those for non-local cells thrown away
+            mask = None
+        else:
+            mask = projection.post._mask_local
+        parameter_space = self._parameters_from_synapse_type(projection, distance_map)
+        block_size = self._get_column_block_size(projection)
+        n_local_columns = 0
+        for columns, sources, targets in self._sparse_connection_map(projection, mask, block_size):
+            self._connect_coo_block(projection, parameter_space, sources, targets,
+                                    projection.post._mask_local[targets])
+            if self.callback:
+                n_local_columns += projection.post._mask_local[columns].sum()
+                self.callback(n_local_columns/projection.post.local_size)
+
+    def _sparse_connection_map(self, projection, mask, block_size):
+        raise NotImplementedError()
+
+    def _column_blocks(self, projection, mask, block_size):
+        """
+        Generate arrays containing the indices of up to `block_size`
+        post-synaptic cells, either all of them or only those selected by
+        `mask`.
+        """
+        columns = numpy.arange(projection.post.size)
+        if mask is not None:
+            columns = columns[mask]
+        for start in range(0, columns.size, block_size):
+            yield columns[start:start + block_size]
+
+    def _sparse_blocks_from_map(self, projection, connection_map, mask, block_size):
+        """
+        Generate the sparse representation of a boolean connection map,
+        evaluating it for `block_size` columns at a time.
+        """
+        shape = (projection.pre.size,)
+        for columns, values in connection_map.by_column_block(block_size, mask):
+            values = numpy.asarray(values, dtype=bool)
+            if values.shape != shape + columns.shape:
+                values = values * numpy.ones(shape + columns.shape, dtype=bool)
+            column_positions, sources = values.T.nonzero()
+            yield columns, sources, columns[column_positions]
+
+    def _sparse_blocks_from_coordinates(self, projection, sources, targets, mask, block_size):
+        """
+        Generate the sparse representation of a connection map given by the
+        coordinate arrays `sources` and `targets`, which must be sorted by
+        target, split into blocks of `block_size` columns.
+        """
+        for columns in self._column_blocks(projection, mask, block_size):
+            left = numpy.searchsorted(targets, columns[0], side='left')
+            right = numpy.searchsorted(targets, columns[-1], side='right')
+            block_sources, block_targets = sources[left:right], targets[left:right]
+            if mask is not None:  # the columns in the block may not be contiguous
+                in_block = numpy.in1d(block_targets, columns)
+                block_sources, block_targets = block_sources[in_block], block_targets[in_block]
+            yield columns, block_sources, block_targets
+
+    def _sparse_blocks_from_divergent(self, projection, connections, mask, block_size):
+        """
+        Generate the sparse representation of a connection map given by
+        `connections`, an iterable of `(sources, targets)` coordinate arrays
+        in order of increasing source, as produced by connectors which choose
+        the targets of each pre-synaptic cell. These connectors must draw the
+        targets of all pre-synaptic cells on every MPI node, so the result
+        does not depend on the number of nodes; each node keeps only the
+        connections to the columns it considers (those selected by `mask`,
+        or all of them).
+        """
+        kept_sources, kept_targets = [numpy.zeros((0,), dtype=int)], [numpy.zeros((0,), dtype=int)]
+        for sources, targets in connections:
+            if mask is not None:
+                keep = mask[targets]
+                sources, targets = sources[keep], targets[keep]
+            kept_sources.append(sources)
+            kept_targets.append(targets)
+        sources, targets = numpy.hstack(kept_sources), numpy.hstack(kept_targets)
+        order = numpy.argsort(targets, kind='mergesort')  # stable, so sources stay in order
+        return self._sparse_blocks_from_coordinates(projection, sources[order], targets[order],
+                                                    mask, block_size)
+
+    def _remove_self_connections(self, projection, sources, targets):
+        if projection.pre == projection.post:
+            if not self.allow_self_connections:
+                keep = sources != targets
+                return sources[keep], targets[keep]
+            elif self.allow_self_connections == 'NoMutual':
+                keep = sources > targets
+                return sources[keep], targets[keep]
+        return sources, targets
+
     def _connect_with_map(self, projection, connection_map, distance_map=None):
         """
         Create connections according to a connection map.
@@ -228,7 +494,10 @@ class MapConnector(Connector):
                 TODO
         """
         logger.debug("Connecting %s using a connection map" % projection.label)
-        self._standard_connect(projection, connection_map.by_column, distance_map)
+        block_size = self._get_column_block_size(projection)
+        self._standard_connect(projection,
+                               partial(connection_map.by_column, block_size=block_size),
+                               distance_map)
 
 
 class AllToAllConnector(MapConnector):
@@ -297,6 +566,9 @@ class FixedProbabilityConnector(MapConnector):
         self.rng = _get_rng(rng)
 
     def connect(self, projection):
+        if self.sparse:
+            self._connect_sparse(projection)
+            return
         random_map = LazyArray(RandomDistribution('uniform', (0, 1), rng=self.rng),
                                projection.shape)
         connection_map = random_map < self.p_connect
@@ -307,6 +579,47 @@ class FixedProbabilityConnector(MapConnector):
                 connection_map *= LazyArray(lambda i,j: i > j, shape=projection.shape)
         self._connect_with_map(projection, connection_map)
 
+    def _sparse_connection_map(self, projection, mask, block_size):
+        """
+        Generate the connections by geometric skip sampling: the gaps between
+        successive connections, counted in column-major order over all the
+        columns considered, are drawn from a geometric distribution, so the
+        cost is proportional to the number of connections rather than to the
+        number of possible connections. The connections obtained do not depend
+        on the block size.
+        """
+        n_rows = projection.pre.size
+        all_rows = numpy.arange(n_rows)
+        if self.p_connect < 1:
+            log_q = numpy.log1p(-self.p_connect)
+        start = 0               # linear index of the first element of the block
+        pending = numpy.zeros((0,), dtype=int)  # connections beyond the previous block
+        for columns in self._column_blocks(projection, mask, block_size):
+            end = start + n_rows * columns.size
+            if self.p_connect >= 1:
+                sources = numpy.tile(all_rows, columns.size)
+                targets = numpy.repeat(columns, n_rows)
+            elif self.p_connect == 0:
+                sources = targets = pending
+            else:
+                positions = [pending]
+                last = pending[-1] if pending.size else start - 1
+                while last < end:
+                    n_draws = int(1.1 * self.p_connect * (end - last)) + 10
+                    u = self.rng.next(n_draws, 'uniform', {'low': 0.0, 'high': 1.0},
+                                      mask_local=False)
+                    gaps = numpy.floor(numpy.log(1 - u) / log_q).astype(int) + 1
+                    positions.append(last + numpy.cumsum(gaps))
+                    last = positions[-1][-1]
+                positions = numpy.hstack(positions)
+                split = numpy.searchsorted(positions, end)
+                positions, pending = positions[:split], positions[split:]
+                column_positions, sources = divmod(positions - start, n_rows)
+                targets = columns[column_positions]
+            sources, targets = self._remove_self_connections(projection, sources, targets)
+            yield columns, sources, targets
+            start = end
+
 
 class DistanceDependentProbabilityConnector(MapConnector):
     """
@@ -324,11 +637,18 @@ class DistanceDependentProbabilityConnector(MapConnector):
             or only to other neurons in the Population.
         `rng`:
             an :class:`RNG` instance used to evaluate whether connections exist
+        `cutoff`:
+            if given, the distance beyond which `d_expression` is zero. Only
+            pairs of cells separated by at most this distance are then
+            considered, using a spatial index, so the cost of connecting grows
+            with the number of such pairs rather than with the total number of
+            pairs. One random number is drawn per pair within the cutoff, so
+            the connections differ from those made without a cutoff.
     """
-    parameter_names = ('allow_self_connections', 'd_expression')
+    parameter_names = ('allow_self_connections', 'd_expression', 'cutoff')
 
     def __init__(self, d_expression, allow_self_connections=True,
-                 rng=None, safe=True, callback=None):
+                 rng=None, safe=True, callback=None, cutoff=None):
         """
         Create a new connector.
         """
@@ -345,9 +665,20 @@ class DistanceDependentProbabilityConnector(MapConnector):
         self.allow_self_connections = allow_self_connections
         self.distance_function = eval("lambda d: %s" % self.d_expression)
         self.rng = _get_rng(rng)
+        if cutoff is not None:
+            assert cutoff > 0
+        self.cutoff = cutoff
 
     def connect(self, projection):
         distance_map = self._generate_distance_map(projection)
+        if self.sparse or self.cutoff is not None:
+            self._connect_sparse(projection, distance_map)
+        else:
+            self._connect_with_map(projection,
+                                   self._connection_map(projection, distance_map),
+                                   distance_map)
+
+    def _connection_map(self, projection, distance_map):
         probability_map = self.distance_function(distance_map)
         random_map = LazyArray(RandomDistribution('uniform', (0, 1), rng=self.rng),
                                projection.shape)
@@ -357,7 +688,28 @@ class DistanceDependentProbabilityConnector(MapConnector):
                 connection_map *= LazyArray(lambda i,j: i != j, shape=projection.shape)
             elif self.allow_self_connections == 'NoMutual':
                 connection_map *= LazyArray(lambda i,j: i > j, shape=projection.shape)
-        self._connect_with_map(projection, connection_map, distance_map)
+        return connection_map
+
+    def _sparse_connection_map(self, projection, mask, block_size):
+        if self.cutoff is not None:
+            return self._sparse_connection_map_within_cutoff(projection, mask, block_size)
+        connection_map = self._connection_map(projection,
+                                              self._generate_distance_map(projection))
+        return self._sparse_blocks_from_map(projection, connection_map, mask, block_size)
+
+    def _sparse_connection_map_within_cutoff(self, projection, mask, block_size):
+        index = projection.space.spatial_index(projection.pre.positions.T, self.cutoff)
+        post_positions = projection.post.positions.T
+        for columns in self._column_blocks(projection, mask, block_size):
+            sources, column_positions, d = index.query(post_positions[columns])
+            targets = columns[column_positions]
+            if sources.size > 0:
+                random_values = self.rng.next(sources.size, 'uniform', {'low': 0.0, 'high': 1.0},
+                                              mask_local=False)
+                connected = random_values < self.distance_function(d)
+                sources, targets = sources[connected], targets[connected]
+            sources, targets = self._remove_self_connections(projection, sources, targets)
+            yield columns, sources, targets
 
 
 class IndexBasedProbabilityConnector(MapConnector):
@@ -365,6 +717,13 @@ class IndexBasedProbabilityConnector(MapConnector):
     For each pair of pre-post cells, the connection probability depends on an arbitrary functions
     that takes the indices of the pre and post populations.
 
+    Where possible, the function is evaluated for blocks of columns at once,
+    i.e. it is called with 2D arrays of pre- and post-synaptic indices, so it
+    should be written using NumPy array operations. Functions which can only
+    be evaluated one column at a time (a 1D array of pre-synaptic indices and
+    a single post-synaptic index) are detected before connecting, and are then
+    evaluated column by column, as in earlier versions of PyNN.
+
     Takes any of the standard :class:`Connector` optional arguments and, in
     addition:
 
@@ -377,11 +736,20 @@ class IndexBasedProbabilityConnector(MapConnector):
             or only to other neurons in the Population.
         `rng`:
             an :class:`RNG` instance used to evaluate whether connections exist
+        `check_vectorized`:
+            if True (the default), check before connecting whether
+            `index_expression`, and any index-based synaptic parameters, can
+            be evaluated for blocks of columns, and fall back to column-wise
+            evaluation if not. An `InvalidParameterValueError` is raised if
+            they cannot even be evaluated for a single column. If False, the
+            expressions are assumed to be vectorized, and the check is skipped.
     """
     parameter_names = ('allow_self_connections', 'index_expression')
+    column_block_size = None  # chosen from the size of the presynaptic population
+    max_block_elements = 2**20
 
     def __init__(self, index_expression, allow_self_connections=True,
-                 rng=None, safe=True, callback=None):
+                 rng=None, safe=True, callback=None, check_vectorized=True):
         """
         Create a new connector.
         """
@@ -392,8 +760,48 @@ class IndexBasedProbabilityConnector(MapConnector):
         self.index_expression = index_expression
         self.allow_self_connections = allow_self_connections
         self.rng = _get_rng(rng)
+        self.check_vectorized = check_vectorized
+        self._vectorized = True
+
+    def _requested_column_block_size(self, projection):
+        if not self._vectorized:
+            return 1
+        if self.column_block_size is None:
+            return max(1, self.max_block_elements // max(projection.pre.size, 1))
+        return self.column_block_size
+
+    def _expressions_are_vectorized(self, projection):
+        """
+        Return True if `index_expression` and any index-based synaptic
+        parameters can be evaluated for blocks of columns, False if they can
+        only be evaluated column by column. Raises `InvalidParameterValueError`
+        if they cannot be evaluated at all.
+        """
+        expressions = [self.index_expression] + [
+            map.base_value for name, map in projection.synapse_type.native_parameters.items()
+            if isinstance(map.base_value, IndexBasedExpression)]
+        vectorized = True
+        for expression in expressions:
+            expression = copy(expression)
+            expression.projection = projection
+            try:
+                expression.check_vectorized(projection.shape)
+            except errors.InvalidParameterValueError as err:
+                expression.check_vectorized(projection.shape, blocks=False)
+                logger.warning("%s. Connecting column by column." % err)
+                vectorized = False
+        return vectorized
 
     def connect(self, projection):
+        self._vectorized = True
+        if self.check_vectorized:
+            self._vectorized = self._expressions_are_vectorized(projection)
+        if self.sparse and self._vectorized:
+            self._connect_sparse(projection)
+        else:
+            self._connect_with_map(projection, self._connection_map(projection))
+
+    def _connection_map(self, projection):
         # The index function is copied so as to avoid the connector being altered by the "connect"
         # function, which is probably unexpected behaviour.
         index_expression = copy(self.index_expression)
@@ -407,7 +815,11 @@ class IndexBasedProbabilityConnector(MapConnector):
                 connection_map *= LazyArray(lambda i,j: i != j, shape=projection.shape)
             elif self.allow_self_connections == 'NoMutual':
                 connection_map *= LazyArray(lambda i,j: i > j, shape=projection.shape)
-        self._connect_with_map(projection, connection_map)
+        return connection_map
+
+    def _sparse_connection_map(self, projection, mask, block_size):
+        return self._sparse_blocks_from_map(projection, self._connection_map(projection),
+                                            mask, block_size)
 
 
 class DisplacementDependentProbabilityConnector(IndexBasedProbabilityConnector):
@@ -423,16 +835,41 @@ class DisplacementDependentProbabilityConnector(IndexBasedProbabilityConnector):
                              (displacement) to a probability between 0 and 1
             """
             self._disp_function = disp_function
+            self._positions = None
+
+        @IndexBasedExpression.projection.setter
+        def projection(self, projection):
+            self._projection = projection
+            self._positions = None
 
         def __call__(self, i, j):
-            disp = (self.projection.post.positions.T[j] - self.projection.pre.positions.T[i]).T
-            return self._disp_function(disp)
+            # the positions are obtained once per projection, as they may need
+            # to be generated or copied
+            if self._positions is None:
+                self._positions = (self.projection.pre.positions,
+                                   self.projection.post.positions)
+            pre_positions, post_positions = self._positions
+            # i and j may be integers, or 1D or 2D arrays
+            if (numpy.ndim(i) == 2 and numpy.ndim(j) == 2
+                    and (i == i[:, :1]).all() and (j == j[:1, :]).all()):
+                # a block of columns: only one position per row and per column
+                # need be looked up, and the displacements are obtained by broadcasting
+                pre = pre_positions[:, i[:, 0]][:, :, numpy.newaxis]
+                post = post_positions[:, j[0, :]][:, numpy.newaxis, :]
+                return self._disp_function(post - pre)
+            pre, post = pre_positions[:, i], post_positions[:, j]
+            if pre.ndim < post.ndim:
+                pre = pre.reshape(pre.shape + (1,) * (post.ndim - pre.ndim))
+            elif post.ndim < pre.ndim:
+                post = post.reshape(post.shape + (1,) * (pre.ndim - post.ndim))
+            return self._disp_function(post - pre)
 
     def __init__(self, disp_function, allow_self_connections=True,
-                 rng=None, safe=True, callback=None):
+                 rng=None, safe=True, callback=None, check_vectorized=True):
         super(DisplacementDependentProbabilityConnector, self).__init__(
                 self.DisplacementExpression(disp_function),
-                allow_self_connections=allow_self_connections, rng=rng, callback=callback)
+                allow_self_connections=allow_self_connections, rng=rng, safe=safe,
+                callback=callback, check_vectorized=check_vectorized)
 
 
 class FromListConnector(Connector):
@@ -458,6 +895,7 @@ class FromListConnector(Connector):
             if True, display a progress bar on the terminal.
     """
     parameter_names = ('conn_list',)
+    block_size = 2**20  # approximate number of connections created at once
 
     def __init__(self, conn_list, column_names=None, safe=True, callback=None):
         """
@@ -480,48 +918,56 @@ class FromListConnector(Connector):
             if name not in synapse_parameter_names:
                 raise ValueError("%s is not a valid parameter for %s" % (
                                  name, projection.synapse_type.__class__.__name__))
+        if self.conn_list.size == 0:
+            return
         if numpy.any(self.conn_list[:, 0] >= projection.pre.size):
             raise errors.ConnectionError("source index out of range")
-        # need to do some profiling, to figure out the best way to do this:
-        #  - order of sorting/filtering by local
-        #  - use numpy.unique, or just do in1d(self.conn_list)?
-        idx = numpy.argsort(self.conn_list[:, 1])
-        targets = numpy.unique(self.conn_list[:, 1]).astype(numpy.int)
-        local = numpy.in1d(targets,
-                           numpy.arange(projection.post.size)[projection.post._mask_local],
-                           assume_unique=True)
-        local_targets = targets[local]
-        self.conn_list = self.conn_list[idx]
-        left  = numpy.searchsorted(self.conn_list[:, 1], local_targets, 'left')
-        right = numpy.searchsorted(self.conn_list[:, 1], local_targets, 'right')
-        logger.debug("idx = %s", idx)
-        logger.debug("targets = %s", targets)
-        logger.debug("local_targets = %s", local_targets)
-        logger.debug("conn_list (sorted by target) = \n%s", self.conn_list)
-        logger.debug("left = %s", left)
-        logger.debug("right = %s", right)
-
-        for tgt, l, r in zip(local_targets, left, right):
-            sources = self.conn_list[l:r, 0].astype(numpy.int)
+        # only the connections to local targets are kept, sorted by target
+        # (keeping the order of the list for a given target)
+        targets = self.conn_list[:, 1].astype(int)
+        in_range = (targets >= 0) & (targets < projection.post.size)
+        local = numpy.zeros(targets.shape, dtype=bool)
+        local[in_range] = projection.post._mask_local[targets[in_range]]
+        rows = local.nonzero()[0]
+        rows = rows[numpy.argsort(targets[rows], kind='mergesort')]
+        targets = targets[rows]
+        # the parameters are translated and the connections created for
+        # blocks of connections, each containing all the connections to
+        # a given target
+        cuts = numpy.searchsorted(targets, targets[self.block_size::self.block_size])
+        boundaries = numpy.unique(numpy.hstack(([0], cuts, [targets.size])))
+        logger.debug("Connecting %d connections in %d blocks", targets.size, boundaries.size - 1)
+        for start, stop in zip(boundaries[:-1], boundaries[1:]):
+            block = self.conn_list[rows[start:stop]]
             connection_parameters = deepcopy(projection.synapse_type.parameter_space)
-            connection_parameters.shape = (r-l,)
+            connection_parameters.shape = (stop - start,)
             for col, name in enumerate(self.column_names, 2):
-                connection_parameters.update(**{name: self.conn_list[l:r, col]})
+                connection_parameters.update(**{name: block[:, col]})
             if isinstance(projection.synapse_type, StandardSynapseType):
                 connection_parameters = projection.synapse_type.translate(
                                             connection_parameters)
             connection_parameters.evaluate()
-            projection._convergent_connect(sources, tgt, **connection_parameters)
+            with profiling.span("Projection._connect_block"):
+                projection._connect_block(block[:, 0].astype(int), targets[start:stop],
+                                          **connection_parameters)
+            if self.callback:
+                self.callback(stop/targets.size)
 
 
 class FromFileConnector(FromListConnector):
     """
     Make connections according to a list read from a file.
 
+    Each MPI node keeps only the connections to its own post-synaptic cells.
+    With a :class:`~pyNN.recording.files.BinaryConnectionFile`, only the parts
+    of the file containing these connections are read; text files are read in
+    chunks, so the whole list is never held in memory.
+
     Arguments:
         `file`:
             either an open file object or the filename of a file containing a
-            list of connections, in the format required by `FromListConnector`.
+            list of connections, in the format required by `FromListConnector`,
+            or a binary connection file.
         `distributed`:
             if this is True, then each node will read connections from a file
             called `filename.x`, where `x` is the MPI rank. This speeds up
@@ -540,7 +986,10 @@ class FromFileConnector(FromListConnector):
         """
         Connector.__init__(self, safe=safe, callback=callback)
         if isinstance(file, basestring):
-            file = files.StandardTextFile(file, mode='r')
+            if os.path.exists(file) and files.BinaryConnectionFile.is_connection_file(file):
+                file = files.BinaryConnectionFile(file, mode='rb')
+            else:
+                file = files.StandardTextFile(file, mode='r')
         self.file = file
         self.distributed = distributed
 
@@ -553,13 +1002,29 @@ class FromFileConnector(FromListConnector):
         for ignore in "ij":
             if ignore in self.column_names:
                 self.column_names.remove(ignore)
-        self.conn_list = self.file.read()
+        local_targets = numpy.arange(projection.post.size)[projection.post._mask_local]
+        if hasattr(self.file, "read_targets"):
+            self.conn_list = self.file.read_targets(local_targets)
+        elif hasattr(self.file, "read_chunks"):
+            self.conn_list = self._read_local_connections(projection)
+        else:
+            self.conn_list = self.file.read()
         FromListConnector.connect(self, projection)
 
+    def _read_local_connections(self, projection):
+        local_chunks = [numpy.zeros((0, len(self.column_names) + 2))]
+        for chunk in self.file.read_chunks():
+            targets = chunk[:, 1].astype(int)
+            if targets.size > 0 and (targets.min() < 0 or targets.max() >= projection.post.size):
+                raise errors.ConnectionError("target index out of range")
+            local_chunks.append(chunk[projection.post._mask_local[targets]])
+        return numpy.vstack(local_chunks)
+
 
 class FixedNumberConnector(MapConnector):
     # base class - should not be instantiated
     parameter_names = ('allow_self_connections', 'n')
+    max_batch_elements = 2**20  # maximum number of random cell indices drawn at once
 
     def __init__(self, n, allow_self_connections=True, with_replacement=False,
                  rng=None, safe=True, callback=None):
@@ -580,6 +1045,53 @@ class FixedNumberConnector(MapConnector):
             raise TypeError("n must be an integer or a RandomDistribution object")
         self.rng = _get_rng(rng)
 
+    def _get_num(self, size, mask=None):
+        # the number of connections for each of `size` cells, or for those selected by `mask`
+        if isinstance(self.n, int):
+            if mask is None:
+                n_cells = numpy.repeat(self.n, size)
+            else:
+                n_cells = numpy.repeat(self.n, mask.sum())
+        else:
+            if mask is None:
+                n_cells = self.n.next(size)
+            else:
+                if self.n.rng.parallel_safe:
+                    n_cells = self.n.next(size)[mask]
+                else:
+                    n_cells = self.n.next(mask.sum())
+        return numpy.asarray(n_cells, dtype=int)
+
+    def _draw_with_replacement(self, n_cells, size, exclude=None):
+        # for each value in `n_cells`, yield an array of that many cell indices
+        # less than `size`, optionally skipping the corresponding index in `exclude`
+        values = self.rng.next(n_cells.sum(), 'uniform_int', {"low": 0, "high": size},
+                               mask_local=False).astype(int)
+        for k, cells in enumerate(numpy.split(values, numpy.cumsum(n_cells)[:-1])):
+            if exclude is not None:
+                # `size` does not count the excluded cell, so indices at or
+                # above it are shifted up
+                cells[cells >= exclude[k]] += 1
+            yield cells
+
+    def _draw_without_replacement(self, n_cells, size, exclude=None):
+        # as _draw_with_replacement(), but where n > size, first all cells are
+        # connected one or more times, then the remainder are chosen randomly
+        all_cells = numpy.arange(size)
+        full_sets, remainder = n_cells // size, n_cells % size
+        # small subsets are drawn together, large ones by permutation
+        sparse = remainder <= size // 2
+        subsets = iter(_sample_without_replacement(self.rng, size, remainder[sparse]))
+        for k, (n_sets, n_random) in enumerate(zip(full_sets, remainder)):
+            if sparse[k]:
+                subset = next(subsets)
+            else:
+                subset = self.rng.permutation(all_cells)[:n_random]
+            cells = numpy.hstack([all_cells] * n_sets + [subset])
+            if exclude is not None:
+                cells[cells >= exclude[k]] += 1
+            yield cells
+
 
 class FixedNumberPostConnector(FixedNumberConnector):
     """
@@ -610,23 +1122,28 @@ class FixedNumberPostConnector(FixedNumberConnector):
     """
 
     def connect(self, projection):
-        raise NotImplementedError()   # the code below is not correct
-        assert self.rng.parallel_safe
-        # this is probably very inefficient, would be better to use
-        # divergent connect
-        shuffle = numpy.array([self.rng.permutation(numpy.arange(projection.post.size))
-                               for i in range(projection.pre.size)])
-        n = self.n
-        if hasattr(self, "rand_distr"):
-            n = self.rand_distr.next(projection.pre.size)
-        f_ij = lambda i,j: shuffle[:, j] < n
-        connection_map = LazyArray(f_ij, projection.shape)
-        if projection.pre == projection.post:
-            if not self.allow_self_connections:
-                connection_map *= LazyArray(lambda i,j: i != j, shape=projection.shape)
-            elif self.allow_self_connections == 'NoMutual':
-                connection_map *= LazyArray(lambda i,j: i > j, shape=projection.shape)
-        self._connect_with_map(projection, connection_map)
+        if projection._simulator.state.num_processes > 1 and not self.rng.parallel_safe:
+            raise NotImplementedError("FixedNumberPostConnector currently requires a parallel safe RNG.")
+        self._connect_sparse(projection)
+
+    def _sparse_connection_map(self, projection, mask, block_size):
+        if self.with_replacement:
+            draw = self._draw_with_replacement
+        else:
+            draw = self._draw_without_replacement
+        exclude_self = not self.allow_self_connections and projection.pre == projection.post
+        size = projection.post.size - int(exclude_self)
+        n_post = self._get_num(projection.pre.size)
+        all_sources = numpy.arange(projection.pre.size)
+
+        def divergent_connections():
+            for batch in _batches(n_post, self.max_batch_elements):
+                sources = all_sources[batch]
+                targets = list(draw(n_post[batch], size, sources if exclude_self else None))
+                yield numpy.repeat(sources, n_post[batch]), numpy.hstack(targets)
+
+        return self._sparse_blocks_from_divergent(projection, divergent_connections(),
+                                                  mask, block_size)
 
 
 class FixedNumberPreConnector(FixedNumberConnector):
@@ -657,95 +1174,25 @@ class FixedNumberPreConnector(FixedNumberConnector):
             are created.
     """
 
-    def _get_num_pre(self, size, mask=None):
-        if isinstance(self.n, int):
-            if mask is None:
-                n_pre = repeat(self.n, size)
-            else:
-                n_pre = repeat(self.n, mask.sum())
-        else:
-            if mask is None:
-                n_pre = self.n.next(size)
-            else:
-                if self.n.rng.parallel_safe:
-                    n_pre = self.n.next(size)[mask]
-                else:
-                    n_pre = self.n.next(mask.sum())
-        return n_pre
-
-    def _rng_uniform_int_exclude(self, n, size, exclude):
-        res = self.rng.next(n, 'uniform_int', {"low": 0, "high": size}, mask_local=False)
-        logger.debug("RNG0 res=%s" % res)
-        idx = numpy.where(res == exclude)[0]
-        logger.debug("RNG1 exclude=%d, res=%s idx=%s" % (exclude, res, idx))
-        while idx.size > 0:
-            redrawn = self.rng.next(idx.size, 'uniform_int', {"low": 0, "high": size}, mask_local=False)
-            res[idx] = redrawn
-            idx = idx[numpy.where(res == exclude)[0]]
-            logger.debug("RNG2 exclude=%d redrawn=%s res=%s idx=%s" % (exclude, redrawn, res, idx))
-        return res
-
     def connect(self, projection):
         if self.with_replacement:
-            if self.allow_self_connections or projection.pre != projection.post:
-                def build_source_masks(mask=None):
-                    n_pre = self._get_num_pre(projection.post.size, mask)
-                    for n in n_pre:
-                        sources = self.rng.next(n, 'uniform_int', {"low": 0, "high": projection.pre.size}, mask_local=False)
-                        assert sources.size == n
-                        yield sources
-            else:
-                def build_source_masks(mask=None):
-                    n_pre = self._get_num_pre(projection.post.size, mask)
-                    if self.rng.parallel_safe or mask is None:
-                        for i, n in enumerate(n_pre):
-                            sources = self._rng_uniform_int_exclude(n, projection.pre.size, i)
-                            assert sources.size == n
-                            yield sources
-                    else:
-                        # TODO: use mask to obtain indices i
-                        raise NotImplementedError("allow_self_connections=False currently requires a parallel safe RNG.")
+            draw = self._draw_with_replacement
         else:
-            if self.allow_self_connections or projection.pre != projection.post:
-                def build_source_masks(mask=None):
-                    # where n > projection.pre.size, first all pre-synaptic cells
-                    # are connected one or more times, then the remainder
-                    # are chosen randomly
-                    n_pre = self._get_num_pre(projection.post.size, mask)
-                    all_cells = numpy.arange(projection.pre.size)
-                    for n in n_pre:
-                        full_sets = n // projection.pre.size
-                        remainder = n % projection.pre.size
-                        source_sets = []
-                        if full_sets > 0:
-                            source_sets = [all_cells]*full_sets
-                        if remainder > 0:
-                            source_sets.append(self.rng.permutation(all_cells)[:remainder])
-                        sources = numpy.hstack(source_sets)
-                        assert sources.size == n
-                        yield sources
-            else:
-                def build_source_masks(mask=None):
-                    # where n > projection.pre.size, first all pre-synaptic cells
-                    # are connected one or more times, then the remainder
-                    # are chosen randomly
-                    n_pre = self._get_num_pre(projection.post.size, mask)
-                    all_cells = numpy.arange(projection.pre.size)
-                    if self.rng.parallel_safe or mask is None:
-                        for i, n in enumerate(n_pre):
-                            full_sets = n // (projection.pre.size - 1)
-                            remainder = n % (projection.pre.size - 1)
-                            allowed_cells = all_cells[all_cells != i]
-                            source_sets = []
-                            if full_sets > 0:
-                                source_sets = [allowed_cells]*full_sets
-                            if remainder > 0:
-                                source_sets.append(self.rng.permutation(allowed_cells)[:remainder])
-                            sources = numpy.hstack(source_sets)
-                            assert sources.size == n
-                            yield sources
-                    else:
-                        raise NotImplementedError("allow_self_connections=False currently requires a parallel safe RNG.")
+            draw = self._draw_without_replacement
+        exclude_self = not self.allow_self_connections and projection.pre == projection.post
+        size = projection.pre.size - int(exclude_self)
+
+        def build_source_masks(mask=None):
+            # the sources for many post-synaptic cells are drawn at once. If
+            # `mask` is None, this is done for all cells, including those on
+            # other MPI nodes, so the result does not depend on the number of nodes.
+            n_pre = self._get_num(projection.post.size, mask)
+            targets = numpy.arange(projection.post.size)
+            if mask is not None:
+                targets = targets[mask]
+            for batch in _batches(n_pre, self.max_batch_elements):
+                for sources in draw(n_pre[batch], size, targets[batch] if exclude_self else None):
+                    yield sources
 
         self._standard_connect(projection, build_source_masks)
 
@@ -762,14 +1209,28 @@ class OneToOneConnector(MapConnector):
 
     def connect(self, projection):
         """Connect-up a Projection."""
+        if self.sparse:
+            self._connect_sparse(projection)
+            return
         connection_map = LazyArray(lambda i,j: i == j, shape=projection.shape)
         self._connect_with_map(projection, connection_map)
 
+    def _sparse_connection_map(self, projection, mask, block_size):
+        for columns in self._column_blocks(projection, mask, block_size):
+            targets = columns[columns < projection.pre.size]
+            yield columns, targets, targets
+
 
-class SmallWorldConnector(Connector):
+class SmallWorldConnector(MapConnector):
     """
     Connect cells so as to create a small-world network.
 
+    Each pre-synaptic cell is first connected to the post-synaptic cells
+    within distance `degree` of it, then each of these connections is, with
+    probability `rewiring`, moved to a post-synaptic cell chosen at random
+    (Watts and Strogatz, 1998). A rewired connection may occasionally
+    duplicate an existing one.
+
     Takes any of the standard :class:`Connector` optional arguments and, in
     addition:
 
@@ -782,12 +1243,15 @@ class SmallWorldConnector(Connector):
             flag determines whether a neuron is allowed to connect to itself,
             or only to other neurons in the Population.
         `n_connections`:
-            if specified, the number of efferent synaptic connections per neuron.
+            if specified, the number of efferent synaptic connections per
+            neuron: each cell is connected locally only to the `n_connections`
+            closest cells within `degree`.
         `rng`:
             an :class:`RNG` instance used to evaluate which connections
             are created.
     """
     parameter_names = ('allow_self_connections', 'degree', 'rewiring', 'n_connections')
+    source_block_size = 1000  # number of pre-synaptic cells whose neighbours are found at once
 
     def __init__(self, degree, rewiring, allow_self_connections=True,
                  n_connections=None, rng=None, safe=True, callback=None):
@@ -797,6 +1261,7 @@ class SmallWorldConnector(Connector):
         Connector.__init__(self, safe, callback)
         assert 0 <= rewiring <= 1
         assert isinstance(allow_self_connections, bool) or allow_self_connections == 'NoMutual'
+        self.degree                 = degree
         self.rewiring               = rewiring
         self.d_expression           = "d < %g" % degree
         self.allow_self_connections = allow_self_connections
@@ -805,7 +1270,47 @@ class SmallWorldConnector(Connector):
 
     def connect(self, projection):
         """Connect-up a Projection."""
-        raise NotImplementedError
+        if projection._simulator.state.num_processes > 1 and not self.rng.parallel_safe:
+            raise NotImplementedError("SmallWorldConnector currently requires a parallel safe RNG.")
+        self._connect_sparse(projection)
+
+    def _sparse_connection_map(self, projection, mask, block_size):
+        # the neighbours of each pre-synaptic cell are found using a spatial
+        # index, so the dense distance matrix is never needed
+        index = projection.space.spatial_index(projection.post.positions.T, self.degree)
+        pre_positions = projection.pre.positions.T
+        exclude_self = not self.allow_self_connections and projection.pre == projection.post
+        n_choices = projection.post.size - int(exclude_self)
+
+        def divergent_connections():
+            for start in range(0, projection.pre.size, self.source_block_size):
+                targets, sources, d = index.query(pre_positions[start:start + self.source_block_size])
+                sources = sources + start
+                local = d < self.degree
+                targets, sources, d = targets[local], sources[local], d[local]
+                if exclude_self:
+                    local = sources != targets
+                    targets, sources, d = targets[local], sources[local], d[local]
+                if self.n_connections is not None:
+                    # keep the closest neighbours of each source
+                    order = numpy.lexsort((targets, d, sources))
+                    targets, sources = targets[order], sources[order]
+                    rank = numpy.arange(sources.size) - numpy.searchsorted(sources, sources)
+                    closest = rank < self.n_connections
+                    targets, sources = targets[closest], sources[closest]
+                rewired = self.rng.next(targets.size, 'uniform', {'low': 0.0, 'high': 1.0},
+                                        mask_local=False) < self.rewiring
+                if rewired.any():
+                    new_targets = self.rng.next(rewired.sum(), 'uniform_int',
+                                                {'low': 0, 'high': n_choices},
+                                                mask_local=False).astype(int)
+                    if exclude_self:
+                        new_targets[new_targets >= sources[rewired]] += 1
+                    targets[rewired] = new_targets
+                yield self._remove_self_connections(projection, sources, targets)
+
+        return self._sparse_blocks_from_divergent(projection, divergent_connections(),
+                                                  mask, block_size)
 
 
 class CSAConnector(MapConnector):
@@ -842,7 +1347,8 @@ class CSAConnector(MapConnector):
         if csa.arity(self.cset) == 2:
             # Connection-set with arity 2
             for (i, j, weight, delay) in c:
-                projection._convergent_connect([projection.pre[i]], projection.post[j], weight, delay)
+                with profiling.span("Projection._convergent_connect"):
+                    projection._convergent_connect([projection.pre[i]], projection.post[j], weight, delay)
         elif csa.arity(self.cset) == 0:
             # inefficient implementation as a starting point
             connection_map = numpy.zeros((projection.pre.size, projection.post.size), dtype=bool)
@@ -877,9 +1383,21 @@ class CloneConnector(MapConnector):
                                          .format(self.reference_projection.pre,
                                                  self.reference_projection.post,
                                                  projection.pre, projection.post))
-        connection_map = LazyArray(~numpy.isnan(self.reference_projection.get(['weight'], 'array',
-                                                                              gather='all')[0]))
-        self._connect_with_map(projection, connection_map)
+        self._connect_sparse(projection)
+
+    def _sparse_connection_map(self, projection, mask, block_size):
+        # the connectivity is obtained in sparse form, so as not to need a
+        # dense matrix for large projections
+        sources, targets = self.reference_projection.get('weight', format='arrays',
+                                                         gather='all')[:2]
+        order = numpy.lexsort((sources, targets))
+        sources, targets = sources[order], targets[order]
+        if sources.size > 1:  # multiple connections between the same cells are cloned once
+            first = numpy.ones(sources.size, dtype=bool)
+            first[1:] = (sources[1:] != sources[:-1]) | (targets[1:] != targets[:-1])
+            sources, targets = sources[first], targets[first]
+        return self._sparse_blocks_from_coordinates(projection, sources, targets,
+                                                    mask, block_size)
 
 
 class ArrayConnector(MapConnector):
@@ -898,9 +1416,18 @@ class ArrayConnector(MapConnector):
         self.array = array
 
     def connect(self, projection):
+        if self.sparse:
+            self._connect_sparse(projection)
+            return
         connection_map = LazyArray(self.array, projection.shape)
         self._connect_with_map(projection, connection_map)
 
+    def _sparse_connection_map(self, projection, mask, block_size):
+        # connections sorted by target, then by source
+        targets, sources = numpy.nonzero(numpy.asarray(self.array, dtype=bool).T)
+        return self._sparse_blocks_from_coordinates(projection, sources, targets,
+                                                    mask, block_size)
+
 
 class FixedTotalNumberConnector(FixedNumberConnector):
     # base class - should not be instantiated
@@ -961,7 +1488,8 @@ class FixedTotalNumberConnector(FixedNumberConnector):
                 else:
                     connection_parameters[name] = map[source_mask, col]
             
-            projection._convergent_connect(numpy.array([s_index]),t_index, **connection_parameters)
+            with profiling.span("Projection._convergent_connect"):
+                projection._convergent_connect(numpy.array([s_index]),t_index, **connection_parameters)
             num_conns_on_vp[rank] -=1
 
             
@@ -70,6 +70,64 @@ def ezip(*args):
         yield items[0], items[1:]
 
 
+def sparse_matrix(data, rows, columns, shape):
+    """
+    Return a sparse matrix with the given shape, containing the values `data`
+    at the coordinates given by `rows` and `columns`. Values with the same
+    coordinates are summed.
+
+    If SciPy is available, the matrix is a :class:`scipy.sparse.csr_matrix`,
+    otherwise it is a :class:`SparseMatrix`.
+    """
+    try:
+        from scipy.sparse import coo_matrix
+    except ImportError:
+        return SparseMatrix(data, rows, columns, shape)
+    return coo_matrix((data, (rows, columns)), shape=shape).tocsr()
+
+
+class SparseMatrix(object):
+    """
+    Minimal sparse matrix in coordinate format, used in place of the SciPy
+    sparse matrix classes when SciPy is not available. The non-zero elements
+    are given by the arrays `row`, `col` and `data`, sorted by row and then
+    by column.
+    """
+
+    def __init__(self, data, row, col, shape):
+        row = numpy.asarray(row, dtype=int)
+        col = numpy.asarray(col, dtype=int)
+        data = numpy.asarray(data)
+        order = numpy.lexsort((col, row))
+        row, col, data = row[order], col[order], data[order]
+        if row.size > 1:
+            first = numpy.ones(row.size, dtype=bool)
+            first[1:] = (row[1:] != row[:-1]) | (col[1:] != col[:-1])
+            starts = first.nonzero()[0]
+            data = numpy.add.reduceat(data, starts)
+            row, col = row[starts], col[starts]
+        self.row = row
+        self.col = col
+        self.data = data
+        self.shape = tuple(shape)
+
+    def __repr__(self):
+        return "<%dx%d SparseMatrix with %d stored elements>" % (self.shape + (self.nnz,))
+
+    @property
+    def nnz(self):
+        return self.data.size
+
+    def tocoo(self):
+        return self
+
+    def toarray(self):
+        """Return the matrix as a dense NumPy array."""
+        values = numpy.zeros(self.shape, dtype=self.data.dtype)
+        values[self.row, self.col] = self.data
+        return values
+
+
 class IndexBasedExpression(object):
     """
     Abstract base class for general expressions that use the cell indices and projection class to
@@ -89,3 +147,34 @@ class IndexBasedExpression(object):
 
     def __call__(self, i, j):
         raise NotImplementedError
+
+    def check_vectorized(self, shape, blocks=True):
+        """
+        Check that the expression accepts NumPy arrays of indices, as it is
+        evaluated for blocks of (i, j) pairs at once, and returns an array of
+        the same shape as the indices. `shape` is the shape of the projection.
+
+        If `blocks` is False, only check that the expression can be evaluated
+        for a single column, i.e. for a 1D array of presynaptic indices and a
+        single postsynaptic index.
+
+        Raises `InvalidParameterValueError` if this is not the case.
+        """
+        rows = numpy.arange(min(shape[0], 2))
+        columns = numpy.arange(min(shape[1], 3))
+        cases = [(rows, columns[0])]                           # a single column
+        if blocks:
+            block_i = numpy.repeat(rows[:, numpy.newaxis], columns.size, axis=1)
+            block_j = numpy.repeat(columns[numpy.newaxis, :], rows.size, axis=0)
+            cases.extend([(block_i, block_j),                  # a block of columns
+                          (block_i.flatten(), block_j.flatten())])  # a list of connections
+        for i, j in cases:
+            try:
+                value = self(i, j)
+            except Exception as err:
+                raise errors.InvalidParameterValueError(
+                    "%s cannot be evaluated for arrays of indices: %s" % (self.__class__.__name__, err))
+            if numpy.shape(value) != numpy.shape(i):
+                raise errors.InvalidParameterValueError(
+                    "%s returned a value of shape %s for indices of shape %s" % (
+                        self.__class__.__name__, numpy.shape(value), numpy.shape(i)))
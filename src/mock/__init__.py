@@ -9,7 +9,7 @@ really running simulations.
 """
 
 import logging
-from pyNN import common
+from pyNN import common, profiling
 from pyNN.connectors import *
 from pyNN.recording import *
 from . import simulator
@@ -40,9 +40,11 @@ def end(compatible_output=True):
         io = get_io(filename)
         population.write_data(io, variables)
     simulator.state.write_on_end = []
+    profiling.write_report()
     # should have common implementation of end()
 
 run, run_until = common.build_run(simulator)
+run_async = common.build_run_async(simulator, run_until)
 run_for = run
 
 reset = common.build_reset(simulator)
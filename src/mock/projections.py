@@ -1,3 +1,4 @@
+import numpy
 from itertools import repeat
 try:
     from itertools import izip
@@ -41,7 +42,7 @@ class Projection(common.Projection):
 
         ## Create connections
         self.connections = []
-        connector.connect(self)
+        self._make_connections()
 
     def __len__(self):
         return len(self.connections)
@@ -59,4 +60,16 @@ class Projection(common.Projection):
             other_attributes = dict(zip(connection_parameters.keys(), other))
             self.connections.append(
                 Connection(pre_idx, postsynaptic_index, **other_attributes)
+            )
+
+    def _connect_block(self, presynaptic_indices, postsynaptic_indices,
+                       **connection_parameters):
+        for name, value in connection_parameters.items():
+            if not isinstance(value, numpy.ndarray):
+                connection_parameters[name] = repeat(value)
+        names = list(connection_parameters.keys())
+        for pre_idx, other in ezip(presynaptic_indices, postsynaptic_indices,
+                                   *[connection_parameters[name] for name in names]):
+            self.connections.append(
+                Connection(pre_idx, other[0], **dict(zip(names, other[1:])))
             )
\ No newline at end of file
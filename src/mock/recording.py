@@ -17,6 +17,9 @@ class Recorder(recording.Recorder):
         n_samples = int(round(self._simulator.state.t/self._simulator.state.dt)) + 1
         return numpy.vstack((numpy.random.uniform(size=n_samples) for id in ids)).T
 
+    def _clear_simulator(self):
+        pass
+
     def _local_count(self, variable, filter_ids=None):
         N = {}
         if variable == 'spikes':
@@ -50,6 +50,7 @@ def end(compatible_output=True):
     moose.PyMooseBase.endSimulation()
 
 run, run_until = common.build_run(simulator)
+run_async = common.build_run_async(simulator, run_until)
 run_for = run
 
 reset = common.build_reset(simulator)
@@ -1,12 +1,17 @@
 """
 A small framework to make it easier to run the same model on multiple
-simulators.
+simulators, or for many different parameter values.
 
 :copyright: Copyright 2006-2013 by the PyNN team, see AUTHORS.
 :license: CeCILL, see LICENSE for details.
 """
 
-from multiprocessing import Process, Queue
+import os
+import io
+import hashlib
+import importlib
+import numpy
+from multiprocessing import Process, Queue, Pool
 
 def run_simulation(network_model, sim, parameters, input_queue, output_queue):
     """
@@ -87,3 +92,117 @@ class MultiSim(object):
         for sim_name in self.processes:
             self.task_queues[sim_name].put('STOP')
             self.processes[sim_name].join()
+
+
+# --- Parameter sweeps ---------------------------------------------------------
+
+_worker_sim = None  # the simulator module, imported once in each worker process
+
+
+def _init_worker(sim_name):
+    global _worker_sim
+    _worker_sim = importlib.import_module(sim_name)
+
+
+def _run_job(args):
+    """
+    Run a single job in a worker process, and return its key and its results
+    as the contents of a NumPy ``.npz`` file.
+    """
+    key, model, parameters, seed, setup_parameters = args
+    sim = _worker_sim
+    sim.setup(**setup_parameters)
+    try:
+        results = model(sim, parameters, seed)
+    finally:
+        sim.end()
+    buffer = io.BytesIO()
+    numpy.savez(buffer, **dict((name, numpy.asarray(value))
+                               for name, value in results.items()))
+    return key, buffer.getvalue()
+
+
+def _load_results(payload):
+    with numpy.load(io.BytesIO(payload)) as data:
+        return dict((name, data[name]) for name in data.files)
+
+
+def _canonical(obj):
+    """A representation of `obj` that does not depend on dict ordering."""
+    if isinstance(obj, dict):
+        return "{%s}" % ", ".join("%r: %s" % (k, _canonical(obj[k])) for k in sorted(obj))
+    elif isinstance(obj, (list, tuple)):
+        return "[%s]" % ", ".join(_canonical(item) for item in obj)
+    elif isinstance(obj, numpy.ndarray):
+        return "array(%s)" % _canonical(obj.tolist())
+    return repr(obj)
+
+
+class ParameterSweep(object):
+    """
+    Runs many small simulations, each defined by a (model, parameters, seed)
+    job, on a pool of worker processes. Each worker imports the simulator
+    module once and runs many jobs, calling `sim.setup()` and `sim.end()`
+    around each one.
+
+    A model is a function, defined at the top level of a module so that it can
+    be sent to the workers, with arguments `sim`, `parameters` and `seed`,
+    which builds and runs the network and returns a dict of NumPy arrays (or
+    of values that can be converted to arrays). The results are sent back in
+    the NumPy ``.npz`` format, rather than as pickled Neo objects.
+
+    If `checkpoint_dir` is given, the results of each job are also saved there
+    as they arrive, and jobs whose results are already present are not run
+    again, so that an incomplete sweep can be resumed.
+    """
+
+    def __init__(self, sim, processes=None, setup_parameters=None, checkpoint_dir=None):
+        """
+        Start `processes` worker processes (by default, one per CPU) for the
+        simulator `sim` (a module or module name). `setup_parameters` are passed
+        to `sim.setup()` at the start of each job.
+        """
+        sim_name = getattr(sim, "__name__", sim)
+        self.setup_parameters = setup_parameters or {}
+        self.checkpoint_dir = checkpoint_dir
+        if checkpoint_dir is not None and not os.path.exists(checkpoint_dir):
+            os.makedirs(checkpoint_dir)
+        self.pool = Pool(processes, initializer=_init_worker, initargs=(sim_name,))
+
+    def job_key(self, model, parameters, seed):
+        """Return a string which identifies a job, used to name its checkpoint file."""
+        description = "%s.%s|%s|%r" % (model.__module__, model.__name__, _canonical(parameters), seed)
+        return hashlib.md5(description.encode("utf-8")).hexdigest()
+
+    def _checkpoint_file(self, key):
+        return os.path.join(self.checkpoint_dir, "%s.npz" % key)
+
+    def run(self, jobs):
+        """
+        Run each (model, parameters, seed) job in `jobs`. Returns an iterator
+        over (job, results) pairs, in the order in which the jobs finish (jobs
+        restored from the checkpoint directory come first).
+        """
+        pending = {}
+        for model, parameters, seed in jobs:
+            key = self.job_key(model, parameters, seed)
+            if self.checkpoint_dir is not None and os.path.exists(self._checkpoint_file(key)):
+                with open(self._checkpoint_file(key), "rb") as f:
+                    yield (model, parameters, seed), _load_results(f.read())
+            elif key not in pending:
+                pending[key] = (model, parameters, seed)
+        tasks = [(key, model, parameters, seed, self.setup_parameters)
+                 for key, (model, parameters, seed) in pending.items()]
+        for key, payload in self.pool.imap_unordered(_run_job, tasks):
+            if self.checkpoint_dir is not None:
+                # write to a temporary file first, so that an interrupted write is not mistaken for a result
+                tmp_file = self._checkpoint_file(key) + ".tmp"
+                with open(tmp_file, "wb") as f:
+                    f.write(payload)
+                os.rename(tmp_file, self._checkpoint_file(key))
+            yield pending[key], _load_results(payload)
+
+    def end(self):
+        """Stop the worker processes."""
+        self.pool.close()
+        self.pool.join()
@@ -15,7 +15,7 @@ except ImportError:
 import nest
 
 from . import simulator
-from pyNN import common, recording, errors, space, __doc__
+from pyNN import common, recording, errors, space, profiling, __doc__
 
 try:
     nest.GetStatus([numpy.int32(0)])
@@ -137,8 +137,10 @@ def end():
         shutil.rmtree(tempdir)
     simulator.state.tempdirs = []
     simulator.state.write_on_end = []
+    profiling.write_report()
 
 run, run_until = common.build_run(simulator)
+run_async = common.build_run_async(simulator, run_until)
 run_for = run
 
 reset = common.build_reset(simulator)
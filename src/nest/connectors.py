@@ -7,6 +7,8 @@ Connection method classes for nest
 """
 
 import logging
+import operator
+import numpy
 import nest
 try:
     import csa
@@ -27,9 +29,10 @@ from pyNN.connectors import Connector, \
                             FromListConnector, \
                             FromFileConnector, \
                             CloneConnector, \
-                            ArrayConnector
+                            ArrayConnector, \
+                            FixedTotalNumberConnector
 
-from .random import NativeRNG, NEST_RDEV_TYPES
+from .random import NativeRNG
 
 
 logger = logging.getLogger("PyNN")
@@ -94,128 +97,172 @@ else:
 
 
 class NESTConnectorMixin(object):
+    """
+    Creates connections with one of NEST's built-in connection rules, so that
+    they are generated in compiled code and in parallel across threads.
+
+    Connectors and synapse parameters which NEST cannot handle natively, e.g.
+    distance expressions or random numbers drawn from a PyNN (non-native) RNG,
+    fall back on the generic implementation.
+    """
+    # distributions for which multiplying the random variable by a positive
+    # factor is equivalent to multiplying these (NEST) parameters by it
+    scalable_distributions = {
+        'normal': ('mu', 'sigma'),
+        'normal_clipped': ('mu', 'sigma', 'low', 'high'),
+        'normal_clipped_to_boundary': ('mu', 'sigma', 'low', 'high'),
+        'uniform': ('low', 'high'),
+    }
+
+    def connect(self, projection):
+        """Connect-up a Projection."""
+        rule_params = self.rule_parameters(projection)
+        if rule_params is not None:
+            syn_params = self.synapse_parameters(projection)
+        if rule_params is None or syn_params is None:
+            logger.debug("%s: using the generic connection algorithm" % self.__class__.__name__)
+            super(NESTConnectorMixin, self).connect(projection)
+        else:
+            projection._connect(rule_params, syn_params)
+            if self.callback:
+                self.callback(1.0)
+
+    def rule_parameters(self, projection):
+        """
+        Return the parameters of the NEST connection rule equivalent to this
+        connector, or None if there is no equivalent rule.
+        """
+        return None
+
+    def _native_rng(self):
+        return isinstance(self.rng, random.NativeRNG)
+
+    def _autapses(self):
+        if isinstance(self.allow_self_connections, bool):
+            return self.allow_self_connections
+        return None  # 'NoMutual' has no equivalent in NEST
+
+    def _native_distribution(self, value, scale=1.0):
+        """
+        Return the NEST parameters of a random distribution (lazy array `value`)
+        multiplied by `scale`, or None if it cannot be drawn by NEST.
+        """
+        distribution = value.base_value
+        if not (isinstance(distribution.rng, random.NativeRNG)
+                and distribution.name in NativeRNG.translations):
+            return None
+        for f, arg in value.operations:  # e.g. unit conversion of the weights
+            if f is operator.mul and numpy.isscalar(arg):
+                scale *= arg
+            else:
+                return None
+        parameters = NativeRNG(distribution).parameters
+        if scale != 1:
+            if scale < 0 or distribution.name not in self.scalable_distributions:
+                return None
+            for name in self.scalable_distributions[distribution.name]:
+                if name in parameters:
+                    parameters[name] *= scale
+        return parameters
 
     def synapse_parameters(self, projection):
+        """
+        Return the synapse specification for nest.Connect(), or None if any
+        parameter cannot be handled by NEST, e.g. it is a function of distance.
+
+        Homogeneous values other than weights and delays are already the
+        defaults of the projection's synapse model.
+        """
+        post = projection.post
+        if not hasattr(post, "celltype"):
+            return None
+        weight_scale = 1.0
+        if projection.receptor_type == 'inhibitory' and post.conductance_based:
+            weight_scale = -1.0  # NEST wants negative values for inhibitory weights, even if these are conductances
+        if hasattr(post.celltype, "receptor_scale"):  # needed for the Izhikevich model
+            weight_scale *= post.celltype.receptor_scale
         params = {'model': projection.nest_synapse_model}
-        parameter_space = self._parameters_from_synapse_type(projection, distance_map=None)
-        for name, value in parameter_space.items():
+        if not post.celltype.standard_receptor_type:
+            params['receptor_type'] = post.celltype.get_receptor_type(projection.receptor_type)
+        for name, value in projection.synapse_type.native_parameters.items():
             if name in ('tau_minus', 'dendritic_delay_fraction', 'w_min_always_zero_in_NEST'):
                 continue
-            if isinstance(value.base_value, random.RandomDistribution):     # Random Distribution specified
-                if value.base_value.name in NEST_RDEV_TYPES:
-                    logger.warning("Random values will be created inside NEST with NEST's own RNGs")
-                    params[name] = NativeRNG(value.base_value).parameters
-                else:
-                    value.shape = (projection.pre.size, projection.post.size)
-                    params[name] = value.evaluate()
-            else:                                             # explicit values given
-                if value.is_homogeneous:
-                    params[name] = value.evaluate(simplify=True)
-                elif value.shape:
-                    params[name] = value.evaluate().flatten()    # If parameter is given as an array or function
-                else:
-                    value.shape = (1, 1)
-                    params[name] = float(value.evaluate())  # If parameter is given as a single number. Checking of the dimensions should be done in NEST
-                if name == "weight" and projection.receptor_type == 'inhibitory' and self.post.conductance_based:
-                    params[name] *= -1  # NEST wants negative values for inhibitory weights, even if these are conductances
+            scale = weight_scale if name == 'weight' else 1.0
+            if isinstance(value.base_value, random.RandomDistribution):
+                params[name] = self._native_distribution(value, scale)
+                if params[name] is None:
+                    return None
+            elif value.is_homogeneous:
+                if name in ('weight', 'delay'):
+                    value.shape = (1,)
+                    params[name] = scale * float(value.evaluate(simplify=True))
+            else:  # arrays and functions of distance or of cell indices
+                return None
         return params
 
 
-#class FixedProbabilityConnector():
-#
-#    def __init__(self, p_connect, allow_self_connections=True, with_replacement=True,
-#                 rng=None, safe=True, callback=None):
-#        self.allow_self_connections = allow_self_connections
-#        self.with_replacement = with_replacement
-#
-#        self.p_connect = float(p_connect)
-##        self.rng = _get_rng(rng)
-#
-#    def connect(self, projection):
-#        syn_params = projection.synapse_parameters()
-#        rule_params = {'autapses': self.allow_self_connections,
-#                       'multapses': self.with_replacement,
-#                       'rule': 'pairwise_bernoulli',
-#                       'p': self.p_connect}
-#        projection._connect(rule_params, syn_params)
-
-
-#class AllToAllConnector(AllToAllConnector, NESTConnectorMixin):
-#
-#    def connect(self, projection):
-#        syn_params = self.synapse_parameters(projection)
-#        rule_params = {'autapses': self.allow_self_connections,
-#                       'multapses': False,
-#                       'rule': 'all_to_all'}
-#
-#        projection._connect(rule_params, syn_params)
-
-
-#class OneToOneConnector():
-#
-#    def __init__(self, allow_self_connections=True, with_replacement=True, safe=True,
-#                 callback=None):
-#        self.allow_self_connections = allow_self_connections
-#        self.with_replacement = with_replacement
-#
-#    def connect(self, projection):
-#        syn_params = projection.synapse_parameters()
-#        rule_params = {'autapses': self.allow_self_connections,
-#                       'multapses': self.with_replacement,
-#                       'rule': 'one_to_one'}
-#
-#        projection._connect(rule_params, syn_params)
-#
-#
-#class FixedNumberPreConnector():
-#
-#    def __init__(self, n, allow_self_connections=True, with_replacement=True, safe=True,
-#                 callback=None, rng=None):
-#        self.allow_self_connections = allow_self_connections
-#        self.with_replacement = with_replacement
-#        self.n = n
-#
-#    def connect(self, projection):
-#        syn_params = projection.synapse_parameters()
-#        rule_params = {'autapses': self.allow_self_connections,
-#                       'multapses': self.with_replacement,
-#                       'rule': 'fixed_indegree',
-#                       'indegree': self.n }
-#
-#        projection._connect(rule_params, syn_params)
-#
-#
-#class FixedNumberPostConnector():
-#
-#    def __init__(self, n, allow_self_connections=True, with_replacement=True, safe=True,
-#                 callback=None, rng=None):
-#        self.allow_self_connections = allow_self_connections
-#        self.with_replacement = with_replacement
-#        self.n = n
-#
-#    def connect(self, projection):
-#        syn_params = projection.synapse_parameters()
-#        rule_params = {'autapses': self.allow_self_connections,
-#                       'multapses': self.with_replacement,
-#                       'rule': 'fixed_outdegree',
-#                       'outdegree': self.n }
-#
-#        projection._connect(rule_params, syn_params)
-#
-#
-#class FixedTotalNumberConnector():
-#
-#    def __init__(self, n, allow_self_connections=True, with_replacement=True, safe=True,
-#                 callback=None):
-#        self.allow_self_connections = allow_self_connections
-#        self.with_replacement = with_replacement
-#        self.n = n
-#
-#    def connect(self, projection):
-#        syn_params = projection.synapse_parameters()
-#        rule_params = {'autapses': self.allow_self_connections,
-#                       'multapses': self.with_replacement,
-#                       'rule': 'fixed_total_number',
-#                       'N': self.n
-#                   }
-#        projection._connect(rule_params, syn_params)
+class AllToAllConnector(NESTConnectorMixin, AllToAllConnector):
+    __doc__ = AllToAllConnector.__doc__
+
+    def rule_parameters(self, projection):
+        if self._autapses() is None:
+            return None
+        return {'rule': 'all_to_all',
+                'autapses': self._autapses(),
+                'multapses': False}
+
+
+class FixedProbabilityConnector(NESTConnectorMixin, FixedProbabilityConnector):
+    __doc__ = FixedProbabilityConnector.__doc__
+
+    def rule_parameters(self, projection):
+        if not self._native_rng() or self._autapses() is None:
+            return None
+        return {'rule': 'pairwise_bernoulli',
+                'autapses': self._autapses(),
+                'p': self.p_connect}
+
+
+class OneToOneConnector(NESTConnectorMixin, OneToOneConnector):
+    __doc__ = OneToOneConnector.__doc__
+
+    def rule_parameters(self, projection):
+        if projection.pre.size != projection.post.size:
+            return None
+        return {'rule': 'one_to_one'}
+
+
+class FixedNumberPreConnector(NESTConnectorMixin, FixedNumberPreConnector):
+    __doc__ = FixedNumberPreConnector.__doc__
+
+    def rule_parameters(self, projection):
+        if not (self._native_rng() and isinstance(self.n, int)) or self._autapses() is None:
+            return None
+        return {'rule': 'fixed_indegree',
+                'autapses': self._autapses(),
+                'multapses': self.with_replacement,
+                'indegree': self.n}
+
+
+class FixedNumberPostConnector(NESTConnectorMixin, FixedNumberPostConnector):
+    __doc__ = FixedNumberPostConnector.__doc__
+
+    def rule_parameters(self, projection):
+        if not (self._native_rng() and isinstance(self.n, int)) or self._autapses() is None:
+            return None
+        return {'rule': 'fixed_outdegree',
+                'autapses': self._autapses(),
+                'multapses': self.with_replacement,
+                'outdegree': self.n}
+
+
+class FixedTotalNumberConnector(NESTConnectorMixin, FixedTotalNumberConnector):
+    __doc__ = FixedTotalNumberConnector.__doc__
+
+    def rule_parameters(self, projection):
+        if not (self._native_rng() and isinstance(self.n, int)) or self._autapses() is None:
+            return None
+        return {'rule': 'fixed_total_number',
+                'autapses': self._autapses(),
+                'multapses': self.with_replacement,
+                'N': self.n}
@@ -45,6 +45,9 @@ class Projection(common.Projection):
         self.synapse_type._set_tau_minus(self.post.local_cells)
         self._sources = []
         self._connections = None
+        self._connection_handles = None
+        self._attribute_cache = {}
+        self._attribute_cache_run = None
         # This is used to keep track of common synapse properties (to my
         # knowledge they only become apparent once connections are created
         # within nest --obreitwi, 13-02-14)
@@ -52,7 +55,7 @@ class Projection(common.Projection):
         self._common_synapse_property_names = None
 
         # Create connections
-        connector.connect(self)
+        self._make_connections()
 
     def __getitem__(self, i):
         """Return the `i`th connection on the local MPI node."""
@@ -69,15 +72,72 @@ class Projection(common.Projection):
 
     def __len__(self):
         """Return the number of connections on the local MPI node."""
-        return nest.GetDefaults(self.nest_synapse_model)['num_connections']
+        return len(self.connections)
+
+    def __iter__(self):
+        """Return an iterator over all connections on the local MPI node."""
+        for i in range(len(self)):
+            yield simulator.Connection(self, i)
 
     @property
     def connections(self):
+        """
+        The NEST connection handles of the local connections. These are
+        retrieved once, after all connections have been created, and cached
+        together with an integer array of their components (source, target,
+        thread, synapse model id, port).
+        """
         if self._connections is None:
-            self._sources = numpy.unique(self._sources)
-            self._connections = nest.GetConnections(self._sources.tolist(), synapse_model=self.nest_synapse_model)
+            sources = numpy.unique(self._sources)
+            self._sources = sources.tolist()
+            self._connections = nest.GetConnections(self._sources, synapse_model=self.nest_synapse_model)
+            self._connection_handles = numpy.array(self._connections, dtype=int).reshape((-1, 5))
+            self._attribute_cache = {}
         return self._connections
 
+    def _get_connection_attributes(self, *names):
+        """
+        Return an array of values for each of the given NEST connection
+        attributes, for all local connections.
+
+        Values are fetched with a single call to NEST for all connections and
+        cached until they are changed from PyNN or the simulation advances.
+        """
+        connections = self.connections
+        if simulator.state.run_counter != self._attribute_cache_run:  # plastic synapses may have changed
+            self._attribute_cache = {}
+            self._attribute_cache_run = simulator.state.run_counter
+        missing = [name for name in names
+                   if name not in self._attribute_cache and name not in ('source', 'target')]
+        if missing:
+            values = numpy.array(nest.GetStatus(connections, missing), dtype=float).reshape((-1, len(missing)))
+            for i, name in enumerate(missing):
+                self._attribute_cache[name] = values[:, i]
+        columns = []
+        for name in names:
+            if name == 'source':
+                columns.append(self._connection_handles[:, 0])
+            elif name == 'target':
+                columns.append(self._connection_handles[:, 1])
+            else:
+                columns.append(self._attribute_cache[name])
+        return columns
+
+    def _set_connection_attribute(self, name, value, index=None):
+        """
+        Set a NEST connection attribute for all local connections, or only for
+        the connection with the given `index`, keeping the cache up-to-date.
+        """
+        # the str() is to work around a bug handling unicode names in SetStatus in NEST 2.4.1 when using Python 2
+        if index is None:
+            nest.SetStatus(self.connections, str(name), value)
+            if name in self._attribute_cache:
+                self._attribute_cache[name][:] = value
+        else:
+            nest.SetStatus([self.connections[index]], str(name), value)
+            if name in self._attribute_cache:
+                self._attribute_cache[name][index] = value
+
     def _set_tsodyks_params(self):
         if 'tsodyks' in self.nest_synapse_model:  # there should be a better way to do this. In particular, if the synaptic time constant is changed
                                             # after creating the Projection, tau_psc ought to be changed as well.
@@ -96,10 +156,18 @@ class Projection(common.Projection):
         Create connections by calling nest.Connect on the presynaptic and postsynaptic population
         with the parameters provided by params.
         """
-        nest.Connect(self.pre.all_cells.astype(int).tolist(),
-                     self.post.all_cells.astype(int).tolist(),
-                     rule_params, syn_params)
-        self._sources = [cid[0] for cid in nest.GetConnections(synapse_model=self.nest_synapse_model)]
+        presynaptic_cells = self.pre.all_cells.astype(int)
+        try:
+            nest.Connect(presynaptic_cells.tolist(),
+                         self.post.all_cells.astype(int).tolist(),
+                         rule_params, syn_params)
+        except nest.NESTError as e:
+            raise errors.ConnectionError("%s. rule=%s, synapse parameters=%s" % (e, rule_params, syn_params))
+        # Book-keeping: the presynaptic cells are enough to retrieve the
+        # connections later, so there is no need to query them from NEST here
+        self._connections = None
+        self._connection_handles = None
+        self._sources.extend(presynaptic_cells)
 
     def _convergent_connect(self, presynaptic_indices, postsynaptic_index,
                             **connection_parameters):
@@ -150,6 +218,7 @@ class Projection(common.Projection):
 
         # Book-keeping
         self._connections = None  # reset the caching of the connection list, since this will have to be recalculated
+        self._connection_handles = None
         self._sources.extend(presynaptic_cells)
 
         # Clean the connection parameters
@@ -186,37 +255,37 @@ class Projection(common.Projection):
             Use the connection between the sample indices to distinguish
             between local and common synapse properties.
         """
-        sample_connection = nest.GetConnections(source=[int(self._sources[0])],
-                                                synapse_model=self.nest_synapse_model)[:1]
+        if self._connections is not None:
+            sample_connection = self._connections[:1]
+        else:
+            sample_connection = nest.GetConnections(source=[int(self._sources[0])],
+                                                    synapse_model=self.nest_synapse_model)[:1]
         local_parameters = nest.GetStatus(sample_connection)[0].keys()
         all_parameters = nest.GetDefaults(self.nest_synapse_model).keys()
         self._common_synapse_property_names = [name for name in all_parameters if name not in local_parameters]
 
     def _set_attributes(self, parameter_space):
         parameter_space.evaluate(mask=(slice(None), self.post._mask_local))  # only columns for connections that exist on this machine
-        sources = numpy.unique(self._sources).tolist()
+        if len(self.connections) == 0:
+            return
         if self._common_synapse_property_names is None:
             self._identify_common_synapse_properties()
-        for postsynaptic_cell, connection_parameters in zip(self.post.local_cells,
-                                                            parameter_space.columns()):
-            connections = nest.GetConnections(source=sources,
-                                              target=[postsynaptic_cell],
-                                              synapse_model=self.nest_synapse_model)
-            if connections:
-                source_mask = self.pre.id_to_index([x[0] for x in connections])
-                for name, value in connection_parameters.items():
-                    if name == "weight" and self.receptor_type == 'inhibitory' and self.post.conductance_based:
-                        value *= -1  # NEST uses negative values for inhibitory weights, even if these are conductances
-                    value = make_sli_compatible(value)
-                    if name not in self._common_synapse_property_names:
-                        if len(source_mask) > 1:
-                            nest.SetStatus(connections, name, value[source_mask])
-                        elif isinstance(value, numpy.ndarray):  # OneToOneConnector
-                            nest.SetStatus(connections, name, value[source_mask])
-                        else:
-                            nest.SetStatus(connections, name, value)
-                    else:
-                        self._set_common_synapse_property(name, value)
+        # row and (local) column of each connection in the evaluated parameter arrays
+        sources, targets = self._get_connection_attributes('source', 'target')
+        rows = self.pre.id_to_index(sources)
+        local_columns = numpy.empty(self.post.size, dtype=int)
+        local_columns[numpy.arange(self.post.size)[self.post._mask_local]] = numpy.arange(self.post.local_size)
+        columns = local_columns[self.post.id_to_index(targets)]
+        for name, value in parameter_space.items():
+            if name == "weight" and self.receptor_type == 'inhibitory' and self.post.conductance_based:
+                value = -1 * value  # NEST uses negative values for inhibitory weights, even if these are conductances
+            if name not in self._common_synapse_property_names:
+                if isinstance(value, numpy.ndarray):
+                    value = value.reshape((self.pre.size, -1))[rows, columns]
+                # a single call to NEST for all connections
+                self._set_connection_attribute(name, make_sli_compatible(value))
+            else:
+                self._set_common_synapse_property(name, make_sli_compatible(value))
 
     def _set_common_synapse_property(self, name, value):
         """
@@ -268,7 +337,7 @@ class Projection(common.Projection):
     #        file.write(lines, {'pre' : self.pre.label, 'post' : self.post.label})
     #        file.close()
 
-    def _get_attributes_as_list(self, *names):
+    def _get_attributes_as_columns(self, *names):
         nest_names = []
         for name in names:
             if name == 'presynaptic_index':
@@ -277,45 +346,26 @@ class Projection(common.Projection):
                 nest_names.append('target')
             else:
                 nest_names.append(name)
-        values = nest.GetStatus(self.connections, nest_names)
+        # a single call to NEST for all attributes of all connections, or none if they are cached
+        columns = [column.astype(float) for column in self._get_connection_attributes(*nest_names)]
         if 'weight' in names:  # other attributes could also have scale factors - need to use translation mechanisms
-            values = numpy.array(values)  # ought to preserve int type for source, target
-            scale_factors = numpy.ones(len(names))
-            scale_factors[names.index('weight')] = 0.001
+            scale_factor = 0.001
             if self.receptor_type == 'inhibitory' and self.post.conductance_based:
-                scale_factors[names.index('weight')] *= -1  # NEST uses negative values for inhibitory weights, even if these are conductances
-            values *= scale_factors
-            values = values.tolist()
-        if 'presynaptic_index' in names:
-            values = numpy.array(values)
-            values[:, names.index('presynaptic_index')] -= self.pre.first_id
-            values = values.tolist()
-        if 'postsynaptic_index' in names:
-            values = numpy.array(values)
-            values[:, names.index('postsynaptic_index')] -= self.post.first_id
-            values = values.tolist()
-        for i in xrange(len(values)):
-            values[i] = tuple(values[i])
-        return values
-
-    def _get_attributes_as_arrays(self, *names):
-        all_values = []
-        for attribute_name in names:
-            if attribute_name[-1] == "s":  # weights --> weight, delays --> delay
-                attribute_name = attribute_name[:-1]
-            value_arr = numpy.nan * numpy.ones((self.pre.size, self.post.size))
-            connection_attributes = nest.GetStatus(self.connections, ('source', 'target', attribute_name))
-            for conn in connection_attributes:
-                # (offset is always 0,0 for connections created with connect())
-                src, tgt, value = conn
-                addr = self.pre.id_to_index(src), self.post.id_to_index(tgt)
-                if numpy.isnan(value_arr[addr]):
-                    value_arr[addr] = value
-                else:
-                    value_arr[addr] += value
-            if attribute_name == 'weight':
-                value_arr *= 0.001
-                if self.receptor_type == 'inhibitory' and self.post.conductance_based:
-                    value_arr *= -1  # NEST uses negative values for inhibitory weights, even if these are conductances
-            all_values.append(value_arr)
-        return all_values
+                scale_factor *= -1  # NEST uses negative values for inhibitory weights, even if these are conductances
+            columns[names.index('weight')] *= scale_factor
+        if len(columns[0]) > 0:
+            if 'presynaptic_index' in names:
+                i = names.index('presynaptic_index')
+                columns[i] = self.pre.id_to_index(columns[i].astype(int))
+            if 'postsynaptic_index' in names:
+                i = names.index('postsynaptic_index')
+                columns[i] = self.post.id_to_index(columns[i].astype(int))
+        return columns
+
+    def _get_attributes_as_list(self, *names):
+        columns = self._get_attributes_as_columns(*names)
+        for name in ('presynaptic_index', 'postsynaptic_index'):
+            if name in names:
+                i = names.index(name)
+                columns[i] = columns[i].astype(int)
+        return list(zip(*[column.tolist() for column in columns]))
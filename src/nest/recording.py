@@ -55,11 +55,13 @@ class RecordingDevice(object):
         scale_factor = SCALE_FACTORS.get(variable, 1)
         nest_variable = VARIABLE_MAP.get(variable, variable)
         events = nest.GetStatus(self.device,'events')[0]
-        ids = events['senders']
-        values = events[nest_variable] * scale_factor # I'm hoping numpy optimises for the case where scale_factor = 1, otherwise should avoid this multiplication in that case
+        desired_ids = list(desired_ids)
+        values = recording.split_by_id(events['senders'], events[nest_variable],
+                                       desired_ids)
         data = {}
-        for id in desired_ids:
-            data[id] = values[ids==id]
+        for id, id_values in zip(desired_ids, values):
+            if scale_factor != 1:
+                id_values = id_values * scale_factor
             if variable != 'times':
                 # NEST does not record values at the zeroth time step, so we
                 # add them here.
@@ -67,12 +69,13 @@ class RecordingDevice(object):
                     self._initial_values[variable] = {}
                 initial_value = self._initial_values[variable].get(id,
                                                                    id.get_initial_value(variable))
-                data[id] = numpy.concatenate((numpy.hstack([initial_value]), data[id]))
+                id_values = numpy.concatenate((numpy.hstack([initial_value]), id_values))
                 # if `get_data()` is called in the middle of a simulation, the
                 # value at the last time point will become the initial value for
                 # the next time `get_data()` is called
                 if clear:
-                    self._initial_values[variable][id] = data[id][-1]
+                    self._initial_values[variable][id] = id_values[-1]
+            data[id] = id_values
         return data
 
 
@@ -103,12 +106,8 @@ class SpikeDetector(RecordingDevice):
         return self.get_data('times', desired_ids)
 
     def get_spike_counts(self, desired_ids):
-        events = nest.GetStatus(self.device, 'events')[0]
-        N = {}
-        for id in desired_ids:
-            mask = events['senders'] == int(id)
-            N[int(id)] = len(events['times'][mask])
-        return N
+        senders = nest.GetStatus(self.device, 'events')[0]['senders']
+        return recording.count_by_id(senders, list(desired_ids))
 
 
 class Multimeter(RecordingDevice):
@@ -418,7 +417,11 @@ class Recorder(recording.Recorder):
         self._spike_detector = SpikeDetector()
 
     def _get_spiketimes(self, id):
-        return self._spike_detector.get_spiketimes([id])[id] # hugely inefficient - to be optimized later
+        return self._spike_detector.get_spiketimes([id])[id]
+
+    def _get_all_spiketimes(self, ids):
+        spiketimes = self._spike_detector.get_spiketimes(ids)
+        return [spiketimes[id] for id in ids]
 
     def _get_all_signals(self, variable, ids, clear=False):
         data = self._multimeter.get_data(variable, ids, clear=clear)
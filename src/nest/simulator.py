@@ -60,6 +60,7 @@ class _State(common.control.BaseState):
         self.tempdirs = []
         self.recording_devices = []
         self.populations = [] # needed for reset
+        self.run_counter = 0  # incremented whenever the simulation may have changed connection attributes
 
     @property
     def t(self):
@@ -126,6 +127,7 @@ class _State(common.control.BaseState):
         if not self.running and simtime > 0:
             simtime += self.dt # we simulate past the real time by one time step, otherwise NEST doesn't give us all the recorded data
             self.running = True
+        self.run_counter += 1
         nest.Simulate(simtime)
 
     def run_until(self, tstop):
@@ -140,6 +142,7 @@ class _State(common.control.BaseState):
         self.running = False
         self.t_start = 0.0
         self.segment_counter += 1
+        self.run_counter += 1
 
     def clear(self):
         self.populations = []
@@ -191,10 +194,17 @@ class Connection(object):
         """
         return self.parent.connections[self.index]
 
+    def _get(self, name):
+        # read from the values cached by the parent for all connections
+        return self.parent._get_connection_attributes(name)[0][self.index]
+
+    def _set(self, name, value):
+        self.parent._set_connection_attribute(name, value, self.index)
+
     @property
     def source(self):
         """The ID of the pre-synaptic neuron."""
-        src = ID(nest.GetStatus([self.id()], 'source')[0])
+        src = ID(self._get('source'))
         src.parent = self.parent.pre
         return src
     presynaptic_cell = source
@@ -202,27 +212,29 @@ class Connection(object):
     @property
     def target(self):
         """The ID of the post-synaptic neuron."""
-        tgt = ID(nest.GetStatus([self.id()], 'target')[0])
+        tgt = ID(self._get('target'))
         tgt.parent = self.parent.post
         return tgt
     postsynaptic_cell = target
 
+    def _weight_scale(self):
+        if self.parent.receptor_type == 'inhibitory' and self.parent.post.conductance_based:
+            return -1000.0  # NEST uses negative values for inhibitory weights, even if these are conductances
+        return 1000.0
+
     def _set_weight(self, w):
-        nest.SetStatus([self.id()], 'weight', w*1000.0)
+        self._set('weight', w*self._weight_scale())
 
     def _get_weight(self):
         """Synaptic weight in nA or µS."""
-        w_nA = nest.GetStatus([self.id()], 'weight')[0]
-        if self.parent.synapse_type == 'inhibitory' and common.is_conductance(self.target):
-            w_nA *= -1 # NEST uses negative values for inhibitory weights, even if these are conductances
-        return 0.001*w_nA
+        return self._get('weight')/self._weight_scale()
 
     def _set_delay(self, d):
-        nest.SetStatus([self.id()], 'delay', d)
+        self._set('delay', d)
 
     def _get_delay(self):
         """Synaptic delay in ms."""
-        return nest.GetStatus([self.id()], 'delay')[0]
+        return self._get('delay')
 
     weight = property(_get_weight, _set_weight)
     delay  = property(_get_delay, _set_delay)
@@ -230,9 +242,9 @@ class Connection(object):
 
 def generate_synapse_property(name):
     def _get(self):
-        return nest.GetStatus([self.id()], name)[0]
+        return self._get(name)
     def _set(self, val):
-        nest.SetStatus([self.id()], name, val)
+        self._set(name, val)
     return property(_get, _set)
 
 setattr(Connection, 'U', generate_synapse_property('U'))
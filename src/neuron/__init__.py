@@ -8,7 +8,7 @@ nrnpython implementation of the PyNN API.
 """
 
 from pyNN.random import *
-from pyNN import common, core, space, __doc__
+from pyNN import common, core, space, profiling, __doc__
 from pyNN.standardmodels import StandardCellType
 from pyNN.recording import get_io
 from pyNN.space import Space
@@ -85,9 +85,11 @@ def end(compatible_output=True):
         io = get_io(filename)
         population.write_data(io, variables)
     simulator.state.write_on_end = []
+    profiling.write_report()
     #simulator.state.finalize()
 
 run, run_until = common.build_run(simulator)
+run_async = common.build_run_async(simulator, run_until)
 run_for = run
 
 reset = common.build_reset(simulator)
@@ -93,6 +93,16 @@ class BaseSingleCompartmentNeuron(nrn.Section):
             seg.v = self.v_init
         #self.seg.v = self.v_init
 
+    def memb_init_pointers(self):
+        """
+        Return pointers to the state variables set by `memb_init()`, so that
+        Populations can initialize all their cells at once, or None if this
+        is not possible.
+        """
+        if self.nseg > 1:
+            return None
+        return {'v': self.seg._ref_v}
+
     def set_parameters(self, param_dict):
         for name in self.parameter_names:
             setattr(self, name, param_dict[name])
@@ -289,6 +299,11 @@ class BretteGerstnerIF(LeakySingleCompartmentNeuron):
             seg.v = self.v_init
             seg.w = self.w_init
 
+    def memb_init_pointers(self):
+        if self.nseg > 1:
+            return None
+        return {'v': self.seg._ref_v, 'w': self.adexp._ref_w}
+
 
 class Izhikevich_(BaseSingleCompartmentNeuron):
     """docstring"""
@@ -334,6 +349,11 @@ class Izhikevich_(BaseSingleCompartmentNeuron):
             seg.v = self.v_init
             seg.u = self.u_init
 
+    def memb_init_pointers(self):
+        if self.nseg > 1:
+            return None
+        return {'v': self.seg._ref_v, 'u': self.izh._ref_u}
+
 
 class GsfaGrrIF(StandardIF):
     """docstring"""
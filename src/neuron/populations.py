@@ -19,6 +19,24 @@ from .recording import Recorder
 logger = logging.getLogger("PyNN")
 
 
+def _memb_init_pointers(cell):
+    """
+    Return the pointers given by the `memb_init_pointers()` method of a cell
+    object, or None if the cell has no such method, or if `memb_init()` is
+    overridden in a subclass of the class defining `memb_init_pointers()`,
+    since the pointers might then not cover all the state set by `memb_init()`.
+    """
+    def defining_class(name):
+        for cls in type(cell).__mro__:
+            if name in vars(cls):
+                return cls
+        return None
+    pointers_class = defining_class("memb_init_pointers")
+    if pointers_class is None or not issubclass(pointers_class, defining_class("memb_init")):
+        return None
+    return cell.memb_init_pointers()
+
+
 class PopulationMixin(object):
 
     def _set_parameters(self, parameter_space):
@@ -45,6 +63,8 @@ class PopulationMixin(object):
             value = initial_values.evaluate(simplify=True)
             for cell in self:  # only on local node
                 setattr(cell._cell, "%s_init" % variable, value)
+            local_values = numpy.empty((self.local_size,))
+            local_values.fill(value)
         else:
             if isinstance(initial_values.base_value, RandomDistribution) and initial_values.base_value.rng.parallel_safe:
                 local_values = initial_values.evaluate()[self._mask_local]
@@ -52,6 +72,17 @@ class PopulationMixin(object):
                 local_values = initial_values[self._mask_local]            
             for cell, value in zip(self, local_values):
                 setattr(cell._cell, "%s_init" % variable, value)
+        # also keep the values in the array used for bulk initialization
+        population = getattr(self, "grandparent", self)
+        values = population._local_initial_values.get(variable)
+        if values is None:
+            values = population._local_initial_values[variable] = numpy.empty((population.local_size,))
+            values.fill(numpy.nan)
+        if population is self:
+            values[:] = local_values
+        else:
+            local_index = numpy.cumsum(population._mask_local) - 1
+            values[local_index[population.id_to_index(self.local_cells)]] = local_values
 
 
 class Assembly(common.Assembly):
@@ -77,6 +108,8 @@ class Population(common.Population, PopulationMixin):
     def __init__(self, size, cellclass, cellparams=None, structure=None,
                  initial_values={}, label=None):
         __doc__ = common.Population.__doc__
+        self._local_initial_values = {}  # contiguous arrays of the initial values of the local cells
+        self._initial_value_pointers = None
         common.Population.__init__(self, size, cellclass, cellparams,
                                    structure, initial_values, label)
         simulator.initializer.register(self)
@@ -109,9 +142,47 @@ class Population(common.Population, PopulationMixin):
                 if hasattr(self.celltype, "extra_parameters"):
                     params.update(self.celltype.extra_parameters)
                 self.all_cells[i]._build_cell(self.celltype.model, params)
-        simulator.initializer.register(*self.all_cells[self._mask_local])
         simulator.state.gid_counter += self.size
 
+    def _get_initial_value_pointers(self):
+        """
+        Return a dict containing, for each state variable initialized by the
+        cells' `memb_init()` method, a `PtrVector` pointing to that variable in
+        all local cells, or None if the cells cannot be initialized in bulk.
+        """
+        if not hasattr(simulator.h, "PtrVector"):  # requires NEURON 7.5 or later
+            return None
+        pointers = {}
+        for i, cell in enumerate(self):
+            cell_pointers = _memb_init_pointers(cell._cell)
+            if cell_pointers is None:
+                return None
+            for variable, ref in cell_pointers.items():
+                if variable not in pointers:
+                    pointers[variable] = simulator.h.PtrVector(self.local_size)
+                pointers[variable].pset(i, ref)
+        return pointers
+
+    def _memb_init(self):
+        """
+        Set the state variables of all local cells to their initial values.
+
+        Where possible, the values are copied from the arrays of initial values
+        into NEURON with a single call per state variable, rather than by
+        calling `memb_init()` for each cell.
+        """
+        if self._initial_value_pointers is None:
+            self._initial_value_pointers = self._get_initial_value_pointers() or {}
+            if self._initial_value_pointers and not all(variable in self._local_initial_values
+                                                        for variable in self._initial_value_pointers):
+                self._initial_value_pointers = {}
+        if self._initial_value_pointers:
+            for variable, pointers in self._initial_value_pointers.items():
+                pointers.scatter(simulator.h.Vector(self._local_initial_values[variable]))
+        else:
+            for cell in self:
+                cell._cell.memb_init()
+
     def _native_rset(self, parametername, rand_distr):
         """
         'Random' set. Set the value of parametername to a value taken from
@@ -25,7 +25,7 @@ logger = logging.getLogger("PyNN")
 _projections = []  # if a Projection is created but not assigned to a variable,
                    # the connections will not exist, so we store a reference here
 
-class Projection(common.Projection):
+class Projection(common.ArrayConnectionStore, common.Projection):
     __doc__ = common.Projection.__doc__
     _simulator = simulator
     _static_synapse_class = StaticSynapse
@@ -38,7 +38,14 @@ class Projection(common.Projection):
                                    connector, synapse_type, source, receptor_type,
                                    space, label)
         self._connections = dict((index, {}) for index in self.post._mask_local.nonzero()[0])    
-        connector.connect(self)
+        # static connections are created in bulk, without a Python object for
+        # each connection: the NetCons are held in a hoc List and the other
+        # connection data in NumPy arrays
+        self._bulk = (self.synapse_type.connection_type is simulator.Connection
+                      and self.synapse_type.model is None)
+        self._netcons = simulator.h.List()
+        self._connection_chunks = []
+        self._make_connections()
         self._presynaptic_components = dict((index, {}) for index in 
                                             self.pre._mask_local.nonzero()[0])
         if self.synapse_type.presynaptic_type:
@@ -48,27 +55,64 @@ class Projection(common.Projection):
 
     @property
     def connections(self):
-        for x in self._connections.values():
-            for y in x.values():
-                yield y
+        if self._bulk:
+            for i in range(len(self)):
+                yield simulator.ConnectionView(self, i)
+        else:
+            for x in self._connections.values():
+                for y in x.values():
+                    yield y
 
     def __getitem__(self, i):
         __doc__ = common.Projection.__getitem__.__doc__
         if isinstance(i, int):
             if i < len(self):
-                return self.connections[i]
+                if self._bulk:
+                    return simulator.ConnectionView(self, i)
+                return list(self.connections)[i]
             else:
                 raise IndexError("%d > %d" % (i, len(self)-1))
         elif isinstance(i, slice):
             if i.stop < len(self):
-                return [self.connections[j] for j in range(*i.indices(i.stop))]
+                connections = list(self.connections)
+                return [connections[j] for j in range(*i.indices(i.stop))]
             else:
                 raise IndexError("%d > %d" % (i.stop, len(self)-1))
 
     def __len__(self):
         """Return the number of connections on the local MPI node."""
+        if self._bulk:
+            return int(self._netcons.count())
         return len(list(self.connections))
 
+    def _connect_static(self, presynaptic_indices, postsynaptic_indices,
+                        weight, delay):
+        """
+        Create static connections for the (pre, post) index pairs given by two
+        1D arrays. `weight` and `delay` are single values or 1D arrays of the
+        same length.
+        """
+        chunk = self._store_connections(presynaptic_indices, postsynaptic_indices,
+                                        weight, delay)
+        sources = self.pre.all_cells[presynaptic_indices]
+        targets = self.post.all_cells[postsynaptic_indices]
+        for source, target, w, d in izip(sources, targets, chunk['weight'].tolist(),
+                                         chunk['delay'].tolist()):
+            self._netcons.append(
+                simulator.connect_netcon(source, target, self.receptor_type, w, d))
+
+    def _connect_block(self, presynaptic_indices, postsynaptic_indices,
+                       **connection_parameters):
+        __doc__ = common.Projection._connect_block.__doc__
+        if self._bulk:
+            self._connect_static(numpy.asarray(presynaptic_indices, dtype=int),
+                                 numpy.asarray(postsynaptic_indices, dtype=int),
+                                 **connection_parameters)
+        else:
+            common.Projection._connect_block(self, presynaptic_indices,
+                                             postsynaptic_indices,
+                                             **connection_parameters)
+
     def _convergent_connect(self, presynaptic_indices, postsynaptic_index,
                             **connection_parameters):
         """
@@ -85,10 +129,16 @@ class Projection(common.Projection):
         if not isinstance(postsynaptic_cell, int) or postsynaptic_cell > simulator.state.gid_counter or postsynaptic_cell < 0:
             errmsg = "Invalid post-synaptic cell: %s (gid_counter=%d)" % (postsynaptic_cell, simulator.state.gid_counter)
             raise errors.ConnectionError(errmsg)
+        assert postsynaptic_cell.local
+        if self._bulk:
+            presynaptic_indices = numpy.asarray(presynaptic_indices, dtype=int)
+            self._connect_static(presynaptic_indices,
+                                 postsynaptic_index * numpy.ones(presynaptic_indices.size, dtype=int),
+                                 **connection_parameters)
+            return
         for name, value in connection_parameters.items():
             if isinstance(value, (float, int)):
                 connection_parameters[name] = repeat(value)
-        assert postsynaptic_cell.local
         for pre_idx, values in core.ezip(presynaptic_indices, *connection_parameters.values()):
             parameters = dict(zip(connection_parameters.keys(), values))
             #logger.debug("Connecting neuron #%s to neuron #%s with synapse type %s, receptor type %s, parameters %s", pre_idx, postsynaptic_index, self.synapse_type, self.receptor_type, parameters)
@@ -126,6 +176,9 @@ class Projection(common.Projection):
                 for name, value in connection_parameters.items():
                     for index in component:
                         setattr(component[index], name, value[index])
+        if self._bulk:
+            self._set_static_attributes(parameter_space)
+            return
         # Evaluate the parameters for the post-synaptic components (typically the "Connection" object)
         parameter_space.evaluate(mask=(slice(None), self.post._mask_local))  # only columns for connections that exist on this machine
         for connection_group, connection_parameters in zip(self._connections.values(),
@@ -133,5 +186,22 @@ class Projection(common.Projection):
             for name, value in connection_parameters.items():
                 for index in connection_group:
                     setattr(connection_group[index], name, value[index])
-            
-                    
+
+    def _set_static_attributes(self, parameter_space):
+        new_values = self._set_array_attributes(parameter_space)
+        if 'weight' in new_values:
+            for i, w in enumerate(new_values['weight'].tolist()):
+                self._netcons.o(i).weight[0] = w
+        if 'delay' in new_values:
+            for i, d in enumerate(new_values['delay'].tolist()):
+                self._netcons.o(i).delay = d
+
+    def _get_attributes_as_columns(self, *names):
+        if not self._bulk:
+            return common.Projection._get_attributes_as_columns(self, *names)
+        return self._get_array_attributes_as_columns(*names)
+
+    def _get_attributes_as_list(self, *names):
+        if not self._bulk:
+            return common.Projection._get_attributes_as_list(self, *names)
+        return self._get_array_attributes_as_list(*names)
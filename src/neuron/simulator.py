@@ -132,14 +132,17 @@ class _Initializer(object):
                     self.cell_list.append(item)
 
     def _initialize(self):
-        """Call `memb_init()` for all registered cell objects."""
+        """Call `memb_init()` for all registered cell objects and Populations."""
         logger.info("Initializing membrane potential of %d cells and %d Populations." % \
                      (len(self.cell_list), len(self.population_list)))
         for cell in self.cell_list:
             cell._cell.memb_init()
         for population in self.population_list:
-            for cell in population:
-                cell._cell.memb_init()
+            if hasattr(population, "_memb_init"):
+                population._memb_init()
+            else:
+                for cell in population:
+                    cell._cell.memb_init()
 
     def clear(self):
         self.cell_list = []
@@ -308,9 +311,32 @@ class ID(int, common.IDMixin):
         """Set the initial value of a state variable of the cell."""
         index = self.parent.id_to_local_index(self)
         self.parent.initial_values[variable][index] = value
+        if variable in self.parent._local_initial_values:
+            self.parent._local_initial_values[variable][index] = value
         setattr(self._cell, "%s_init" % variable, value)
 
 
+def connect_netcon(presynaptic_cell, postsynaptic_cell, receptor_type, weight, delay):
+    """
+    Create a NetCon from the cell with ID `presynaptic_cell` (which may be on
+    another MPI node) to the synapse `receptor_type` of the local cell
+    `postsynaptic_cell`.
+    """
+    if "." in receptor_type:
+        section, target = receptor_type.split(".")
+        target_object = getattr(getattr(postsynaptic_cell._cell, section), target)
+    else:
+        target_object = getattr(postsynaptic_cell._cell, receptor_type)
+    nc = state.parallel_context.gid_connect(int(presynaptic_cell), target_object)
+    nc.weight[0] = weight
+    # if we have a mechanism (e.g. from 9ML) that includes multiple
+    # synaptic channels, need to set nc.weight[1] here
+    if nc.wcnt() > 1 and hasattr(postsynaptic_cell._cell, "type"):
+        nc.weight[1] = postsynaptic_cell._cell.type.receptor_types.index(receptor_type)
+    nc.delay = delay
+    return nc
+
+
 class Connection(object):
     """
     Store an individual plastic connection and information about it. Provide an
@@ -327,18 +353,9 @@ class Connection(object):
         self.postsynaptic_index = post
         self.presynaptic_cell = projection.pre[pre]
         self.postsynaptic_cell = projection.post[post]
-        if "." in projection.receptor_type:
-            section, target = projection.receptor_type.split(".")
-            target_object = getattr(getattr(self.postsynaptic_cell._cell, section), target)
-        else:
-            target_object = getattr(self.postsynaptic_cell._cell, projection.receptor_type)
-        self.nc = state.parallel_context.gid_connect(int(self.presynaptic_cell), target_object)
-        self.nc.weight[0] = parameters.pop('weight')
-        # if we have a mechanism (e.g. from 9ML) that includes multiple
-        # synaptic channels, need to set nc.weight[1] here
-        if self.nc.wcnt() > 1 and hasattr(self.postsynaptic_cell._cell, "type"):
-            self.nc.weight[1] = self.postsynaptic_cell._cell.type.receptor_types.index(projection.receptor_type)
-        self.nc.delay  = parameters.pop('delay')
+        self.nc = connect_netcon(self.presynaptic_cell, self.postsynaptic_cell,
+                                 projection.receptor_type,
+                                 parameters.pop('weight'), parameters.pop('delay'))
         if projection.synapse_type.model is not None:
             self._setup_plasticity(projection.synapse_type, parameters)
         # nc.threshold is supposed to be set by ParallelContext.threshold, called in _build_cell(), above, but this hasn't been tested
@@ -419,6 +436,37 @@ class Connection(object):
         return tuple(getattr(self, name) for name in attribute_names)
 
 
+class ConnectionView(common.ConnectionView):
+    """
+    Provide the same interface as `Connection` for a static connection created
+    in bulk by a `Projection`. Setting the weight or delay also updates the
+    connection's NetCon.
+    """
+
+    @property
+    def nc(self):
+        return self.projection._netcons.o(self.i)
+
+    def _set_weight(self, w):
+        common.ConnectionView._set_weight(self, w)
+        self.nc.weight[0] = w
+
+    def _get_weight(self):
+        """Synaptic weight in nA or µS."""
+        return common.ConnectionView._get_weight(self)
+
+    def _set_delay(self, d):
+        common.ConnectionView._set_delay(self, d)
+        self.nc.delay = d
+
+    def _get_delay(self):
+        """Connection delay in ms."""
+        return common.ConnectionView._get_delay(self)
+
+    weight = property(_get_weight, _set_weight)
+    delay = property(_get_delay, _set_delay)
+
+
 class GapJunction(object):
     """
     Store an individual gap junction connection and information about it. Provide an
@@ -0,0 +1,76 @@
+"""
+Pure-NumPy implementation of the PyNN API.
+
+This is a small reference simulator, which needs nothing beyond NumPy. It
+supports the standard integrate-and-fire cell types, spike sources, current
+sources and static synapses, and runs in a single process, with a fixed time
+step.
+
+:copyright: Copyright 2006-2013 by the PyNN team, see AUTHORS.
+:license: CeCILL, see LICENSE for details.
+"""
+
+import logging
+import numpy
+from pyNN import common, profiling
+from pyNN.standardmodels import StandardCellType
+from pyNN.connectors import *
+from pyNN.recording import *
+from . import simulator
+from .standardmodels import *
+from .populations import Population, PopulationView, Assembly
+from .projections import Projection
+
+
+logger = logging.getLogger("PyNN")
+
+def list_standard_models():
+    """Return a list of all the StandardCellType classes available for this simulator."""
+    return [obj.__name__ for obj in globals().values() if isinstance(obj, type) and issubclass(obj, StandardCellType)]
+
+def setup(timestep=0.1, min_delay=0.1, max_delay=10.0, **extra_params):
+    """
+    Should be called at the very beginning of a script.
+
+    `extra_params` contains any keyword arguments that are required by a given
+    simulator but not by others. For numpy_sim, `rng_seed` may be used to seed
+    the random number generator used by Poisson spike sources and noisy
+    current sources.
+    """
+    common.setup(timestep, min_delay, max_delay, **extra_params)
+    simulator.state.clear()
+    simulator.state.dt = timestep
+    simulator.state.min_delay = min_delay
+    simulator.state.max_delay = max_delay
+    if 'rng_seed' in extra_params:
+        simulator.state.rng = numpy.random.RandomState(extra_params['rng_seed'])
+    return rank()
+
+def end(compatible_output=True):
+    """Do any necessary cleaning up before exiting."""
+    for (population, variables, filename) in simulator.state.write_on_end:
+        io = get_io(filename)
+        population.write_data(io, variables)
+    simulator.state.write_on_end = []
+    profiling.write_report()
+
+run, run_until = common.build_run(simulator)
+run_async = common.build_run_async(simulator, run_until)
+run_for = run
+
+reset = common.build_reset(simulator)
+
+initialize = common.initialize
+
+get_current_time, get_time_step, get_min_delay, get_max_delay, \
+                    num_processes, rank = common.build_state_queries(simulator)
+
+create = common.build_create(Population)
+
+connect = common.build_connect(Projection, FixedProbabilityConnector, StaticSynapse)
+
+record = common.build_record(simulator)
+
+record_v = lambda source, filename: record(['v'], source, filename)
+
+record_gsyn = lambda source, filename: record(['gsyn_exc', 'gsyn_inh'], source, filename)
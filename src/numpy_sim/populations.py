@@ -0,0 +1,68 @@
+"""
+Population, PopulationView and Assembly classes for the numpy_sim module.
+
+:copyright: Copyright 2006-2013 by the PyNN team, see AUTHORS.
+:license: CeCILL, see LICENSE for details.
+"""
+
+import numpy
+from pyNN import common
+from pyNN.standardmodels import StandardCellType
+from pyNN.mock import populations as mock_populations
+from . import simulator
+from .recording import Recorder
+
+
+class Assembly(common.Assembly):
+    _simulator = simulator
+
+
+class PopulationView(mock_populations.PopulationView):
+    _assembly_class = Assembly
+    _simulator = simulator
+
+    def _set_initial_value_array(self, variable, initial_values):
+        model = self.parent._model
+        if variable in model.state:
+            model.state[variable][self.mask] = initial_values.evaluate(simplify=False)
+
+    def _get_view(self, selector, label=None):
+        return PopulationView(self, selector, label)
+
+
+class Population(mock_populations.Population):
+    __doc__ = common.Population.__doc__
+    _simulator = simulator
+    _recorder_class = Recorder
+    _assembly_class = Assembly
+
+    def _create_cells(self):
+        if not isinstance(self.celltype, StandardCellType):
+            raise NotImplementedError("numpy_sim only supports standard cell types")
+        id_range = numpy.arange(simulator.state.id_counter,
+                                simulator.state.id_counter + self.size)
+        self.all_cells = numpy.array([simulator.ID(id) for id in id_range],
+                                     dtype=simulator.ID)
+        self._mask_local = numpy.ones((self.size,), bool)  # all cells are local
+        parameter_space = self.celltype.native_parameters
+        parameter_space.shape = (self.size,)
+        parameter_space.evaluate(simplify=False)
+        self._parameters = parameter_space.as_dict()
+        for id in self.all_cells:
+            id.parent = self
+        simulator.state.id_counter += self.size
+        self._model = self.celltype.model(self)
+        simulator.state.populations.append(self)
+
+    def _set_initial_value_array(self, variable, initial_values):
+        if variable in self._model.state:
+            self._model.state[variable][:] = initial_values.evaluate(simplify=False)
+
+    def _reset(self):
+        self._model.reset()
+        for variable, initial_values in self.initial_values.items():
+            self._set_initial_value_array(variable, initial_values)
+        self.recorder._clear_data()
+
+    def _get_view(self, selector, label=None):
+        return PopulationView(self, selector, label)
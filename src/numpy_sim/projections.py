@@ -0,0 +1,107 @@
+"""
+Projection class for the numpy_sim module.
+
+Connections are not represented by individual objects: their indices, weights
+and delays are held in NumPy arrays, from which the sparse matrices used for
+spike propagation are built when the simulation is run.
+
+:copyright: Copyright 2006-2013 by the PyNN team, see AUTHORS.
+:license: CeCILL, see LICENSE for details.
+"""
+
+import numpy
+from pyNN import common
+from pyNN.space import Space
+from . import simulator
+from .standardmodels import StaticSynapse
+
+
+def _locate(neurons, indices):
+    """
+    Given the indices of neurons within a Population, PopulationView or
+    Assembly, return a list of (population, indices within population, mask)
+    tuples, where `mask` selects the elements of `indices` which belong to that
+    population.
+    """
+    ids = neurons.all_cells[indices].astype(int)
+    locations = []
+    for population in simulator.state.populations:
+        mask = (ids >= population.first_id) & (ids <= population.last_id)
+        if mask.any():
+            locations.append((population, ids[mask] - population.first_id, mask))
+    return locations
+
+
+class Projection(common.ArrayConnectionStore, common.Projection):
+    __doc__ = common.Projection.__doc__
+    _simulator = simulator
+    _static_synapse_class = StaticSynapse
+
+    def __init__(self, presynaptic_population, postsynaptic_population,
+                 connector, synapse_type=None, source=None, receptor_type=None,
+                 space=Space(), label=None):
+        common.Projection.__init__(self, presynaptic_population, postsynaptic_population,
+                                   connector, synapse_type, source, receptor_type,
+                                   space, label)
+        if not isinstance(self.synapse_type, StaticSynapse):
+            raise NotImplementedError("numpy_sim only supports static synapses")
+        self._connection_chunks = []
+        simulator.state.projections.append(self)
+        self._make_connections()
+
+    def __len__(self):
+        return self._connection_data['weight'].size
+
+    def __getitem__(self, i):
+        __doc__ = common.Projection.__getitem__.__doc__
+        if isinstance(i, int):
+            if i < len(self):
+                return common.ConnectionView(self, i)
+            else:
+                raise IndexError("%d > %d" % (i, len(self)-1))
+        elif isinstance(i, slice):
+            return [common.ConnectionView(self, j) for j in range(*i.indices(len(self)))]
+
+    @property
+    def connections(self):
+        for i in range(len(self)):
+            yield common.ConnectionView(self, i)
+
+    def _connect_block(self, presynaptic_indices, postsynaptic_indices,
+                       **connection_parameters):
+        __doc__ = common.Projection._connect_block.__doc__
+        self._store_connections(presynaptic_indices, postsynaptic_indices,
+                                **connection_parameters)
+
+    def _convergent_connect(self, presynaptic_indices, postsynaptic_index,
+                            **connection_parameters):
+        presynaptic_indices = numpy.asarray(presynaptic_indices, dtype=int)
+        self._connect_block(presynaptic_indices,
+                            postsynaptic_index * numpy.ones(presynaptic_indices.size, dtype=int),
+                            **connection_parameters)
+
+    def _set_attributes(self, parameter_space):
+        self._set_array_attributes(parameter_space)
+
+    def _get_attributes_as_columns(self, *names):
+        return self._get_array_attributes_as_columns(*names)
+
+    def _get_attributes_as_list(self, *names):
+        return self._get_array_attributes_as_list(*names)
+
+    def _get_pathways(self, dt):
+        """
+        Return the connections as a list of `simulator.Pathway` objects, one
+        for each combination of pre- and post-synaptic Population.
+        """
+        data = self._connection_data
+        pathways = []
+        for source, sources, pre_mask in _locate(self.pre, data['presynaptic_index']):
+            post_indices = data['postsynaptic_index'][pre_mask]
+            for target, targets, post_mask in _locate(self.post, post_indices):
+                pathways.append(
+                    simulator.Pathway(source._model, target._model, self.receptor_type,
+                                      sources[post_mask], targets,
+                                      data['weight'][pre_mask][post_mask],
+                                      data['delay'][pre_mask][post_mask], dt))
+        return pathways
@@ -0,0 +1,113 @@
+"""
+Recording of spikes and state variables for the numpy_sim module.
+
+:copyright: Copyright 2006-2013 by the PyNN team, see AUTHORS.
+:license: CeCILL, see LICENSE for details.
+"""
+
+import numpy
+from pyNN import recording
+from . import simulator
+
+
+class Recorder(recording.Recorder):
+    """
+    Records spikes and state variables from a population at the end of each
+    time step. Spikes are stored as chunks of (index, time) arrays, state
+    variables as one array per sample, for the cells being recorded.
+    """
+    _simulator = simulator
+
+    def __init__(self, population, file=None):
+        recording.Recorder.__init__(self, population, file)
+        self._recorded_indices = {}
+        self._clear_data()
+
+    def _clear_data(self):
+        self._spike_indices = []
+        self._spike_times = []
+        self._samples = dict((variable, []) for variable in self.recorded if variable != 'spikes')
+        self._start_step = simulator.state.n_steps
+
+    def _record(self, variable, new_ids, sampling_interval=None):
+        if sampling_interval is not None:
+            self.sampling_interval = sampling_interval
+        ids = numpy.fromiter(self.recorded[variable], dtype=int,
+                             count=len(self.recorded[variable]))
+        self._recorded_indices[variable] = numpy.sort(ids) - self.population.first_id
+        if variable != 'spikes':
+            self._samples.setdefault(variable, [])
+
+    def _reset(self):
+        self._recorded_indices = {}
+        self._clear_data()
+        self._samples = {}
+
+    def _sample_state(self, variables=None):
+        if variables is None:
+            variables = list(self._samples)
+        for variable in variables:
+            indices = self._recorded_indices[variable]
+            self._samples[variable].append(
+                (indices, self.population._model.state[variable][indices]))
+
+    def _prepare(self):
+        # take the initial sample of the state variables at the start of a
+        # recording segment
+        self._sample_state([variable for variable, samples in self._samples.items()
+                            if len(samples) == 0])
+
+    def _sample(self, spikes):
+        """
+        Record the neurons in `spikes` which fired during the last time step,
+        and sample the state variables if required.
+        """
+        if 'spikes' in self._recorded_indices and spikes.size > 0:
+            indices = self._recorded_indices['spikes']
+            spikes = spikes[numpy.in1d(spikes, indices)]
+            self._spike_indices.append(spikes)
+            self._spike_times.append(simulator.state.t * numpy.ones(spikes.size))
+        if self._samples:
+            sampling_steps = max(int(round(self.sampling_interval/simulator.state.dt)), 1)
+            if (simulator.state.n_steps - self._start_step) % sampling_steps == 0:
+                self._sample_state()
+
+    def _get_spikes(self):
+        if self._spike_indices:
+            return numpy.hstack(self._spike_indices), numpy.hstack(self._spike_times)
+        else:
+            return numpy.zeros((0,), dtype=int), numpy.zeros((0,))
+
+    def _get_spiketimes(self, id):
+        return self._get_all_spiketimes([id])[0]
+
+    def _get_all_spiketimes(self, ids):
+        indices, times = self._get_spikes()
+        return recording.split_by_id(indices, times,
+                                     [int(id) - self.population.first_id for id in ids])
+
+    def _get_all_signals(self, variable, ids, clear=False):
+        if len(ids) == 0:
+            return numpy.array([])
+        columns = numpy.array([int(id) for id in ids]) - self.population.first_id
+        samples = self._samples[variable]
+        signals = numpy.nan * numpy.ones((len(samples), columns.size))
+        for i, (indices, values) in enumerate(samples):
+            if indices.size == 0:
+                continue
+            positions = numpy.searchsorted(indices, columns)
+            positions[positions == indices.size] = 0
+            found = indices[positions] == columns
+            signals[i, found] = values[positions[found]]
+        return signals
+
+    def _local_count(self, variable, filter_ids=None):
+        indices = self._get_spikes()[0]
+        counts = numpy.bincount(indices, minlength=self.population.size)
+        return dict((int(id), int(counts[int(id) - self.population.first_id]))
+                    for id in self.filter_recorded(variable, filter_ids))
+
+    def _clear_simulator(self):
+        self._clear_data()
+        if simulator.state.running:
+            self._sample_state()
@@ -0,0 +1,348 @@
+"""
+Implementation of the "low-level" functionality used by the common
+implementation of the API, for the pure-NumPy reference simulator.
+
+Neurons are updated with a fixed time step, one population at a time, using
+vectorized NumPy operations. Spikes are propagated through connection matrices
+stored in compressed sparse row format, into ring buffers which implement the
+synaptic delays.
+
+Classes and attributes usable by other modules of this package:
+
+    ID                    -- cell identifier class
+    State                 -- holds the simulator state and runs the simulation
+    state                 -- the single instance of State
+    LeakyIntegrateAndFire -- vectorized integrate-and-fire neurons
+    PoissonGenerator      -- vectorized Poisson spike sources
+    SpikeArrayGenerator   -- spike sources emitting spikes at given times
+    Pathway               -- connections between two populations, for spike
+                             propagation
+
+:copyright: Copyright 2006-2013 by the PyNN team, see AUTHORS.
+:license: CeCILL, see LICENSE for details.
+"""
+
+import logging
+from collections import defaultdict
+import numpy
+from pyNN import common
+
+name = "numpy_sim"
+logger = logging.getLogger("PyNN")
+
+
+class ID(int, common.IDMixin):
+    def __init__(self, n):
+        """Create an ID object with numerical value `n`."""
+        int.__init__(n)
+        common.IDMixin.__init__(self)
+
+
+class State(common.control.BaseState):
+    """Represent the simulator state."""
+
+    def __init__(self):
+        common.control.BaseState.__init__(self)
+        self.mpi_rank = 0
+        self.num_processes = 1
+        self.dt = 0.1
+        self.clear()
+
+    @property
+    def t(self):
+        return self.n_steps * self.dt
+
+    def run(self, simtime):
+        self.run_until(self.t + simtime)
+
+    def run_until(self, tstop):
+        self.running = True
+        n_steps = int(round((tstop - self.t)/self.dt))
+        self._prepare()
+        for i in range(n_steps):
+            self._step()
+
+    def _prepare(self):
+        """
+        Build the data structures needed for the simulation, taking account
+        of any changes to the network since the last call to `run()`.
+        """
+        self._pathways = defaultdict(list)
+        max_delay_steps = defaultdict(lambda: 1)
+        for projection in self.projections:
+            for pathway in projection._get_pathways(self.dt):
+                self._pathways[pathway.source].append(pathway)
+                max_delay_steps[pathway.target] = max(max_delay_steps[pathway.target],
+                                                      pathway.max_delay_steps)
+        for population in self.populations:
+            model = population._model
+            model.set_buffer_length(max_delay_steps[model] + 1, self.n_steps)
+            model.prepare(self.n_steps, self.dt)
+            population.recorder._prepare()
+
+    def _step(self):
+        """Advance the simulation by one time step."""
+        step = self.n_steps
+        t = self.t
+        for population in self.populations:
+            population._model.i_inj[:] = 0.0
+        for current_source in self.current_sources:
+            current_source._inject(t)
+        spikes = [(population, population._model.update(step, self.dt).nonzero()[0])
+                  for population in self.populations]
+        self.n_steps += 1
+        for population, indices in spikes:
+            if indices.size > 0:
+                for pathway in self._pathways[population._model]:
+                    pathway.propagate(indices, step)
+            population.recorder._sample(indices)
+
+    def clear(self):
+        self.populations = []
+        self.projections = []
+        self.current_sources = []
+        self.recorders = set([])
+        self.id_counter = 42
+        self.segment_counter = -1
+        self.rng = numpy.random.RandomState()
+        self.reset()
+
+    def reset(self):
+        """Reset the state of the current network to time t = 0."""
+        self.running = False
+        self.n_steps = 0
+        self.t_start = 0
+        self.segment_counter += 1
+        for population in self.populations:
+            population._reset()
+
+
+class Model(object):
+    """
+    Base class for vectorized models of a whole population of neurons.
+
+    The state variables are held in the dict `state`, of 1D arrays. Synaptic
+    input for each receptor type is accumulated in a ring buffer with one row
+    per time step, so that spikes can be delivered with a delay.
+    """
+    receptor_types = ()
+    state_variables = ()
+
+    def __init__(self, population):
+        self.population = population
+        self.size = population.size
+        self.state = dict((name, numpy.zeros(self.size)) for name in self.state_variables)
+        self.i_inj = numpy.zeros(self.size)
+        self.buffers = dict((receptor_type, numpy.zeros((1, self.size)))
+                            for receptor_type in self.receptor_types)
+
+    @property
+    def parameters(self):
+        return self.population._parameters
+
+    def set_buffer_length(self, length, step):
+        """
+        Make sure the ring buffers have at least `length` rows, keeping any
+        input which is due to arrive on or after time step `step`.
+        """
+        for receptor_type, buffer in self.buffers.items():
+            old_length = buffer.shape[0]
+            if length > old_length:
+                new_buffer = numpy.zeros((length, self.size))
+                for i in range(step, step + old_length):
+                    new_buffer[i % length] = buffer[i % old_length]
+                self.buffers[receptor_type] = new_buffer
+
+    def receive(self, step):
+        """Return the synaptic input arriving at time step `step`."""
+        inputs = {}
+        for receptor_type, buffer in self.buffers.items():
+            slot = step % buffer.shape[0]
+            inputs[receptor_type] = buffer[slot].copy()
+            buffer[slot] = 0.0
+        return inputs
+
+    def prepare(self, step, dt):
+        pass
+
+    def reset(self):
+        for buffer in self.buffers.values():
+            buffer[:] = 0.0
+
+    def update(self, step, dt):
+        """
+        Advance the state of all neurons by one time step, starting at
+        time step `step`. Return a boolean array indicating which neurons
+        spiked.
+        """
+        raise NotImplementedError
+
+
+class LeakyIntegrateAndFire(Model):
+    """
+    Leaky integrate-and-fire neurons with fixed threshold and current- or
+    conductance-based synapses, with either exponential or alpha-function
+    time course.
+
+    The membrane equation is integrated with the exponential Euler method,
+    synaptic variables are integrated exactly.
+    """
+    receptor_types = ('excitatory', 'inhibitory')
+
+    def __init__(self, population):
+        celltype = population.celltype
+        self.conductance_based = celltype.conductance_based
+        self.synapse_shape = celltype.synapse_shape
+        if self.conductance_based:
+            synaptic_variables = ('gsyn_exc', 'gsyn_inh')
+        else:
+            synaptic_variables = ('isyn_exc', 'isyn_inh')
+        self.synaptic_variables = dict(zip(self.receptor_types, synaptic_variables))
+        self.state_variables = ('v',) + synaptic_variables
+        Model.__init__(self, population)
+        self.time_constants = {'excitatory': 'tau_syn_E', 'inhibitory': 'tau_syn_I'}
+        self.reset()
+
+    def reset(self):
+        Model.reset(self)
+        self.refractory_until = numpy.zeros(self.size, dtype=int)
+        # the alpha function is obtained from a second, exponentially-decaying
+        # variable, which feeds the synaptic variable
+        self.rise = dict((receptor_type, numpy.zeros(self.size))
+                         for receptor_type in self.receptor_types)
+
+    def update(self, step, dt):
+        p = self.parameters
+        inputs = self.receive(step)
+        for receptor_type, name in self.synaptic_variables.items():
+            if self.synapse_shape == 'alpha':
+                self.rise[receptor_type] += inputs[receptor_type] * numpy.e / p[self.time_constants[receptor_type]]
+            else:
+                self.state[name] += inputs[receptor_type]
+
+        v = self.state['v']
+        g_leak = p['cm']/p['tau_m']
+        i_total = p['i_offset'] + self.i_inj
+        if self.conductance_based:
+            g_exc = self.state['gsyn_exc']
+            g_inh = self.state['gsyn_inh']
+            g_total = g_leak + g_exc + g_inh
+            v_inf = (g_leak*p['v_rest'] + g_exc*p['e_rev_E'] + g_inh*p['e_rev_I'] + i_total)/g_total
+        else:
+            g_total = g_leak
+            v_inf = p['v_rest'] + (i_total + self.state['isyn_exc'] + self.state['isyn_inh'])/g_leak
+        v_new = v_inf + (v - v_inf)*numpy.exp(-dt*g_total/p['cm'])
+        refractory = step < self.refractory_until
+        v_new = numpy.where(refractory, p['v_reset'], v_new)
+        spikes = (v_new >= p['v_thresh']) & ~refractory
+        v[:] = numpy.where(spikes, p['v_reset'], v_new)
+        refractory_steps = numpy.round(p['tau_refrac']/dt).astype(int) * numpy.ones(self.size, dtype=int)
+        self.refractory_until[spikes] = step + 1 + refractory_steps[spikes]
+
+        for receptor_type, name in self.synaptic_variables.items():
+            decay = numpy.exp(-dt/p[self.time_constants[receptor_type]])
+            if self.synapse_shape == 'alpha':
+                rise = self.rise[receptor_type]
+                self.state[name][:] = (self.state[name] + dt*rise)*decay
+                rise *= decay
+            else:
+                self.state[name] *= decay
+        return spikes
+
+
+class PoissonGenerator(Model):
+    """Spike sources generating independent Poisson spike trains."""
+
+    def update(self, step, dt):
+        p = self.parameters
+        t = step*dt
+        active = (t >= p['start']) & (t < p['start'] + p['duration'])
+        probability = p['rate']*dt/1000.0
+        return active & (state.rng.uniform(size=self.size) < probability)
+
+
+class SpikeArrayGenerator(Model):
+    """
+    Spike sources emitting spikes at pre-defined times, rounded up to the next
+    time step.
+    """
+
+    def prepare(self, step, dt):
+        steps = []
+        cells = []
+        for i, spike_times in enumerate(self.parameters['spike_times']):
+            # a spike at time t is emitted during the time step ending at t
+            spike_steps = numpy.ceil(numpy.asarray(spike_times.value)/dt - 1e-9).astype(int) - 1
+            spike_steps = spike_steps[spike_steps >= step]
+            steps.append(spike_steps)
+            cells.append(i * numpy.ones(spike_steps.size, dtype=int))
+        if steps:
+            steps = numpy.hstack(steps)
+            cells = numpy.hstack(cells)
+        else:
+            steps = cells = numpy.zeros((0,), dtype=int)
+        order = numpy.argsort(steps, kind='mergesort')
+        self._spike_steps = steps[order]
+        self._spike_cells = cells[order]
+        self._next = 0
+
+    def update(self, step, dt):
+        spikes = numpy.zeros(self.size, dtype=bool)
+        end = numpy.searchsorted(self._spike_steps, step, 'right')
+        spikes[self._spike_cells[self._next:end]] = True
+        self._next = end
+        return spikes
+
+
+def _add_at(array, flat_indices, values):
+    """
+    Add `values` to the C-contiguous `array` at `flat_indices`, summing the
+    values for repeated indices (as `numpy.add.at()`, which needs NumPy 1.8).
+    """
+    order = numpy.argsort(flat_indices, kind='mergesort')
+    flat_indices = flat_indices[order]
+    starts = numpy.flatnonzero(numpy.hstack(([True], numpy.diff(flat_indices) != 0)))
+    array.flat[flat_indices[starts]] += numpy.add.reduceat(values[order], starts)
+
+
+class Pathway(object):
+    """
+    The connections of one receptor type from the population modelled by
+    `source` to the population modelled by `target`, stored in compressed
+    sparse row format with one row per pre-synaptic neuron.
+    """
+
+    def __init__(self, source, target, receptor_type, presynaptic_indices,
+                 postsynaptic_indices, weights, delays, dt):
+        self.source = source
+        self.target = target
+        self.receptor_type = receptor_type
+        order = numpy.argsort(presynaptic_indices, kind='mergesort')
+        self.indptr = numpy.searchsorted(presynaptic_indices[order],
+                                         numpy.arange(source.size + 1))
+        self.targets = postsynaptic_indices[order]
+        self.weights = weights[order]
+        self.delay_steps = numpy.maximum(numpy.round(delays[order]/dt).astype(int), 1)
+        self.max_delay_steps = self.delay_steps.max() if self.delay_steps.size else 1
+
+    def propagate(self, spikes, step):
+        """
+        Add the weights of the connections from the neurons `spikes`, which
+        fired during time step `step`, to the input buffer of the target
+        population.
+        """
+        starts = self.indptr[spikes]
+        counts = self.indptr[spikes + 1] - starts
+        total = counts.sum()
+        if total == 0:
+            return
+        # indices of all the connections from the spiking neurons
+        offsets = numpy.cumsum(counts) - counts
+        connections = numpy.repeat(starts - offsets, counts) + numpy.arange(total)
+        buffer = self.target.buffers[self.receptor_type]
+        slots = (step + self.delay_steps[connections]) % buffer.shape[0]
+        _add_at(buffer, slots * buffer.shape[1] + self.targets[connections],
+                self.weights[connections])
+
+
+state = State()
@@ -0,0 +1,182 @@
+# encoding: utf-8
+"""
+Standard cells, synapses and current sources for the numpy_sim module.
+
+Native parameter names and units are the same as the standard ones.
+
+:copyright: Copyright 2006-2013 by the PyNN team, see AUTHORS.
+:license: CeCILL, see LICENSE for details.
+"""
+
+import logging
+import numpy
+from pyNN.standardmodels import cells, synapses, electrodes, build_translations, StandardCurrentSource
+from pyNN.parameters import ParameterSpace, Sequence
+from . import simulator
+from .simulator import state
+
+logger = logging.getLogger("PyNN")
+
+
+def _identity_translations(standard_class):
+    return build_translations(*[(name, name)
+                                for name in standard_class.default_parameters])
+
+
+class IF_curr_alpha(cells.IF_curr_alpha):
+    __doc__ = cells.IF_curr_alpha.__doc__
+
+    translations = _identity_translations(cells.IF_curr_alpha)
+    model = simulator.LeakyIntegrateAndFire
+    synapse_shape = 'alpha'
+
+
+class IF_curr_exp(cells.IF_curr_exp):
+    __doc__ = cells.IF_curr_exp.__doc__
+
+    translations = _identity_translations(cells.IF_curr_exp)
+    model = simulator.LeakyIntegrateAndFire
+    synapse_shape = 'exp'
+
+
+class IF_cond_alpha(cells.IF_cond_alpha):
+    __doc__ = cells.IF_cond_alpha.__doc__
+
+    translations = _identity_translations(cells.IF_cond_alpha)
+    model = simulator.LeakyIntegrateAndFire
+    synapse_shape = 'alpha'
+
+
+class IF_cond_exp(cells.IF_cond_exp):
+    __doc__ = cells.IF_cond_exp.__doc__
+
+    translations = _identity_translations(cells.IF_cond_exp)
+    model = simulator.LeakyIntegrateAndFire
+    synapse_shape = 'exp'
+
+
+class SpikeSourcePoisson(cells.SpikeSourcePoisson):
+    __doc__ = cells.SpikeSourcePoisson.__doc__
+
+    translations = _identity_translations(cells.SpikeSourcePoisson)
+    model = simulator.PoissonGenerator
+
+
+class SpikeSourceArray(cells.SpikeSourceArray):
+    __doc__ = cells.SpikeSourceArray.__doc__
+
+    translations = _identity_translations(cells.SpikeSourceArray)
+    model = simulator.SpikeArrayGenerator
+
+
+class NumpyCurrentSource(StandardCurrentSource):
+    """Base class for a source of current to be injected into a neuron."""
+
+    def __init__(self, **parameters):
+        super(StandardCurrentSource, self).__init__(**parameters)
+        self._targets = []
+        state.current_sources.append(self)
+        parameter_space = ParameterSpace(self.default_parameters,
+                                         self.get_schema(),
+                                         shape=(1,))
+        parameter_space.update(**parameters)
+        parameter_space = self.translate(parameter_space)
+        self.set_native_parameters(parameter_space)
+
+    def set_native_parameters(self, parameters):
+        parameters.evaluate(simplify=True)
+        for name, value in parameters.items():
+            if isinstance(value, Sequence):
+                value = value.value
+            object.__setattr__(self, name, value)
+
+    def get_native_parameters(self):
+        return ParameterSpace(dict((name, getattr(self, name))
+                                   for name in self.get_native_names()),
+                              shape=(1,))
+
+    def inject_into(self, cells):
+        __doc__ = StandardCurrentSource.inject_into.__doc__
+        for cell in cells:
+            if not cell.celltype.injectable:
+                raise TypeError("Can't inject current into a spike source.")
+        targets = {}
+        for cell in cells:
+            targets.setdefault(cell.parent, []).append(cell.parent.id_to_index(cell))
+        self._targets.extend((population, numpy.array(indices, dtype=int))
+                             for population, indices in targets.items())
+
+    def _inject(self, t):
+        amplitude = self._amplitude(t)
+        if amplitude != 0.0:
+            for population, indices in self._targets:
+                population._model.i_inj[indices] += amplitude
+
+    def _amplitude(self, t):
+        """Return the amplitude of the current (in nA) at time `t`."""
+        raise NotImplementedError
+
+
+class DCSource(NumpyCurrentSource, electrodes.DCSource):
+    __doc__ = electrodes.DCSource.__doc__
+
+    translations = _identity_translations(electrodes.DCSource)
+
+    def _amplitude(self, t):
+        if self.start <= t < self.stop:
+            return self.amplitude
+        return 0.0
+
+
+class StepCurrentSource(NumpyCurrentSource, electrodes.StepCurrentSource):
+    __doc__ = electrodes.StepCurrentSource.__doc__
+
+    translations = _identity_translations(electrodes.StepCurrentSource)
+
+    def _amplitude(self, t):
+        i = numpy.searchsorted(self.times, t + 1e-9, 'right') - 1
+        if i < 0:
+            return 0.0
+        return self.amplitudes[i]
+
+
+class ACSource(NumpyCurrentSource, electrodes.ACSource):
+    __doc__ = electrodes.ACSource.__doc__
+
+    translations = _identity_translations(electrodes.ACSource)
+
+    def _amplitude(self, t):
+        if self.start <= t < self.stop:
+            return self.offset + self.amplitude * numpy.sin(t*2*numpy.pi*self.frequency/1000. + 2*numpy.pi*self.phase/360)
+        return 0.0
+
+
+class NoisyCurrentSource(NumpyCurrentSource, electrodes.NoisyCurrentSource):
+    __doc__ = electrodes.NoisyCurrentSource.__doc__
+
+    translations = _identity_translations(electrodes.NoisyCurrentSource)
+
+    def __init__(self, **parameters):
+        NumpyCurrentSource.__init__(self, **parameters)
+        self._value = self.mean
+        self._next_update = self.start
+
+    def _amplitude(self, t):
+        if self.start <= t < self.stop:
+            # a new value is drawn every `dt` ms
+            if t + 1e-9 >= self._next_update:
+                self._value = self.mean + self.stdev*state.rng.normal()
+                self._next_update = t + self.dt
+            return self._value
+        return 0.0
+
+
+class StaticSynapse(synapses.StaticSynapse):
+    __doc__ = synapses.StaticSynapse.__doc__
+    translations = build_translations(
+        ('weight', 'weight'),
+        ('delay', 'delay'),
+    )
+
+    def _get_minimum_delay(self):
+        return state.min_delay
@@ -72,13 +72,26 @@ class LazyArray(larray):
             self.base_value[addr] = new_value
             self.operations = []
 
-    def by_column(self, mask=None):
+    def by_column(self, mask=None, block_size=1):
         """
         Iterate over the columns of the array. Columns will be yielded either
         as a 1D array or as a single value (for a flat array).
 
         `mask`: either `None` or a boolean array indicating which columns should be included.
+
+        `block_size`: number of columns to evaluate at once. Columns are still
+                      yielded one at a time, and in the same order, and random
+                      numbers are drawn in the same order as for `block_size=1`.
         """
+        if block_size > 1:
+            for column_indices, block in self.by_column_block(block_size, mask):
+                if isinstance(block, numpy.ndarray) and block.ndim == 2:
+                    for k in range(column_indices.size):
+                        yield block[:, k]
+                else:
+                    for k in range(column_indices.size):
+                        yield block
+            return
         column_indices = numpy.arange(self.ncols)
         if mask is not None:
             assert len(mask) == self.ncols
@@ -98,6 +111,47 @@ class LazyArray(larray):
             for j in column_indices:
                 yield self._partially_evaluate((slice(None), j), simplify=True)
 
+    def by_column_block(self, block_size, mask=None):
+        """
+        Iterate over blocks of (at most) `block_size` consecutive columns.
+
+        Yields `(column_indices, values)` tuples, where `values` is either a 2D
+        array of shape `(nrows, column_indices.size)` or a single value (for a
+        flat array).
+
+        `mask`: either `None` or a boolean array indicating which columns should be included.
+
+        Random numbers are drawn column by column, as for :meth:`by_column`:
+        with a parallel-safe RNG, values are drawn for all columns, including
+        those excluded by `mask`.
+        """
+        all_columns = numpy.arange(self.ncols)
+        if mask is None:
+            columns = all_columns
+        else:
+            assert len(mask) == self.ncols
+            columns = all_columns[mask]
+        if isinstance(self.base_value, RandomDistribution):
+            block_mask = None
+            if mask is not None and self.base_value.rng.parallel_safe:
+                columns = all_columns
+                block_mask = mask
+            for start in range(0, columns.size, block_size):
+                block_columns = columns[start:start + block_size]
+                values = self.base_value.next(self.nrows * block_columns.size, mask_local=False)
+                values = values.reshape((block_columns.size, self.nrows)).T  # columns are filled first
+                if block_mask is not None:
+                    local = block_mask[block_columns]
+                    block_columns = block_columns[local]
+                    values = values[:, local]
+                if block_columns.size > 0:
+                    yield block_columns, self._apply_operations(values, (slice(None), block_columns))
+        else:
+            for start in range(0, columns.size, block_size):
+                block_columns = columns[start:start + block_size]
+                yield block_columns, self._partially_evaluate((slice(None), block_columns),
+                                                              simplify=True)
+
 
 class Sequence(object):
     """
@@ -0,0 +1,233 @@
+"""
+Opt-in instrumentation of the main phases of building and running a network.
+
+When profiling is enabled, spans emitted from within PyNN (cell creation,
+connector evaluation, calls to the backend to create connections, parameter
+translation, running and data retrieval) are aggregated by name, recording the
+number of calls, the cumulative time, the time spent outside any nested span
+("self" time) and, if requested, the net memory allocated. A report is written
+when `end()` is called.
+
+Profiling is switched on with ``setup(profile=True)``, by calling
+:func:`enable`, or by setting the environment variable ``PYNN_PROFILE``
+(to ``1`` or to the name of the file the report should be written to).
+
+When profiling is not enabled, the overhead of a span is a single function
+call.
+
+:copyright: Copyright 2006-2013 by the PyNN team, see AUTHORS.
+:license: CeCILL, see LICENSE for details.
+"""
+
+import os
+import sys
+import time
+import functools
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+_enabled = False
+_track_memory = False
+_started_tracemalloc = False  # True if tracemalloc was started by enable()
+_report_file = None
+_stats = {}
+_active = []
+
+
+class PhaseStats(object):
+    """Aggregated measurements for all the spans with a given name."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.self_time = 0.0
+        self.memory = 0
+
+    def as_dict(self):
+        return {"count": self.count, "total_time": self.total_time,
+                "self_time": self.self_time, "memory": self.memory}
+
+
+class _Span(object):
+
+    def __init__(self, name):
+        self.name = name
+        self.child_time = 0.0
+
+    def __enter__(self):
+        # a span nested in a span of the same name (e.g. a connect() method
+        # calling that of its parent class) is only counted once
+        self.counted = self.name not in [span.name for span in _active]
+        _active.append(self)
+        if _track_memory:
+            self.start_memory = tracemalloc.get_traced_memory()[0]
+        self.start_time = time.time()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        elapsed_time = time.time() - self.start_time
+        _active.pop()
+        if self.counted:
+            stats = _stats.setdefault(self.name, PhaseStats())
+            stats.count += 1
+            stats.total_time += elapsed_time
+            stats.self_time += elapsed_time - self.child_time
+            if _track_memory:
+                stats.memory += tracemalloc.get_traced_memory()[0] - self.start_memory
+            for span in reversed(_active):
+                if span.counted:
+                    span.child_time += elapsed_time
+                    break
+        return False
+
+
+class _NullSpan(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        return False
+
+_null_span = _NullSpan()
+
+
+def span(name):
+    """
+    Return a context manager which measures the code it encloses, if profiling
+    is enabled, and aggregates the measurements under `name`.
+    """
+    if _enabled:
+        return _Span(name)
+    return _null_span
+
+
+def profiled(name):
+    """
+    Decorator which wraps a function or method in a span called `name`.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapped(*args, **kwargs):
+            if _enabled:
+                with _Span(name):
+                    return func(*args, **kwargs)
+            return func(*args, **kwargs)
+        return wrapped
+    return decorator
+
+
+def enable(track_memory=False, filename=None):
+    """
+    Start aggregating the measurements made by spans.
+
+    If `track_memory` is True, the net memory allocated within each span is
+    also measured (this requires Python 3, and slows down memory allocation,
+    which inflates the times measured). The report written by
+    :func:`write_report` goes to `filename` if given, otherwise to standard
+    output.
+    """
+    global _enabled, _track_memory, _started_tracemalloc, _report_file
+    _enabled = True
+    _report_file = filename
+    _track_memory = bool(track_memory and tracemalloc)
+    if _track_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracemalloc = True
+
+
+def disable():
+    """
+    Stop aggregating measurements. Any measurements already made are kept.
+    Memory tracing is only stopped if it was started by :func:`enable`.
+    """
+    global _enabled, _track_memory, _started_tracemalloc
+    _enabled = False
+    if _started_tracemalloc:
+        tracemalloc.stop()
+        _started_tracemalloc = False
+    _track_memory = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def clear():
+    """Discard all measurements."""
+    _stats.clear()
+
+
+def get_stats():
+    """
+    Return the measurements made on this MPI node, as a dict of dicts,
+    keyed by span name.
+    """
+    return dict((name, stats.as_dict()) for name, stats in _stats.items())
+
+
+def _mpi_comm():
+    # only use MPI if it has already been initialized by the simulator or by
+    # the user, to avoid importing mpi4py in serial simulations
+    MPI = sys.modules.get("mpi4py.MPI")
+    if MPI is not None and MPI.COMM_WORLD.size > 1:
+        return MPI.COMM_WORLD
+    return None
+
+
+def gather_stats():
+    """
+    Return a list containing the measurements from each MPI node, indexed by
+    rank, on the master node, and None on the other nodes.
+    """
+    comm = _mpi_comm()
+    if comm is None:
+        return [get_stats()]
+    return comm.gather(get_stats(), root=0)
+
+
+def format_report(all_stats):
+    """Format the measurements from each MPI node as a text table."""
+    lines = ["PyNN profile",
+             "%-36s %4s %9s %11s %11s %12s" % ("phase", "rank", "calls", "total (s)",
+                                                "self (s)", "memory (MB)")]
+    names = sorted(set(name for stats in all_stats for name in stats),
+                   key=lambda name: -max(stats.get(name, {}).get("total_time", 0.0)
+                                         for stats in all_stats))
+    for name in names:
+        for rank, stats in enumerate(all_stats):
+            if name in stats:
+                s = stats[name]
+                if _track_memory or s["memory"]:
+                    memory = "%12.3f" % (s["memory"] / 1048576.0)
+                else:
+                    memory = "%12s" % "-"
+                lines.append("%-36s %4d %9d %11.4f %11.4f %s" % (name, rank, s["count"],
+                                                                 s["total_time"],
+                                                                 s["self_time"], memory))
+    return "\n".join(lines)
+
+
+def write_report():
+    """
+    Gather the measurements from all MPI nodes and write the report, from the
+    master node only. Does nothing if profiling is not enabled.
+    """
+    if not _enabled:
+        return
+    all_stats = gather_stats()
+    if all_stats is None:  # not the master node
+        return
+    report = format_report(all_stats)
+    if _report_file:
+        with open(_report_file, "w") as fp:
+            fp.write(report + "\n")
+    else:
+        sys.stdout.write(report + "\n")
+
+
+_env = os.environ.get("PYNN_PROFILE")
+if _env and _env != "0":
+    enable(filename=None if _env == "1" else _env)
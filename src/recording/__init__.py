@@ -13,9 +13,17 @@ internal use.
 import logging
 import numpy
 import os
+import atexit
+import shutil
+import tempfile
 from copy import copy
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
 from collections import defaultdict
-from pyNN import errors
+from pyNN import errors, profiling
+from pyNN.recording.streaming import StreamingStore
 import neo
 from datetime import datetime
 import quantities as pq
@@ -28,13 +36,45 @@ logger = logging.getLogger("PyNN")
 
 MPI_ROOT = 0
 
+_DEFAULT = object()  # marks an argument which was not given, where None has a meaning
+
 
 def get_mpi_comm():
     try:
         from mpi4py import MPI
     except ImportError:
         raise Exception("Trying to gather data without MPI installed. If you are not running a distributed simulation, this is a bug in PyNN.")
-    return MPI.COMM_WORLD, {'DOUBLE': MPI.DOUBLE, 'SUM': MPI.SUM}
+    return MPI.COMM_WORLD, {'DOUBLE': MPI.DOUBLE, 'INT64': MPI.INT64_T, 'SUM': MPI.SUM}
+
+def split_by_id(ids, values, desired_ids):
+    """
+    Split `values` into one array for each id in `desired_ids`, according to
+    the corresponding entries of `ids` (e.g. the senders of recorded events).
+
+    Uses a single stable sort of `ids`, rather than a boolean mask for each id,
+    so the cost is O(N log N) rather than O(N_ids * N). Within each array,
+    values keep their original order.
+    """
+    order = numpy.argsort(ids, kind='mergesort')
+    sorted_ids = numpy.asarray(ids)[order]
+    keys = numpy.fromiter((int(id) for id in desired_ids), dtype=int,
+                          count=len(desired_ids))
+    left = numpy.searchsorted(sorted_ids, keys, 'left')
+    right = numpy.searchsorted(sorted_ids, keys, 'right')
+    sorted_values = numpy.asarray(values)[order]
+    return [sorted_values[l:r] for l, r in zip(left, right)]
+
+def count_by_id(ids, desired_ids):
+    """
+    Return a dict containing the number of occurrences in `ids` of each id in
+    `desired_ids` (e.g. the number of spikes emitted by each cell).
+    """
+    sorted_ids = numpy.sort(ids)
+    keys = numpy.fromiter((int(id) for id in desired_ids), dtype=int,
+                          count=len(desired_ids))
+    counts = (numpy.searchsorted(sorted_ids, keys, 'right')
+              - numpy.searchsorted(sorted_ids, keys, 'left'))
+    return dict(zip(keys.tolist(), counts.tolist()))
 
 def rename_existing(filename):
     if os.path.exists(filename):
@@ -77,19 +117,127 @@ def gather_dict(D, all=False):
     return D
 
 
+def gather_arrays(arrays, all=False):
+    """
+    Gather 1D NumPy arrays from all MPI nodes onto the root node, or onto all
+    nodes if `all` is True.
+
+    `arrays` is a list of 1D arrays, which must contain the same number of
+    arrays, of the same kinds (integer or floating point), on all nodes. The
+    sizes of all the arrays are exchanged first, then each array is sent as a
+    contiguous binary buffer with `Gatherv` (or `Allgatherv`), rather than
+    being pickled. Returns a list of arrays concatenated in rank order; nodes
+    which do not receive the data get their local arrays back.
+    """
+    mpi_comm, mpi_flags = get_mpi_comm()
+    local_sizes = [numpy.asarray(data).size for data in arrays]
+    if all:
+        sizes = mpi_comm.allgather(local_sizes)
+    else:
+        sizes = mpi_comm.gather(local_sizes, root=MPI_ROOT)
+    receiving = all or mpi_comm.rank == MPI_ROOT
+    gathered = []
+    for i, data in enumerate(arrays):
+        if numpy.asarray(data).dtype.kind in 'biu':
+            data = numpy.ascontiguousarray(data, dtype=numpy.int64)
+            mpi_type = mpi_flags['INT64']
+        else:
+            data = numpy.ascontiguousarray(data, dtype=float)
+            mpi_type = mpi_flags['DOUBLE']
+        if receiving:
+            counts = numpy.array([node_sizes[i] for node_sizes in sizes], dtype=int)
+            displacements = numpy.hstack(([0], numpy.cumsum(counts)[:-1]))
+            result = numpy.empty(counts.sum(), dtype=data.dtype)
+            receive_buffer = [result, (counts, displacements), mpi_type]
+        else:
+            result = data
+            receive_buffer = None
+        if all:
+            mpi_comm.Allgatherv([data, mpi_type], receive_buffer)
+        else:
+            mpi_comm.Gatherv([data, mpi_type], receive_buffer, root=MPI_ROOT)
+        gathered.append(result)
+    return gathered
+
+
 def gather_blocks(data):
-    """Gather Neo Blocks"""
+    """
+    Gather Neo Blocks.
+
+    Only a small header describing the recorded signals is pickled; spike
+    times and signal values are sent as binary arrays with `gather_arrays()`.
+    In the merged block, spike trains are sorted by source index and the
+    channels of each analog signal array by channel index.
+    """
     mpi_comm, mpi_flags = get_mpi_comm()
     assert isinstance(data, neo.Block)
-    # for now, use gather_dict, which will probably be slow. Can optimize later
-    D = {mpi_comm.rank: data}
-    D = gather_dict(D)
-    blocks = D.values()
+    # every node must take part in the gather for every signal, so we first
+    # find out which signals have been recorded on any node
+    header = [dict((signal.name, (signal.units, signal.t_start, signal.sampling_period,
+                                  signal.annotations.get('source_population')))
+                   for signal in segment.analogsignalarrays)
+              for segment in data.segments]
+    all_headers = mpi_comm.allgather(header)
+    merged_segments = []
+    for k, segment in enumerate(data.segments):
+        spiketrains = segment.spiketrains
+        spike_times = [st.rescale(pq.ms).magnitude for st in spiketrains]
+        columns = gather_arrays([
+            numpy.hstack(spike_times) if spike_times else numpy.zeros((0,)),
+            numpy.array([st.size for st in spiketrains], dtype=int),
+            numpy.array([st.annotations['source_id'] for st in spiketrains], dtype=int),
+            numpy.array([st.annotations['source_index'] for st in spiketrains], dtype=int),
+            numpy.array([float(st.t_start.rescale(pq.ms)) for st in spiketrains]),
+            numpy.array([float(st.t_stop.rescale(pq.ms)) for st in spiketrains])])
+        if mpi_comm.rank == MPI_ROOT:
+            times, sizes, source_ids, source_indices, t_starts, t_stops = columns
+            trains = numpy.split(times, numpy.cumsum(sizes)[:-1]) if sizes.size else []
+            source_population = data.name
+            new_spiketrains = [neo.SpikeTrain(trains[i],
+                                              t_start=t_starts[i],
+                                              t_stop=t_stops[i],
+                                              units='ms',
+                                              source_population=source_population,
+                                              source_id=int(source_ids[i]),
+                                              source_index=int(source_indices[i]))
+                               for i in numpy.argsort(source_indices, kind='mergesort')]
+        signal_info = {}
+        for node_header in all_headers:
+            signal_info.update(node_header[k])
+        new_signals = []
+        for name in sorted(signal_info):
+            local_signals = [signal for signal in segment.analogsignalarrays if signal.name == name]
+            if local_signals:
+                signal = local_signals[0]
+                columns = [signal.magnitude.T.flatten(),
+                           numpy.asarray(signal.channel_index, dtype=int),
+                           numpy.asarray(signal.annotations['source_ids'], dtype=int)]
+            else:
+                columns = [numpy.zeros((0,)), numpy.zeros((0,), dtype=int), numpy.zeros((0,), dtype=int)]
+            values, channel_indices, source_ids = gather_arrays(columns)
+            if mpi_comm.rank == MPI_ROOT and channel_indices.size > 0:
+                units, t_start, sampling_period, source_population = signal_info[name]
+                values = values.reshape((channel_indices.size, -1)).T
+                order = numpy.argsort(channel_indices, kind='mergesort')
+                new_signals.append(
+                    neo.AnalogSignalArray(
+                        values[:, order],
+                        units=units,
+                        t_start=t_start,
+                        sampling_period=sampling_period,
+                        name=name,
+                        source_population=source_population,
+                        channel_index=channel_indices[order],
+                        source_ids=source_ids[order]))
+        if mpi_comm.rank == MPI_ROOT:
+            new_segment = copy(segment)  # shallow copy
+            new_segment.spiketrains = new_spiketrains
+            new_segment.analogsignalarrays = new_signals
+            merged_segments.append(new_segment)
     merged = data
-    if mpi_comm.rank == MPI_ROOT:    
-        merged = blocks[0]
-        for block in blocks[1:]:
-            merged.merge(block)
+    if mpi_comm.rank == MPI_ROOT:
+        merged = copy(data)
+        merged.segments = merged_segments
     return merged
 
 
@@ -147,26 +295,85 @@ def filter_by_variables(segment, variables):
 
 
 class DataCache(object):
-    # primitive implementation for now, storing in memory - later can consider caching to disk
-    def __init__(self):
-        self._data = []
+    """
+    Store for the recording segments completed by `reset()`.
+
+    The `max_in_memory` most recently used segments are kept in memory. Older
+    segments are pickled to files in a temporary directory, and are reloaded
+    transparently when iterating over the cache. Set `max_in_memory` to `None`
+    to keep all segments in memory; if it is not given, the class attribute is
+    used.
+    """
+    max_in_memory = 10
+
+    def __init__(self, max_in_memory=_DEFAULT):
+        if max_in_memory is not _DEFAULT:
+            self.max_in_memory = max_in_memory
+        self._directory = None
+        self._counter = 0
+        self._keys = []
+        self._in_memory = {}
+        self._recently_used = []  # keys of the segments in memory, least recently used first
+        self._on_disk = {}
 
     def __iter__(self):
-        return iter(self._data)
+        for key in list(self._keys):
+            yield self._load(key)
+
+    def __len__(self):
+        return len(self._keys)
 
     def store(self, obj):
-        if obj not in self._data:
+        if not any(obj is segment for segment in self._in_memory.values()):
             logger.debug("Adding %s to cache" % obj)
-            self._data.append(obj)
+            key = self._counter
+            self._counter += 1
+            self._keys.append(key)
+            self._in_memory[key] = obj
+            self._recently_used.append(key)
+            self._evict()
+
+    def _load(self, key):
+        if key in self._in_memory:
+            obj = self._in_memory[key]
+            self._recently_used.remove(key)
+        else:
+            logger.debug("Reloading cached segment from %s" % self._on_disk[key])
+            with open(self._on_disk[key], 'rb') as f:
+                obj = pickle.load(f)
+            self._in_memory[key] = obj
+        self._recently_used.append(key)
+        self._evict()
+        return obj
+
+    def _evict(self):
+        if self.max_in_memory is None:
+            return
+        while len(self._in_memory) > self.max_in_memory:
+            key = self._recently_used.pop(0)
+            obj = self._in_memory.pop(key)
+            if key not in self._on_disk:  # segments are not modified once cached
+                if self._directory is None:
+                    self._directory = tempfile.mkdtemp(prefix="pyNN_cache_")
+                    atexit.register(shutil.rmtree, self._directory, True)
+                filename = os.path.join(self._directory, "segment%06d.pkl" % key)
+                with open(filename, 'wb') as f:
+                    pickle.dump(obj, f, pickle.HIGHEST_PROTOCOL)
+                self._on_disk[key] = filename
 
     def clear(self):
-        self._data = []
+        for filename in self._on_disk.values():
+            os.remove(filename)
+        self._keys = []
+        self._in_memory = {}
+        self._recently_used = []
+        self._on_disk = {}
 
 
 class Recorder(object):
     """Encapsulates data and functions related to recording model variables."""
 
-    def __init__(self, population, file=None):
+    def __init__(self, population, file=None, max_in_memory=_DEFAULT):
         """
         Create a recorder.
 
@@ -176,15 +383,20 @@ class Recorder(object):
             - a file-name,
             - `None` (write to a temporary file)
             - `False` (write to memory).
+        `max_in_memory` -- the number of completed segments kept in memory
+                           (`None` for no limit). See `DataCache`.
         """
         self.file = file
         self.population = population  # needed for writing header information
         self.recorded = defaultdict(set)
-        self.cache = DataCache()
+        self.cache = DataCache(max_in_memory)
         self._simulator.state.recorders.add(self)
         self.clear_flag = False
         self._recording_start_time = self._simulator.state.t * pq.ms
         self.sampling_interval = self._simulator.state.dt
+        self._stream = None
+        self.stream_interval = None  # None when not flushing to the store during run()
+        self._flushed_segments = None  # list of flushed segments, while collected by run_async()
 
     def record(self, variables, ids, sampling_interval=None):
         """
@@ -208,13 +420,131 @@ class Recorder(object):
         self._reset()
         self.recorded = defaultdict(set)
 
+    def stream(self, interval, directory=None):
+        """
+        Switch on streaming mode, in which recorded data are moved from the
+        simulator to an append-only store on disk every `interval` ms during
+        `run()`, so that memory use does not grow with the length of the
+        simulation. The data are read back from disk when requested.
+
+        The store is created in a new sub-directory of `directory` or, if
+        `directory` is not given, in a temporary directory which is deleted on
+        exit.
+        """
+        if self._stream is None:
+            if directory is not None and not os.path.exists(directory):
+                os.makedirs(directory)
+            path = tempfile.mkdtemp(prefix="pyNN_stream_", dir=directory)
+            if directory is None:
+                atexit.register(shutil.rmtree, path, True)
+            self._stream = StreamingStore(path)
+        self.stream_interval = interval
+        self._next_flush = self._simulator.state.t + interval
+
+    def stop_streaming(self):
+        """
+        Switch off streaming mode. Data already moved to the streaming store
+        are still returned by `get()` until the end of the current segment
+        (i.e. until `reset()` or `clear()`), after which the store is deleted.
+        """
+        self.stream_interval = None
+        if self._stream is not None and self._stream.t_start is None:
+            self._close_stream()
+
+    def _close_stream(self):
+        shutil.rmtree(self._stream.directory, True)
+        self._stream = None
+
+    @property
+    def streaming(self):
+        """True if data are moved to the streaming store during `run()`."""
+        return self.stream_interval is not None
+
+    def _stream_callback(self, t):
+        # used as a run() callback
+        if t + 1e-9 >= self._next_flush:
+            self.flush()
+            self._next_flush = t + self.stream_interval
+        return self._next_flush
+
+    def flush(self):
+        """
+        Move the data recorded since the last flush from the simulator to the
+        streaming store.
+        """
+        if self._stream is None or not self.recorded:
+            return
+        segment = self._get_current_segment(clear=True, include_streamed=False)
+        t_start = float(self._recording_start_time.rescale(pq.ms))
+        if segment.spiketrains:
+            ids = numpy.hstack([numpy.repeat(st.annotations['source_id'], st.size)
+                                for st in segment.spiketrains])
+            times = numpy.hstack([st.rescale(pq.ms).magnitude
+                                  for st in segment.spiketrains])
+            self._stream.append_spikes(ids, times, t_start)
+        for signal in segment.analogsignalarrays:
+            self._stream.append_signal(signal.name, signal.annotations['source_ids'],
+                                       signal.magnitude,
+                                       float(signal.t_start.rescale(pq.ms)),
+                                       float(signal.sampling_period.rescale(pq.ms)))
+        self._clear_simulator()
+        self._recording_start_time = self._simulator.state.t * pq.ms
+        if self._flushed_segments is not None:
+            self._flushed_segments.append(segment)
+
+    def _merge_streamed(self, segment):
+        """
+        Prepend the data held in the streaming store to the spike trains and
+        analog signals in `segment`.
+        """
+        t_start = self._stream.t_start * pq.ms
+        if segment.spiketrains:
+            ids, times = self._stream.get_spikes()
+            streamed = split_by_id(ids, times, [st.annotations['source_id']
+                                                for st in segment.spiketrains])
+            segment.spiketrains = [
+                neo.SpikeTrain(numpy.hstack((streamed_times, st.rescale(pq.ms).magnitude)),
+                               t_start=t_start,
+                               t_stop=st.t_stop,
+                               units='ms',
+                               **st.annotations)
+                for st, streamed_times in zip(segment.spiketrains, streamed)]
+        signals = []
+        for signal in segment.analogsignalarrays:
+            if signal.name in self._stream.signals:
+                streamed = self._stream.get_signal(signal.name,
+                                                   signal.annotations['source_ids'])
+                first_sample = int(round(float(((signal.t_start - t_start)/signal.sampling_period).simplified)))
+                overlap = max(streamed.shape[0] - first_sample, 0)
+                signal = neo.AnalogSignalArray(
+                            numpy.vstack((streamed, signal.magnitude[overlap:])),
+                            units=signal.units,
+                            t_start=t_start,
+                            sampling_period=signal.sampling_period,
+                            name=signal.name,
+                            channel_index=signal.channel_index,
+                            **signal.annotations)
+            signals.append(signal)
+        segment.analogsignalarrays = signals
+
     def filter_recorded(self, variable, filter_ids):
         if filter_ids is not None:
             return set(filter_ids).intersection(self.recorded[variable])
         else:
             return self.recorded[variable]
 
-    def _get_current_segment(self, filter_ids=None, variables='all', clear=False):
+    def _get_all_spiketimes(self, ids):
+        """
+        Return a list containing one array of spike times for each id in `ids`.
+
+        Backends which can extract the spike times of many cells in a single
+        pass should override this; the default calls `_get_spiketimes()` for
+        each cell.
+        """
+        return [self._get_spiketimes(id) for id in ids]
+
+    def _get_current_segment(self, filter_ids=None, variables='all', clear=False,
+                             include_streamed=True):
         segment = neo.Segment(name="segment%03d" % self._simulator.state.segment_counter,
                               description=self.population.describe(),
                               rec_datetime=datetime.now()) # would be nice to get the time at the start of the recording, not the end
@@ -224,15 +554,16 @@ class Recorder(object):
         for variable in variables_to_include:
             if variable == 'spikes':
                 t_stop = self._simulator.state.t * pq.ms # must run on all MPI nodes
+                ids = sorted(self.filter_recorded('spikes', filter_ids))
                 segment.spiketrains = [
-                    neo.SpikeTrain(self._get_spiketimes(id),
+                    neo.SpikeTrain(spiketimes,
                                    t_start=self._recording_start_time,
                                    t_stop=t_stop,
                                    units='ms',
                                    source_population=self.population.label,
                                    source_id=int(id),
                                    source_index=self.population.id_to_index(id))
-                    for id in sorted(self.filter_recorded('spikes', filter_ids))]
+                    for id, spiketimes in zip(ids, self._get_all_spiketimes(ids))]
             else:
                 ids = sorted(self.filter_recorded(variable, filter_ids))
                 signal_array = self._get_all_signals(variable, ids, clear=clear)
@@ -258,8 +589,11 @@ class Recorder(object):
                     logger.debug("%d **** ids=%s, channels=%s", mpi_node, source_ids, channel_indices)
                     assert segment.analogsignalarrays[0].t_stop - current_time < 2*sampling_period
                     # need to add `Unit` and `RecordingChannelGroup` objects
+        if include_streamed and self._stream is not None and self._stream.t_start is not None:
+            self._merge_streamed(segment)
         return segment
 
+    @profiling.profiled("Recorder.get")
     def get(self, variables, gather=False, filter_ids=None, clear=False,
             annotations=None):
         """Return the recorded data as a Neo `Block`."""
@@ -289,6 +623,12 @@ class Recorder(object):
         self.clear_flag = True
         self._recording_start_time = self._simulator.state.t * pq.ms
         self._clear_simulator()
+        if self._stream is not None:
+            self._stream.clear()
+            if self.streaming:
+                self._next_flush = self._simulator.state.t + self.stream_interval
+            else:
+                self._close_stream()
 
     def write(self, variables, file=None, gather=False, filter_ids=None,
               clear=False, annotations=None):
@@ -329,10 +669,19 @@ class Recorder(object):
         """
         if variable == 'spikes':
             N = self._local_count(variable, filter_ids)
+            if self._stream is not None and self._stream.n_spikes > 0:
+                ids = numpy.fromiter(N.keys(), dtype=int, count=len(N))
+                streamed_ids = numpy.sort(self._stream.get_spikes()[0])
+                streamed_counts = (numpy.searchsorted(streamed_ids, ids, 'right')
+                                   - numpy.searchsorted(streamed_ids, ids, 'left'))
+                N = dict((id, N[id] + n) for id, n in zip(ids.tolist(), streamed_counts.tolist()))
         else:
             raise Exception("Only implemented for spikes.")
         if gather and self._simulator.state.num_processes > 1:
-            N = gather_dict(N)
+            ids = numpy.fromiter(N.keys(), dtype=int, count=len(N))
+            counts = numpy.fromiter(N.values(), dtype=int, count=len(N))
+            ids, counts = gather_arrays([ids, counts])
+            N = dict(zip(ids.tolist(), counts.tolist()))
         return N
 
     def store_to_cache(self, annotations={}):
@@ -344,3 +693,10 @@ class Recorder(object):
             self.cache.store(segment)
         self.clear_flag = False
         self._recording_start_time = 0.0 * pq.ms
+        if self._stream is not None:
+            # the segment is now complete, so the store can be re-used for the next one
+            self._stream.clear()
+            if self.streaming:
+                self._next_flush = self.stream_interval
+            else:
+                self._close_stream()
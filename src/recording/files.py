@@ -7,6 +7,7 @@ Classes:
     StandardTextFile
     PickleFile
     NumpyBinaryFile
+    BinaryConnectionFile
     HDF5ArrayFile - requires PyTables
 
 :copyright: Copyright 2006-2013 by the PyNN team, see AUTHORS.
@@ -15,7 +16,7 @@ Classes:
 """
 
 
-import numpy, os, shutil
+import numpy, os, shutil, struct
 try:
     import cPickle as pickle
 except ImportError:
@@ -30,6 +31,7 @@ from pyNN.core import iteritems
 
 
 DEFAULT_BUFFER_SIZE = 10000
+DEFAULT_CHUNK_SIZE = 100000
 
 def _savetxt(filename, data, format, delimiter):
     """
@@ -164,6 +166,27 @@ class StandardTextFile(BaseFile):
         self._check_open()
         return numpy.loadtxt(self.fileobj)
 
+    def read_chunks(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Read the data from the file in chunks of up to `chunk_size` lines, so
+        that the whole array need never be held in memory. Returns an iterator
+        over two-dimensional arrays.
+        """
+        self._check_open()
+        self.fileobj.seek(0)
+        lines = []
+        for line in self.fileobj:
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            if line.strip() and line[0] != "#":
+                lines.append(line)
+                if len(lines) == chunk_size:
+                    yield numpy.loadtxt(lines, ndmin=2)
+                    lines = []
+        if lines:
+            yield numpy.loadtxt(lines, ndmin=2)
+        self.fileobj.seek(0)
+
     def get_metadata(self):
         self._check_open()
         D = {}
@@ -240,6 +263,132 @@ class NumpyBinaryFile(BaseFile):
         return D
 
 
+class BinaryConnectionFile(BaseFile):
+    """
+    Connection data are saved as a binary array of 64-bit floats, with the
+    rows (one per connection, with the pre- and post-synaptic indices in the
+    first two columns) sorted by post-synaptic index, and preceded by an
+    index giving the offset of the first row for each post-synaptic cell.
+
+    The data are memory-mapped when read, so the rows for a subset of the
+    post-synaptic cells (e.g. those on one MPI node) may be read without
+    reading the rest of the file.
+    """
+    magic = b"PyNNCONN"
+    version = 1
+    _header = struct.Struct("<8sIIQQQ")  # magic, version, columns, rows, targets, metadata length
+
+    def write(self, data, metadata):
+        __doc__ = BaseFile.write.__doc__
+        data = numpy.asarray(data, dtype=float)
+        if data.ndim == 1:
+            data = data.reshape((-1, len(metadata.get("columns", "ij"))))
+        self.write_chunks(lambda: iter([data]), metadata)
+
+    def write_chunks(self, chunks, metadata, n_targets=None):
+        """
+        Write connection data supplied in chunks, without holding all the data
+        in memory. `chunks` should be a function returning an iterator over
+        two-dimensional arrays, as it is called twice: once to count the
+        connections per post-synaptic cell, and once to write them.
+        `n_targets` is the number of post-synaptic cells (by default, one more
+        than the largest post-synaptic index).
+        """
+        self._check_open()
+        n_columns = 0
+        counts = numpy.zeros((n_targets or 0,), dtype=numpy.int64)
+        for chunk in chunks():
+            n_columns = chunk.shape[1]
+            chunk_counts = numpy.bincount(chunk[:, 1].astype(numpy.int64))
+            if chunk_counts.size > counts.size:
+                chunk_counts[:counts.size] += counts
+                counts = chunk_counts
+            else:
+                counts[:chunk_counts.size] += chunk_counts
+        offsets = numpy.hstack(([0], numpy.cumsum(counts))).astype(numpy.int64)
+        n_rows = int(offsets[-1])
+        text = "\n".join("%s = %r" % item for item in metadata.items()).encode('utf-8')
+        text += b" " * (-(self._header.size + len(text)) % 8)  # align the index and data
+        self.fileobj.write(self._header.pack(self.magic, self.version, n_columns,
+                                             n_rows, counts.size, len(text)))
+        self.fileobj.write(text)
+        self.fileobj.write(offsets.astype("<i8").tobytes())
+        data_offset = self.fileobj.tell()
+        self.fileobj.truncate(data_offset + 8 * n_rows * n_columns)
+        self.fileobj.flush()
+        if n_rows > 0:
+            # counting sort: each row is written directly to its final position
+            data = numpy.memmap(self.name, dtype="<f8", mode="r+", offset=data_offset,
+                                shape=(n_rows, n_columns))
+            filled = numpy.zeros_like(counts)
+            for chunk in chunks():
+                targets = chunk[:, 1].astype(numpy.int64)
+                order = numpy.argsort(targets, kind='mergesort')
+                targets = targets[order]
+                rank = numpy.arange(targets.size) - numpy.searchsorted(targets, targets)
+                data[offsets[targets] + filled[targets] + rank] = chunk[order]
+                filled += numpy.bincount(targets, minlength=counts.size)
+            data.flush()
+            del data
+        self.fileobj.close()
+
+    def _read_header(self):
+        self._check_open()
+        self.fileobj.seek(0)
+        magic, version, n_columns, n_rows, n_targets, metadata_length = \
+            self._header.unpack(self.fileobj.read(self._header.size))
+        if magic != self.magic:
+            raise IOError("%s is not a PyNN binary connection file" % self.name)
+        metadata_text = self.fileobj.read(metadata_length).decode('utf-8')
+        index_offset = self._header.size + metadata_length
+        data_offset = index_offset + 8 * (n_targets + 1)
+        return n_columns, n_rows, n_targets, metadata_text, index_offset, data_offset
+
+    def _memmap(self, dtype, offset, shape):
+        if numpy.prod(shape) == 0:
+            return numpy.zeros(shape, dtype=dtype)
+        return numpy.memmap(self.name, dtype=dtype, mode="r", offset=offset, shape=shape)
+
+    def read(self):
+        __doc__ = BaseFile.read.__doc__
+        n_columns, n_rows, n_targets, _, _, data_offset = self._read_header()
+        return self._memmap("<f8", data_offset, (n_rows, n_columns))
+
+    def read_targets(self, targets):
+        """
+        Read the rows for the post-synaptic cells with indices `targets`,
+        sorted by post-synaptic index. Only the corresponding parts of the
+        file are read.
+        """
+        n_columns, n_rows, n_targets, _, index_offset, data_offset = self._read_header()
+        targets = numpy.asarray(targets, dtype=numpy.int64)
+        targets = targets[targets < n_targets]
+        offsets = self._memmap("<i8", index_offset, (n_targets + 1,))
+        starts, stops = numpy.asarray(offsets[targets]), numpy.asarray(offsets[targets + 1])
+        lengths = stops - starts
+        rows = numpy.repeat(starts - numpy.cumsum(lengths) + lengths, lengths) + numpy.arange(lengths.sum())
+        return numpy.asarray(self.read()[rows])
+
+    def get_metadata(self):
+        __doc__ = BaseFile.get_metadata.__doc__
+        D = {}
+        for line in self._read_header()[3].splitlines():
+            if line.strip():
+                name, value = line.split("=", 1)
+                name = name.strip()
+                try:
+                    D[name] = eval(value)
+                except Exception:
+                    D[name] = value.strip()
+        return D
+
+    @classmethod
+    def is_connection_file(cls, filename):
+        """Return True if `filename` is a binary connection file."""
+        with open(filename, 'rb') as fp:
+            return fp.read(len(cls.magic)) == cls.magic
+
+
 if have_hdf5:
     class HDF5ArrayFile(BaseFile):
         """
@@ -0,0 +1,121 @@
+"""
+Append-only on-disk storage for recorded data, used by recorders in streaming
+mode to move data out of the simulator at regular intervals during a run.
+
+Spikes are stored as two flat binary files, containing the source ids and the
+spike times. Each analog variable is stored as a flat binary file of
+double-precision values, with one row per time step and one column per
+recorded cell. Data are only read back (via memory-mapping) when requested.
+
+Classes:
+    StreamingStore
+
+:copyright: Copyright 2006-2013 by the PyNN team, see AUTHORS.
+:license: CeCILL, see LICENSE for details.
+"""
+
+import os
+import logging
+import numpy
+
+logger = logging.getLogger("PyNN")
+
+
+def _read(filename, dtype, shape=None):
+    if os.path.exists(filename) and os.path.getsize(filename) > 0:
+        data = numpy.memmap(filename, dtype=dtype, mode='r')
+    else:
+        data = numpy.array([], dtype=dtype)
+    if shape is not None:
+        data = data.reshape(shape)
+    return data
+
+
+class StreamingStore(object):
+    """
+    Append-only store for the spikes and analog signals recorded from a single
+    population, in the directory `directory`.
+
+    All data in the store belong to a single recording segment, which starts
+    at `t_start` (in ms).
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        self.signals = {}
+        self.clear()
+
+    def _filename(self, name):
+        return os.path.join(self.directory, name + ".bin")
+
+    def clear(self):
+        """Delete all stored data."""
+        for name in ["spike_ids", "spike_times"] + list(self.signals):
+            if os.path.exists(self._filename(name)):
+                os.remove(self._filename(name))
+        self.t_start = None
+        self.n_spikes = 0
+        self.signals = {}
+
+    def _append(self, name, data, dtype):
+        with open(self._filename(name), 'ab') as f:
+            numpy.ascontiguousarray(data, dtype=dtype).tofile(f)
+
+    def append_spikes(self, ids, times, t_start):
+        """
+        Append the spikes with source ids `ids` and spike times `times` (in ms)
+        to the store.
+        """
+        if self.t_start is None:
+            self.t_start = t_start
+        self._append("spike_ids", ids, numpy.int64)
+        self._append("spike_times", times, float)
+        self.n_spikes += len(ids)
+
+    def append_signal(self, name, ids, values, t_start, sampling_period):
+        """
+        Append the values of the analog variable `name`, recorded from the
+        cells `ids`, to the store. `values` is a 2D array, with one row per time
+        step, the first being recorded at `t_start` (in ms), and one column per
+        cell.
+
+        Rows for time points which have already been stored are skipped, so
+        successive chunks may overlap.
+        """
+        ids = numpy.asarray(ids, dtype=int)
+        values = numpy.asarray(values, dtype=float)
+        if self.t_start is None:
+            self.t_start = t_start
+        if name not in self.signals:
+            self.signals[name] = {'ids': ids, 'n_samples': 0,
+                                  'sampling_period': sampling_period}
+        signal = self.signals[name]
+        if not numpy.array_equal(ids, signal['ids']):
+            raise ValueError("The cells recording '%s' may not change during a streamed recording segment" % name)
+        if abs(sampling_period - signal['sampling_period']) > 1e-9:
+            raise ValueError("The sampling interval for '%s' may not change during a streamed recording segment" % name)
+        first_sample = int(round((t_start - self.t_start)/sampling_period))
+        overlap = max(signal['n_samples'] - first_sample, 0)
+        values = values[overlap:]
+        self._append(name, values, float)
+        signal['n_samples'] += values.shape[0]
+
+    def get_spikes(self):
+        """Return the stored spike source ids and times, as two arrays."""
+        return (_read(self._filename("spike_ids"), numpy.int64),
+                _read(self._filename("spike_times"), float))
+
+    def get_signal(self, name, ids=None):
+        """
+        Return the stored values of the analog variable `name` as a 2D array
+        with one row per time step and one column per cell, optionally
+        restricted to the cells `ids`.
+        """
+        signal = self.signals[name]
+        values = _read(self._filename(name), float,
+                       shape=(signal['n_samples'], signal['ids'].size))
+        if ids is not None:
+            values = values[:, numpy.searchsorted(signal['ids'], ids)]
+        return values
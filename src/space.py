@@ -6,6 +6,8 @@ Classes:
 
   Space           - representation of a Cartesian space for use in calculating
                     distances
+  CellGrid        - spatial index used to find the pairs of points separated
+                    by less than a given distance
 
   Line            - represents a structure with neurons distributed evenly on a
                     straight line.
@@ -30,6 +32,7 @@ except NameError:
     from functools import reduce
 import numpy
 import math
+from itertools import product
 from operator import and_
 from pyNN.random import NumpyRNG
 from pyNN import descriptions
@@ -86,6 +89,7 @@ class Space(object):
 
     AXES = {'x' : [0],    'y': [1],    'z': [2],
             'xy': [0,1], 'yz': [1,2], 'xz': [0,2], 'xyz': range(3), None: range(3)}
+    max_cached_indices = 8
 
     def __init__(self, axes=None, scale_factor=1.0, offset=0.0,
                  periodic_boundaries=None):
@@ -96,6 +100,7 @@ class Space(object):
         self.axes = numpy.array(Space.AXES[axes])
         self.scale_factor = scale_factor
         self.offset = offset
+        self._spatial_indices = {}
 
     def distances(self, A, B, expand=False):
         """
@@ -128,8 +133,63 @@ class Space(object):
         numpy.sqrt(d, d)
         return d.flatten()
 
+    def paired_distances(self, A, B):
+        """
+        Calculate the distances between corresponding points in two sets of
+        coordinates of the same length, i.e. the diagonal of the distance
+        matrix, given the topology of the current space.
+        """
+        assert A.shape == B.shape
+        assert A.shape[-1] == 3
+        A = A.reshape(-1, 3)
+        B = self.scale_factor*(B.reshape(-1, 3) + self.offset)
+        d = numpy.zeros((A.shape[0],), dtype=float)
+        for axis in self.axes:
+            diff2 = A[:, axis] - B[:, axis]
+            if self.periodic_boundaries is not None:
+                boundaries = self.periodic_boundaries[axis]
+                if boundaries is not None:
+                    range = boundaries[1] - boundaries[0]
+                    ad2 = abs(diff2)
+                    diff2 = numpy.minimum(ad2, range-ad2)
+            d += diff2**2
+        numpy.sqrt(d, d)
+        return d
+
+    def spatial_index(self, A, cutoff):
+        """
+        Return a spatial index over the set of coordinates `A`, an array of
+        shape (n, 3), which may be used to find the points of `A` within
+        distance `cutoff` of other points. The index is cached, so repeated
+        calls with the same coordinates, cutoff and topology do not rebuild it.
+        """
+        topology = repr((self.axes.tolist(),
+                         numpy.asarray(self.scale_factor).tolist(),
+                         numpy.asarray(self.offset).tolist(),
+                         self.periodic_boundaries))
+        key = (cutoff, topology, A.shape, hash(numpy.ascontiguousarray(A).tobytes()))
+        if key not in self._spatial_indices:
+            if len(self._spatial_indices) >= self.max_cached_indices:
+                self._spatial_indices.clear()
+            self._spatial_indices[key] = CellGrid(self, A, cutoff)
+        return self._spatial_indices[key]
+
+    def neighbours(self, A, B, cutoff):
+        """
+        Find all pairs of points, one from `A` and one from `B` (arrays of
+        shape (n, 3) and (m, 3)) whose distance is not greater than `cutoff`.
+
+        Returns three arrays `(i, j, d)`, where `i` contains indices into `A`,
+        `j` indices into `B` and `d` the distances, ordered by `j` then `i`.
+        """
+        return self.spatial_index(A, cutoff).query(B)
+
     def distance_generator(self, f, g):
         def distance_map(i, j):
+            if (isinstance(i, numpy.ndarray) and i.ndim == 1
+                and isinstance(j, numpy.ndarray) and j.ndim == 1):
+                # pairs of indices, e.g. the addresses of existing connections
+                return self.paired_distances(f(i), g(j))
             shape = []
             if isinstance(i, numpy.ndarray) and i.ndim == 2:
                 i = i[:, 0]
@@ -145,6 +205,120 @@ class Space(object):
         return distance_map
 
 
+class CellGrid(object):
+    """
+    Spatial index for a set of points in a given :class:`Space`, in which the
+    points are sorted into cubic cells whose side is at least the cutoff
+    distance, so that only the points in the same cell as a query point, or
+    in neighbouring cells, need be considered. The axes, scale factor, offset
+    and periodic boundaries of the space are taken into account.
+
+    Arguments:
+        space:
+            the :class:`Space` in which distances are calculated.
+        A:
+            array of shape (n, 3) containing the coordinates of the points
+            to be indexed (pre-synaptic positions).
+        cutoff:
+            the largest distance which will be searched for.
+    """
+
+    def __init__(self, space, A, cutoff):
+        if not cutoff > 0:
+            raise ValueError("The cutoff distance must be positive")
+        self.space = space
+        self.cutoff = cutoff
+        self.A = A.reshape(-1, 3)
+        points = self._wrap(self.A[:, space.axes])
+        self.periodic = numpy.zeros(len(space.axes), dtype=bool)
+        self.origin = points.min(axis=0) if points.size else numpy.zeros(len(space.axes))
+        extent = points.max(axis=0) - self.origin if points.size else numpy.zeros(len(space.axes))
+        self.shape = numpy.floor(extent / cutoff).astype(int) + 1
+        self.cell_size = numpy.empty(len(space.axes))
+        self.cell_size[:] = cutoff * (1 + 1e-9)  # guard against rounding
+        for k, axis in enumerate(space.axes):
+            boundaries = self._boundaries(axis)
+            if boundaries is not None:
+                width = boundaries[1] - boundaries[0]
+                self.periodic[k] = True
+                self.origin[k] = boundaries[0]
+                self.shape[k] = max(1, int(width // self.cell_size[k]))
+                self.cell_size[k] = width / self.shape[k]
+        cell_ids = self._cell_ids(self._cell_coordinates(points))[1]
+        self.order = numpy.argsort(cell_ids, kind='mergesort')
+        self.sorted_ids = cell_ids[self.order]
+        self.offsets = []
+        for k in range(len(space.axes)):
+            if self.periodic[k] and self.shape[k] < 3:
+                self.offsets.append(tuple(range(self.shape[k])))
+            else:
+                self.offsets.append((-1, 0, 1))
+
+    def _boundaries(self, axis):
+        if self.space.periodic_boundaries is not None:
+            return self.space.periodic_boundaries[axis]
+        return None
+
+    def _wrap(self, points):
+        points = points.astype(float)
+        for k, axis in enumerate(self.space.axes):
+            boundaries = self._boundaries(axis)
+            if boundaries is not None:
+                width = boundaries[1] - boundaries[0]
+                points[:, k] = boundaries[0] + numpy.mod(points[:, k] - boundaries[0], width)
+        return points
+
+    def _cell_coordinates(self, points):
+        return numpy.floor((points - self.origin) / self.cell_size).astype(int)
+
+    def _cell_ids(self, coordinates):
+        """
+        Return a boolean array indicating which cell coordinates lie within
+        the grid, and the linear indices of these cells.
+        """
+        valid = numpy.ones(coordinates.shape[0], dtype=bool)
+        coordinates = coordinates.copy()
+        for k in range(coordinates.shape[1]):
+            if self.periodic[k]:
+                coordinates[:, k] %= self.shape[k]
+            else:
+                valid &= (coordinates[:, k] >= 0) & (coordinates[:, k] < self.shape[k])
+        ids = numpy.ravel_multi_index(coordinates[valid].T, self.shape)
+        return valid, ids
+
+    def query(self, B):
+        """
+        Find the pairs of points from the index and from `B`, an array of
+        shape (m, 3) containing post-synaptic positions, whose distance is not
+        greater than the cutoff. Returns `(i, j, d)` as for
+        :meth:`Space.neighbours`.
+        """
+        B = B.reshape(-1, 3)
+        space = self.space
+        points = self._wrap((space.scale_factor*(B + space.offset))[:, space.axes])
+        coordinates = self._cell_coordinates(points)
+        candidates_i, candidates_j = [], []
+        for offset in product(*self.offsets):
+            valid, ids = self._cell_ids(coordinates + offset)
+            left = numpy.searchsorted(self.sorted_ids, ids, side='left')
+            counts = numpy.searchsorted(self.sorted_ids, ids, side='right') - left
+            total = counts.sum()
+            if total > 0:
+                starts = numpy.repeat(left - numpy.cumsum(counts) + counts, counts)
+                candidates_i.append(self.order[starts + numpy.arange(total)])
+                candidates_j.append(numpy.repeat(valid.nonzero()[0], counts))
+        if candidates_i:
+            i = numpy.hstack(candidates_i)
+            j = numpy.hstack(candidates_j)
+        else:
+            i = j = numpy.zeros((0,), dtype=int)
+        d = space.paired_distances(self.A[i], B[j])
+        close = d <= self.cutoff
+        i, j, d = i[close], j[close], d[close]
+        order = numpy.lexsort((i, j))
+        return i[order], j[order], d[order]
+
+
 class BaseStructure(object):
 
     def __repr__(self):
@@ -18,7 +18,7 @@ Classes:
 
 """
 
-from pyNN import errors, models
+from pyNN import errors, models, profiling
 from pyNN.parameters import ParameterSpace
 import numpy
 from pyNN.core import is_listlike, itervalues
@@ -31,15 +31,21 @@ from copy import deepcopy
 def build_translations(*translation_list):
     """
     Build a translation dictionary from a list of translations/transformations.
+
+    For parameters that are simply renamed or rescaled, the entry also contains
+    a 'scale_factor', which allows the transformation to be applied directly
+    to an array of values instead of evaluating the transform expressions.
     """
     translations = {}
     for item in translation_list:
         assert 2 <= len(item) <= 4, "Translation tuples must have between 2 and 4 items. Actual content: %s" % str(item)
         pynn_name = item[0]
         sim_name = item[1]
+        scale_factor = None
         if len(item) == 2: # no transformation
             f = pynn_name
             g = sim_name
+            scale_factor = 1
         elif len(item) == 3: # simple multiplicative factor
             scale_factor = item[2]
             f = "float(%g)*%s" % (scale_factor, pynn_name)
@@ -50,9 +56,42 @@ def build_translations(*translation_list):
         translations[pynn_name] = {'translated_name': sim_name,
                                    'forward_transform': f,
                                    'reverse_transform': g}
+        if scale_factor is not None:
+            translations[pynn_name]['scale_factor'] = scale_factor
     return translations
 
 
+_compiled_transforms = {}
+
+def _compile_transform(expression):
+    """
+    Return a code object for a transform expression, compiling it only the
+    first time it is seen.
+    """
+    try:
+        code = _compiled_transforms[expression]
+    except KeyError:
+        code = _compiled_transforms[expression] = compile(expression, "<transform>", "eval")
+    return code
+
+
+def _scale(value, scale_factor):
+    """
+    Multiply a parameter value by a scale factor. The result never shares
+    data with `value`, so that setting it does not change the original.
+    """
+    if scale_factor == 1:
+        return deepcopy(value)
+    return float(scale_factor) * value  # lazy operations copy the array
+
+
+def _unscale(value, scale_factor):
+    """Divide a parameter value by a scale factor, unless the factor is 1."""
+    if scale_factor == 1:
+        return value
+    return value / float(scale_factor)
+
+
 class StandardModelType(models.BaseModelType):
     """Base class for standardized cell model and synapse model classes."""
 
@@ -68,19 +107,25 @@ class StandardModelType(models.BaseModelType):
         """
         return self.translate(self.parameter_space)
 
+    @profiling.profiled("StandardModelType.translate")
     def translate(self, parameters):
         """Translate standardized model parameters to simulator-specific parameters."""
-        _parameters = deepcopy(parameters)
         cls = self.__class__
         if parameters.schema != self.get_schema():
             raise Exception("Schemas do not match: %s != %s" % (parameters.schema, self.get_schema())) # should replace this with a PyNN-specific exception type
         native_parameters = {}
+        _parameters = None
         #for name in parameters.schema:
         for name in parameters.keys():
             D = self.translations[name]
             pname = D['translated_name']
+            if 'scale_factor' in D:  # renamed or rescaled: no need to eval
+                native_parameters[pname] = _scale(parameters[name], D['scale_factor'])
+                continue
+            if _parameters is None:
+                _parameters = deepcopy(parameters)
             try:
-                pval = eval(D['forward_transform'], globals(), _parameters)
+                pval = eval(_compile_transform(D['forward_transform']), globals(), _parameters)
             except NameError as errmsg:
                 raise NameError("Problem translating '%s' in %s. Transform: '%s'. Parameters: %s. %s" \
                                 % (pname, cls.__name__, D['forward_transform'], parameters, errmsg))
@@ -90,15 +135,26 @@ class StandardModelType(models.BaseModelType):
             native_parameters[pname] = pval
         return ParameterSpace(native_parameters, schema=None, shape=parameters.shape)
 
-    def reverse_translate(self, native_parameters):
-        """Translate simulator-specific model parameters to standardized parameters."""
+    def reverse_translate(self, native_parameters, names=None):
+        """
+        Translate simulator-specific model parameters to standardized parameters.
+
+        If `names` is given, only those standardized parameters are calculated.
+        """
         cls = self.__class__
         standard_parameters = {}
-        for name,D  in self.translations.items():
+        if names is None:
+            names = self.translations.keys()
+        native_names = native_parameters.keys()
+        for name in names:
+            D = self.translations[name]
             tname = D['translated_name']
-            if tname in native_parameters.keys():
+            if tname in native_names:
+                if 'scale_factor' in D:  # renamed or rescaled: no need to eval
+                    standard_parameters[name] = _unscale(native_parameters[tname], D['scale_factor'])
+                    continue
                 try:
-                    standard_parameters[name] = eval(D['reverse_transform'], {}, native_parameters)
+                    standard_parameters[name] = eval(_compile_transform(D['reverse_transform']), {}, native_parameters)
                 except NameError as errmsg:
                     raise NameError("Problem translating '%s' in %s. Transform: '%s'. Parameters: %s. %s" \
                                     % (name, cls.__name__, D['reverse_transform'], native_parameters, errmsg))
@@ -117,7 +173,8 @@ class StandardModelType(models.BaseModelType):
     def computed_parameters(self):
         """Return a list of parameters whose values must be computed from
         more than one other parameter."""
-        return [name for name in self.translations if name not in self.simple_parameters() + self.scaled_parameters()]
+        translated_directly = set(self.simple_parameters() + self.scaled_parameters())
+        return [name for name in self.translations if name not in translated_directly]
 
     def get_native_names(self, *names):
         """
@@ -129,6 +186,26 @@ class StandardModelType(models.BaseModelType):
             translations = itervalues(self.translations)
         return [D['translated_name'] for D in translations]
 
+    def get_native_dependencies(self, *names):
+        """
+        Return a list of the native parameter names needed to calculate the
+        given standardized parameters with :meth:`reverse_translate`.
+        """
+        all_native_names = self.get_native_names()
+        native_names = []
+        for name in names:
+            D = self.translations[name]
+            if 'scale_factor' in D:
+                dependencies = [D['translated_name']]
+            else:
+                code = _compile_transform(D['reverse_transform'])
+                dependencies = [tname for tname in all_native_names
+                                if tname in code.co_names or tname == D['translated_name']]
+            for tname in dependencies:
+                if tname not in native_names:
+                    native_names.append(tname)
+        return native_names
+
 
 class StandardCellType(StandardModelType, models.BaseCellType):
     """Base class for standardized cell model classes."""
@@ -0,0 +1,409 @@
+# coding: utf-8
+"""
+Benchmarks for network construction, with regression tracking.
+
+Times the creation of a Population, the construction of a Projection with each
+of the connectors in pyNN.connectors, the retrieval of connection attributes
+with Projection.get() and the retrieval of recorded data, for a range of
+network sizes and connection densities. Each measurement is made in a fresh
+Python process, which records the wall-clock time taken by the operation being
+benchmarked and the peak resident set size (RSS) of the process by the end of
+that operation, including memory allocated by the simulator kernel. With
+Python 3.4 or later, the peak memory allocated by Python and NumPy during the
+operation alone (as traced by tracemalloc) is also measured, in one further
+run, since tracing memory slows down the code being timed.
+
+Usage: python connection_benchmarks.py [options] output_file
+
+positional arguments:
+  output_file           filename for the JSON results file
+
+optional arguments:
+  -h, --help            show this help message and exit
+  --simulators SIM [SIM ...]
+                        backends to benchmark (default: mock plus any other
+                        simulator which can be imported)
+  --sizes N [N ...]     numbers of neurons in each population
+  --densities P [P ...] connection probabilities
+  --benchmarks NAME [NAME ...]
+                        run only the named benchmarks
+  --repeats REPEATS     number of times to run each benchmark; the shortest
+                        time and the smallest peak RSS are kept
+  --baseline FILE       compare with the results in FILE, and exit with a
+                        non-zero status if there are regressions
+  --threshold FRACTION  relative increase in time, peak RSS or traced memory
+                        above which a benchmark is considered to have
+                        regressed (default 0.2)
+  --min-time SECONDS    timings shorter than this are not checked for
+                        regressions, since they are dominated by noise
+                        (default 0.05)
+
+To update the baseline, copy the output file over the baseline file once the
+change in performance has been accepted.
+
+:copyright: Copyright 2006-2013 by the PyNN team, see AUTHORS.
+:license: CeCILL, see LICENSE for details.
+"""
+
+from __future__ import print_function, division
+import sys
+import os
+import json
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+from datetime import datetime
+from importlib import import_module
+import numpy
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+
+DEFAULT_SIMULATORS = ("mock", "numpy_sim", "nest", "neuron", "brian")
+DEFAULT_SIZES = (100, 1000)
+DEFAULT_DENSITIES = (0.01, 0.1)
+
+
+def peak_rss():
+    """
+    Return the peak resident set size of the current process, in MB, or None
+    if it cannot be measured on this platform.
+    """
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":  # bytes, rather than kilobytes
+        return maxrss / 2**20
+    return maxrss / 2**10
+
+
+class Phase(object):
+    """
+    Measure the wall-clock time between `start()` and `stop()`, and the peak
+    RSS of the process by the time of `stop()`. If `trace_memory` is True, the
+    peak memory allocated between `start()` and `stop()`, as traced by
+    tracemalloc, is also measured (this slows down the code being timed).
+    Quantities which cannot be measured are left as None.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory and tracemalloc is not None
+        self.time = None
+        self.peak_rss = None
+        self.traced_memory = None
+
+    def start(self):
+        if self.trace_memory:
+            tracemalloc.start()
+        self._start_time = time.time()
+
+    def stop(self):
+        self.time = time.time() - self._start_time
+        self.peak_rss = peak_rss()
+        if self.trace_memory:
+            self.traced_memory = tracemalloc.get_traced_memory()[1] / 2**20  # peak, in MB
+            tracemalloc.stop()
+
+    def results(self):
+        """Return a dict of the quantities which have been measured."""
+        if self.trace_memory:
+            quantities = {"traced_memory": self.traced_memory}
+        else:
+            quantities = {"time": self.time, "peak_rss": self.peak_rss}
+        return dict((name, value) for name, value in quantities.items() if value is not None)
+
+
+def _build_network(sim, size, positions=False):
+    from pyNN.space import RandomStructure, Cuboid
+    from pyNN.random import NumpyRNG
+    if positions:
+        structure = RandomStructure(Cuboid(1, 1, 1), rng=NumpyRNG(2652))
+        return (sim.Population(size, sim.IF_cond_exp(), structure=structure),
+                sim.Population(size, sim.IF_cond_exp(), structure=structure))
+    return (sim.Population(size, sim.IF_cond_exp()),
+            sim.Population(size, sim.IF_cond_exp()))
+
+
+def _connector(sim, name, size, density, pre, post, tmp_dir):
+    """
+    Return the connector to be benchmarked, creating any data it needs (which
+    is not included in the timing).
+    """
+    from pyNN.random import NumpyRNG
+    from pyNN.connectors import IndexBasedExpression
+    from pyNN.recording import files
+    rng = NumpyRNG(seed=8658764)
+    n = max(1, int(round(density * size)))
+    if name == "AllToAllConnector":
+        return sim.AllToAllConnector()
+    elif name == "OneToOneConnector":
+        return sim.OneToOneConnector()
+    elif name == "FixedProbabilityConnector":
+        return sim.FixedProbabilityConnector(density, rng=rng)
+    elif name == "DistanceDependentProbabilityConnector":
+        # the mean distance between points in a unit cube is about 0.66
+        return sim.DistanceDependentProbabilityConnector("%g*exp(-d)" % (density*numpy.e**0.66),
+                                                         rng=rng)
+    elif name == "IndexBasedProbabilityConnector":
+        class ConstantProbability(IndexBasedExpression):
+            def __call__(self, i, j):
+                return density * numpy.ones(numpy.broadcast(i, j).shape)
+        return sim.IndexBasedProbabilityConnector(ConstantProbability(), rng=rng)
+    elif name == "DisplacementDependentProbabilityConnector":
+        return sim.DisplacementDependentProbabilityConnector(
+            lambda d: density * numpy.e**0.5 * numpy.exp(-abs(d[0]) - abs(d[1])), rng=rng)
+    elif name in ("FromListConnector", "FromFileConnector"):
+        n_connections = int(round(density * size * size))
+        random = numpy.random.RandomState(8658764)
+        conn_list = numpy.column_stack((random.randint(0, size, n_connections),
+                                        random.randint(0, size, n_connections),
+                                        random.uniform(0.0, 0.1, n_connections),
+                                        random.uniform(0.1, 1.0, n_connections)))
+        if name == "FromListConnector":
+            return sim.FromListConnector(conn_list)
+        connection_file = files.StandardTextFile(os.path.join(tmp_dir, "connections.txt"), mode='w')
+        connection_file.write(conn_list, {"columns": ["i", "j", "weight", "delay"]})
+        connection_file.close()
+        return sim.FromFileConnector(os.path.join(tmp_dir, "connections.txt"))
+    elif name == "FixedNumberPostConnector":
+        return sim.FixedNumberPostConnector(n, rng=rng)
+    elif name == "FixedNumberPreConnector":
+        return sim.FixedNumberPreConnector(n, rng=rng)
+    elif name == "FixedTotalNumberConnector":
+        return sim.FixedTotalNumberConnector(int(round(density * size * size)), rng=rng)
+    elif name == "SmallWorldConnector":
+        # a neighbourhood of radius r in a unit cube contains roughly 4.2*r^3 of the cells
+        return sim.SmallWorldConnector(degree=(density/4.2)**(1/3), rewiring=0.1, rng=rng)
+    elif name == "ArrayConnector":
+        return sim.ArrayConnector(numpy.random.RandomState(8658764).uniform(size=(size, size)) < density)
+    elif name == "CloneConnector":
+        reference = sim.Projection(pre, post, sim.FixedProbabilityConnector(density, rng=rng),
+                                   sim.StaticSynapse())
+        return sim.CloneConnector(reference)
+    elif name == "CSAConnector":
+        import csa
+        return sim.CSAConnector(csa.random(density))
+    else:
+        raise ValueError("Unknown connector: %s" % name)
+
+
+CONNECTORS = ("AllToAllConnector", "OneToOneConnector", "FixedProbabilityConnector",
+              "DistanceDependentProbabilityConnector", "IndexBasedProbabilityConnector",
+              "DisplacementDependentProbabilityConnector", "FromListConnector",
+              "FromFileConnector", "FixedNumberPostConnector", "FixedNumberPreConnector",
+              "FixedTotalNumberConnector", "SmallWorldConnector", "ArrayConnector",
+              "CloneConnector", "CSAConnector")
+USES_POSITIONS = ("DistanceDependentProbabilityConnector",
+                  "DisplacementDependentProbabilityConnector", "SmallWorldConnector")
+INDEPENDENT_OF_DENSITY = ("Population", "AllToAllConnector", "OneToOneConnector")
+BENCHMARKS = ("Population",) + CONNECTORS + ("Projection.get", "get_data")
+MEMORY_QUANTITIES = ("peak_rss", "traced_memory")
+
+
+def run_benchmark(simulator, benchmark, size, density, trace_memory=False):
+    """
+    Run a single benchmark in the current process. Return a dict containing
+    the time taken by the operation being benchmarked, in seconds, and the
+    peak RSS of the process, in MB, or, if `trace_memory` is True, the peak
+    memory allocated by that operation as traced by tracemalloc, in MB.
+    """
+    sim = import_module("pyNN.%s" % simulator)
+    sim.setup(timestep=0.1, min_delay=0.1, max_delay=10.0)
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        phase = Phase(trace_memory)
+        if benchmark == "Population":
+            phase.start()
+            sim.Population(size, sim.IF_cond_exp())
+            phase.stop()
+        elif benchmark in CONNECTORS:
+            pre, post = _build_network(sim, size, positions=benchmark in USES_POSITIONS)
+            connector = _connector(sim, benchmark, size, density, pre, post, tmp_dir)
+            synapse = sim.StaticSynapse(weight=0.01, delay=0.5)
+            phase.start()
+            sim.Projection(pre, post, connector, synapse)
+            phase.stop()
+        elif benchmark == "Projection.get":
+            pre, post = _build_network(sim, size)
+            prj = sim.Projection(pre, post, sim.FixedProbabilityConnector(density),
+                                 sim.StaticSynapse(weight=0.01, delay=0.5))
+            phase.start()
+            prj.get(["weight", "delay"], format="list")
+            prj.get("weight", format="array")
+            phase.stop()
+        elif benchmark == "get_data":
+            pre, post = _build_network(sim, size)
+            sim.Projection(pre, post, sim.FixedProbabilityConnector(density),
+                           sim.StaticSynapse(weight=0.01, delay=0.5))
+            pre.record("spikes")
+            pre.set(i_offset=1.0)
+            sim.run(100.0)
+            phase.start()
+            pre.get_data("spikes")
+            phase.stop()
+        else:
+            raise ValueError("Unknown benchmark: %s" % benchmark)
+        sim.end()
+    finally:
+        shutil.rmtree(tmp_dir)
+    return phase.results()
+
+
+def benchmark_key(simulator, benchmark, size, density):
+    if benchmark in INDEPENDENT_OF_DENSITY:
+        return "%s:%s:n=%d" % (simulator, benchmark, size)
+    return "%s:%s:n=%d:p=%g" % (simulator, benchmark, size, density)
+
+
+def run_in_subprocess(simulator, benchmark, size, density, trace_memory=False):
+    """
+    Run a benchmark in a fresh Python process. Return a dict containing either
+    the results or a description of the error which occurred.
+    """
+    command = [sys.executable, os.path.abspath(__file__), "--single",
+               simulator, benchmark, str(size), repr(density)]
+    if trace_memory:
+        command.append("--trace-memory")
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stdout, stderr = process.communicate()
+    if process.returncode != 0:
+        lines = stderr.decode("utf-8", "replace").strip().splitlines()
+        return {"error": lines[-1] if lines else "exit status %d" % process.returncode}
+    return json.loads(stdout.decode("utf-8").strip().splitlines()[-1])
+
+
+def available_simulators():
+    simulators = []
+    for simulator in DEFAULT_SIMULATORS:
+        try:
+            import_module("pyNN.%s" % simulator)
+        except Exception:
+            continue
+        simulators.append(simulator)
+    return simulators
+
+
+def run_all(simulators, sizes, densities, benchmarks, repeats=1):
+    """
+    Run each benchmark `repeats` times, and trace its memory use once more if
+    tracemalloc is available, for each combination of simulator, size and
+    density. Return a dict of results, keyed by benchmark.
+
+    A benchmark is marked as an error only if it could not be timed; any
+    memory measurement which fails is left out of its results.
+    """
+    results = {}
+    for simulator in simulators:
+        for benchmark in benchmarks:
+            for size in sizes:
+                for density in densities:
+                    key = benchmark_key(simulator, benchmark, size, density)
+                    if key in results:
+                        continue
+                    runs = [run_in_subprocess(simulator, benchmark, size, density)
+                            for i in range(repeats)]
+                    errors = [run["error"] for run in runs if "error" in run]
+                    if errors:
+                        result = {"error": errors[0]}
+                    else:
+                        result = {"time": min(run["time"] for run in runs)}
+                        if all("peak_rss" in run for run in runs):
+                            result["peak_rss"] = min(run["peak_rss"] for run in runs)
+                        if tracemalloc is not None:
+                            run = run_in_subprocess(simulator, benchmark, size, density,
+                                                    trace_memory=True)
+                            if "traced_memory" in run:
+                                result["traced_memory"] = run["traced_memory"]
+                    result.update(simulator=simulator, benchmark=benchmark, size=size)
+                    if benchmark not in INDEPENDENT_OF_DENSITY:
+                        result["density"] = density
+                    results[key] = result
+                    if "error" in result:
+                        print("%-60s %s" % (key, result["error"]))
+                    else:
+                        print("%-60s %8.3f s %s" % (key, result["time"],
+                                                    "  ".join("%s %.1f MB" % (name, result[name])
+                                                              for name in MEMORY_QUANTITIES
+                                                              if name in result)))
+    return results
+
+
+def compare(results, baseline, threshold=0.2, min_time=0.05):
+    """
+    Compare `results` with `baseline`. Return a list of (key, quantity, old,
+    new) tuples, one for each benchmark whose time, peak RSS or traced memory
+    has increased by more than the fraction `threshold`.
+
+    Timings for which both the old and new values are shorter than `min_time`
+    seconds are not compared. Quantities missing from either set of results
+    (e.g. from a baseline made with an older version of this script) are
+    ignored.
+    """
+    regressions = []
+    for key in sorted(results):
+        new, old = results[key], baseline.get(key)
+        if old is None or "error" in new or "error" in old:
+            continue
+        if "time" in new and "time" in old:
+            if max(new["time"], old["time"]) >= min_time and new["time"] > old["time"] * (1 + threshold):
+                regressions.append((key, "time", old["time"], new["time"]))
+        for quantity in MEMORY_QUANTITIES:
+            if quantity in new and quantity in old:
+                if new[quantity] > old[quantity] * (1 + threshold):
+                    regressions.append((key, quantity, old[quantity], new[quantity]))
+    return regressions
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmarks for network construction")
+    parser.add_argument("output_file", help="filename for the JSON results file")
+    parser.add_argument("--simulators", nargs="+", metavar="SIM")
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES, metavar="N")
+    parser.add_argument("--densities", nargs="+", type=float, default=DEFAULT_DENSITIES, metavar="P")
+    parser.add_argument("--benchmarks", nargs="+", default=BENCHMARKS, choices=BENCHMARKS,
+                        metavar="NAME")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--baseline", metavar="FILE")
+    parser.add_argument("--threshold", type=float, default=0.2, metavar="FRACTION")
+    parser.add_argument("--min-time", type=float, default=0.05, metavar="SECONDS")
+    args = parser.parse_args(argv)
+
+    simulators = args.simulators or available_simulators()
+    results = run_all(simulators, args.sizes, args.densities, args.benchmarks, args.repeats)
+    metadata = {"timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "python": platform.python_version(),
+                "numpy": numpy.__version__,
+                "platform": platform.platform(),
+                "repeats": args.repeats}
+    with open(args.output_file, "w") as fp:
+        json.dump({"metadata": metadata, "results": results}, fp, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)["results"]
+        regressions = compare(results, baseline, args.threshold, args.min_time)
+        for key, quantity, old, new in regressions:
+            print("REGRESSION %s %s: %.3f -> %.3f (%+.0f%%)" % (key, quantity, old, new,
+                                                               100 * (new - old) / old))
+        if regressions:
+            return 1
+        print("No regressions relative to %s" % args.baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--single":
+        simulator, benchmark, size, density = sys.argv[2:6]
+        print(json.dumps(run_benchmark(simulator, benchmark, int(size), float(density),
+                                       trace_memory="--trace-memory" in sys.argv[6:])))
+    else:
+        sys.exit(main())
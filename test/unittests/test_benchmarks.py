@@ -0,0 +1,77 @@
+"""
+Tests of the regression check in test/benchmarks/connection_benchmarks.py
+
+:copyright: Copyright 2006-2013 by the PyNN team, see AUTHORS.
+:license: CeCILL, see LICENSE for details.
+"""
+
+import os
+import sys
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+from nose.tools import assert_equal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+import connection_benchmarks
+sys.path.pop(0)
+
+
+def test_compare_reports_regressions():
+    baseline = {"a": {"time": 1.0, "peak_rss": 100.0, "traced_memory": 10.0},
+                "b": {"time": 1.0, "peak_rss": 100.0, "traced_memory": 10.0},
+                "c": {"time": 1.0, "peak_rss": 100.0, "traced_memory": 10.0}}
+    results = {"a": {"time": 1.1, "peak_rss": 110.0, "traced_memory": 11.0},  # within threshold
+               "b": {"time": 1.5, "peak_rss": 100.0, "traced_memory": 10.0},  # slower
+               "c": {"time": 0.5, "peak_rss": 200.0, "traced_memory": 20.0}}  # uses more memory
+    assert_equal(connection_benchmarks.compare(results, baseline, threshold=0.2),
+                 [("b", "time", 1.0, 1.5), ("c", "peak_rss", 100.0, 200.0),
+                  ("c", "traced_memory", 10.0, 20.0)])
+
+
+def test_compare_ignores_short_times_errors_and_missing_entries():
+    baseline = {"a": {"time": 0.01, "peak_rss": 1.0},
+                "b": {"error": "NotImplementedError"},
+                "c": {"time": 1.0, "peak_rss": 50.0}}  # made without tracemalloc
+    results = {"a": {"time": 0.04, "peak_rss": 1.0},
+               "b": {"time": 1.0, "peak_rss": 1.0},
+               "c": {"time": 1.0, "peak_rss": 50.0, "traced_memory": 100.0},
+               "d": {"time": 1.0, "peak_rss": 1.0}}
+    assert_equal(connection_benchmarks.compare(results, baseline, min_time=0.05), [])
+
+
+def test_phase_measures_time_and_peak_rss():
+    import numpy
+    phase = connection_benchmarks.Phase()
+    phase.start()
+    during = numpy.ones((1000, 1000))
+    phase.stop()
+    results = phase.results()
+    assert results["time"] >= 0
+    if connection_benchmarks.resource is not None:
+        assert results["peak_rss"] > 7.6  # includes the 1000*1000*8 bytes allocated
+    assert "traced_memory" not in results
+
+
+@unittest.skipIf(connection_benchmarks.tracemalloc is None, "requires tracemalloc")
+def test_phase_traces_memory_of_timed_operation_only():
+    import numpy
+    before = numpy.ones((1000, 1000))  # allocated before the phase starts, not counted
+    phase = connection_benchmarks.Phase(trace_memory=True)
+    phase.start()
+    during = numpy.ones((500, 500))
+    phase.stop()
+    assert 1.5 < phase.results()["traced_memory"] < 3.0  # 500*500*8 bytes is about 1.9 MB
+
+
+def test_phase_without_tracemalloc():
+    tracemalloc = connection_benchmarks.tracemalloc
+    connection_benchmarks.tracemalloc = None  # as on Python 2
+    try:
+        phase = connection_benchmarks.Phase(trace_memory=True)
+        phase.start()
+        phase.stop()
+    finally:
+        connection_benchmarks.tracemalloc = tracemalloc
+    assert "time" in phase.results()
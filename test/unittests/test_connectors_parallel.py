@@ -140,6 +140,24 @@ class TestAllToAllConnector(unittest.TestCase):
                                                [nan, 7.0, nan, 15.0, nan]]),
                                   9)
 
+    @register()
+    def test_connect_with_random_weights_parallel_safe_in_column_blocks(self, sim=sim):
+        rd = random.RandomDistribution('uniform', (0, 1), rng=MockRNG(delta=1.0, parallel_safe=True))
+        syn = sim.StaticSynapse(weight=rd, delay=0.5)
+        C = connectors.AllToAllConnector(safe=False)
+        C.column_block_size = 3
+        prj = sim.Projection(self.p1, self.p2, C, syn)
+        # random numbers are drawn for the non-local columns too, as in column-by-column iteration
+        self.assertEqual(prj.get(["weight", "delay"], format='list', gather=False),  # use gather False because we are faking the MPI
+                         [(0, 1, 4.0, 0.5),
+                          (1, 1, 5.0, 0.5),
+                          (2, 1, 6.0, 0.5),
+                          (3, 1, 7.0, 0.5),
+                          (0, 3, 12.0, 0.5),
+                          (1, 3, 13.0, 0.5),
+                          (2, 3, 14.0, 0.5),
+                          (3, 3, 15.0, 0.5)])
+
     @register()
     def test_connect_with_distance_dependent_weights(self, sim=sim):
         d_expr = "d+100"
@@ -302,6 +320,23 @@ class TestFixedProbabilityConnector(unittest.TestCase):
                                                [nan, 1.4, nan, nan, nan]]),
                                   9)
 
+    def test_connect_sparse_parallel_safe(self, sim=sim):
+        connections = []
+        for num_processes in (1, 2):
+            sim.setup(num_processes=num_processes, rank=num_processes - 1, min_delay=0.123)
+            p1 = sim.Population(4, sim.IF_cond_exp(), structure=space.Line())
+            p2 = sim.Population(5, sim.HH_cond_exp(), structure=space.Line())
+            rd = random.RandomDistribution('uniform', (0, 1), rng=random.NumpyRNG(seed=7621, parallel_safe=True))
+            C = connectors.FixedProbabilityConnector(p_connect=0.5,
+                                                     rng=random.NumpyRNG(seed=2817, parallel_safe=True))
+            C.sparse = True
+            C.column_block_size = 2
+            prj = sim.Projection(p1, p2, C, sim.StaticSynapse(weight=rd))
+            connections.append(prj.get('weight', format='list', gather=False))
+        local_connections = [c for c in connections[0] if c[1] in (1, 3)]
+        self.assertGreater(len(local_connections), 0)
+        self.assertEqual(connections[1], local_connections)
+
     #def test_connect_with_random_delays_parallel_unsafe(self, sim=sim):
     #    rd = random.RandomDistribution('uniform', [0.1, 1.1], rng=MockRNG(start=1.0, delta=0.2, parallel_safe=False))
     #    syn = sim.StaticSynapse(delay=rd)
@@ -445,6 +480,17 @@ class TestFromFileConnector(unittest.TestCase):
                           (2, 3, 0.3, 0.12)])
 
     @register()
+    def test_connect_with_binary_file(self, sim=sim):
+        file = recording.files.BinaryConnectionFile("test.connections", mode='wb')
+        file.write(self.connection_list, {"columns": ["i", "j", "weight", "delay"]})
+        C = connectors.FromFileConnector("test.connections")
+        self.assertIsInstance(C.file, recording.files.BinaryConnectionFile)
+        syn = sim.StaticSynapse()
+        prj = sim.Projection(self.p1, self.p2, C, syn)
+        self.assertEqual(prj.get(["weight", "delay"], format='list', gather=False),  # use gather False because we are faking the MPI
+                         [(0, 1, 0.5, 0.14),
+                          (2, 3, 0.3, 0.12)])
+    @register()
     def test_with_plastic_synapses_not_distributed(self, sim=sim):
         connection_list = [
             (0, 0, 0.1, 0.1,  100, 100),
@@ -587,20 +633,12 @@ class TestFixedNumberPreConnector(unittest.TestCase):
         syn = sim.StaticSynapse()
         prj = sim.Projection(self.p2, self.p2, C, syn)
         self.assertEqual(prj.get(["weight", "delay"], format='list', gather=False),  # use gather False because we are faking the MPI
-                         [#(2, 0, 0.0, 0.123),  # [2, 3, 4] --> [2, 3, 4]
-                          #(3, 0, 0.0, 0.123),
-                          #(4, 0, 0.0, 0.123),
-                          (0, 1, 0.0, 0.123),   # [0, 1, 2] --> [0, 3, 2]
-                          #(1, 1, 0.0, 0.123),
+                         [(2, 1, 0.0, 0.123),  # [1, 2, 3] --> [2, 3, 4]
                           (3, 1, 0.0, 0.123),
-                          (2, 1, 0.0, 0.123),
-                          #(4, 2, 0.0, 0.123),  # [4, 0, 1] --> [4, 0, 1]
-                          #(0, 2, 0.0, 0.123),
-                          #(1, 2, 0.0, 0.123),
-                          (2, 3, 0.0, 0.123),   # [2, 3, 4] --> [2, 0, 4]
-                          #(3, 3, 0.0, 0.123),
+                          (4, 1, 0.0, 0.123),
+                          (4, 3, 0.0, 0.123),  # [3, 0, 1] --> [4, 0, 1]
                           (0, 3, 0.0, 0.123),
-                          (4, 3, 0.0, 0.123),
+                          (1, 3, 0.0, 0.123),
                           ])
 
     @register()
@@ -644,6 +682,76 @@ class TestFixedNumberPreConnector(unittest.TestCase):
                           (2, 3, 0.0, 0.123),
                           (1, 3, 0.0, 0.123),])
 
+    def test_independent_of_number_of_processes(self, sim=sim):
+        connections = {}
+        for num_processes, rank in ((1, 0), (2, 0), (2, 1)):
+            sim.setup(num_processes=num_processes, rank=rank, min_delay=0.123)
+            p = sim.Population(50, sim.IF_cond_exp())
+            C = connectors.FixedNumberPreConnector(n=20, allow_self_connections=False,
+                                                   rng=random.NumpyRNG(seed=876))
+            prj = sim.Projection(p, p, C, sim.StaticSynapse())
+            connections[(num_processes, rank)] = set(
+                (int(i), int(j)) for i, j, w in prj.get("weight", format='list', gather=False))
+        self.assertEqual(connections[(1, 0)], connections[(2, 0)] | connections[(2, 1)])
+        self.assertEqual(len(connections[(1, 0)]), 50 * 20)
+
+
+@register_class()
+class TestFixedNumberPostConnector(unittest.TestCase):
+
+    def setUp(self, sim=sim):
+        sim.setup(num_processes=2, rank=1, min_delay=0.123)
+        self.p1 = sim.Population(4, sim.IF_cond_exp(), structure=space.Line())
+        self.p2 = sim.Population(5, sim.HH_cond_exp(), structure=space.Line())
+        assert_array_equal(self.p2._mask_local, numpy.array([0,1,0,1,0], dtype=bool))
+
+    @register()
+    def test_with_replacement(self, sim=sim):
+        C = connectors.FixedNumberPostConnector(n=3, with_replacement=True, rng=MockRNG(delta=1))
+        syn = sim.StaticSynapse()
+        prj = sim.Projection(self.p1, self.p2, C, syn)
+        # targets: [0, 1, 2], [3, 4, 0], [1, 2, 3], [4, 0, 1]
+        self.assertEqual(prj.get(["weight", "delay"], format='list', gather=False),  # use gather False because we are faking the MPI
+                         [(0, 1, 0.0, 0.123),
+                          (2, 1, 0.0, 0.123),
+                          (3, 1, 0.0, 0.123),
+                          (1, 3, 0.0, 0.123),
+                          (2, 3, 0.0, 0.123)])
+
+    def test_requires_parallel_safe_rng(self, sim=sim):
+        C = connectors.FixedNumberPostConnector(n=3, rng=MockRNG(delta=1, parallel_safe=False))
+        self.assertRaises(NotImplementedError, sim.Projection, self.p1, self.p2, C, sim.StaticSynapse())
+
+    def test_independent_of_number_of_processes(self, sim=sim):
+        connections = {}
+        for num_processes, rank in ((1, 0), (2, 0), (2, 1)):
+            sim.setup(num_processes=num_processes, rank=rank, min_delay=0.123)
+            p = sim.Population(50, sim.IF_cond_exp())
+            C = connectors.FixedNumberPostConnector(n=20, allow_self_connections=False,
+                                                    rng=random.NumpyRNG(seed=876))
+            prj = sim.Projection(p, p, C, sim.StaticSynapse())
+            connections[(num_processes, rank)] = set(
+                (int(i), int(j)) for i, j, w in prj.get("weight", format='list', gather=False))
+        self.assertEqual(connections[(1, 0)], connections[(2, 0)] | connections[(2, 1)])
+        self.assertEqual(len(connections[(1, 0)]), 50 * 20)
+
+
+@register_class()
+class TestSmallWorldConnector(unittest.TestCase):
+
+    def test_independent_of_number_of_processes(self, sim=sim):
+        connections = {}
+        for num_processes, rank in ((1, 0), (2, 0), (2, 1)):
+            sim.setup(num_processes=num_processes, rank=rank, min_delay=0.123)
+            p = sim.Population(50, sim.IF_cond_exp(), structure=space.Line())
+            C = connectors.SmallWorldConnector(degree=3.5, rewiring=0.2,
+                                               rng=random.NumpyRNG(seed=876))
+            prj = sim.Projection(p, p, C, sim.StaticSynapse())
+            connections[(num_processes, rank)] = sorted(
+                (int(i), int(j)) for i, j, w in prj.get("weight", format='list', gather=False))
+        self.assertEqual(connections[(1, 0)],
+                         sorted(connections[(2, 0)] + connections[(2, 1)]))
+
 
 @register_class()
 class TestArrayConnector(unittest.TestCase):
@@ -16,6 +16,10 @@ from numpy import nan
 import os
 import sys
 from numpy.testing import assert_array_equal, assert_array_almost_equal
+try:
+    from unittest.mock import Mock
+except ImportError:
+    from mock import Mock
 from .mocks import MockRNG, MockRNG2, MockRNG3
 import pyNN.mock as sim
 
@@ -421,6 +425,48 @@ class TestFixedProbabilityConnector(unittest.TestCase):
                                                [  1.2,   1.4,   nan,   nan,   2.8]]),
                                   9)
 
+    @register()
+    def test_connect_with_column_blocks(self, sim=sim):
+        projections = []
+        for block_size in (1, 2):
+            rd = random.RandomDistribution('uniform', low=0.1, high=1.1, rng=MockRNG(start=1.0, delta=0.2, parallel_safe=True))
+            syn = sim.StaticSynapse(weight=lambda d: 0.1*d, delay=rd)
+            C = connectors.FixedProbabilityConnector(p_connect=0.5,
+                                                     rng=MockRNG2(1 - numpy.array([1, 0, 0, 1,
+                                                                                   0, 0, 0, 1,
+                                                                                   1, 1, 0, 0,
+                                                                                   1, 0, 1, 0,
+                                                                                   1, 1, 0, 1]),
+                                                                  parallel_safe=True))
+            C.column_block_size = block_size
+            projections.append(sim.Projection(self.p1, self.p2, C, syn))
+        assert_array_almost_equal(numpy.array(projections[0].get(["weight", "delay"], format='list')),
+                                  numpy.array(projections[1].get(["weight", "delay"], format='list')),
+                                  9)
+        assert_array_almost_equal(projections[1].get('delay', format='array'),
+                                  numpy.array([[  1.0,   nan,   1.6,   2.0,   2.4],
+                                               [  nan,   nan,   1.8,   nan,   2.6],
+                                               [  nan,   nan,   nan,   2.2,   nan],
+                                               [  1.2,   1.4,   nan,   nan,   2.8]]),
+                                  9)
+
+    def test_connect_sparse(self, sim=sim):
+        connections = []
+        for block_size in (1, 3):
+            C = connectors.FixedProbabilityConnector(p_connect=0.3,
+                                                     allow_self_connections=False,
+                                                     rng=random.NumpyRNG(seed=8658764))
+            C.sparse = True
+            C.column_block_size = block_size
+            prj = sim.Projection(self.p2, self.p2, C, sim.StaticSynapse(weight=lambda d: 0.1*d))
+            connections.append(prj.get("weight", format='list'))
+        self.assertEqual(connections[0], connections[1])
+        self.assertGreater(len(connections[0]), 0)
+        for i, j, w in connections[0]:
+            self.assertNotEqual(i, j)
+            self.assertAlmostEqual(w, 0.1*abs(i - j), 9)
+
+
 @register_class()
 class TestDistanceDependentProbabilityConnector(unittest.TestCase):
 
@@ -453,6 +499,40 @@ class TestDistanceDependentProbabilityConnector(unittest.TestCase):
                           (3, 3, 0.0, 0.123),
                           (3, 4, 0.0, 0.123)])
 
+    def test_connect_with_cutoff(self, sim=sim):
+        C = connectors.DistanceDependentProbabilityConnector(d_expression="d<1.5",
+                                                             rng=MockRNG(delta=0.01),
+                                                             cutoff=1.5)
+        syn = sim.StaticSynapse(delay="0.2 + 0.1*d")
+        prj = sim.Projection(self.p1, self.p2, C, syn)
+        assert_array_almost_equal(numpy.array(prj.get("delay", format='list')),
+                                  numpy.array([(0, 0, 0.2),
+                                               (1, 0, 0.3),
+                                               (0, 1, 0.3),
+                                               (1, 1, 0.2),
+                                               (2, 1, 0.3),
+                                               (1, 2, 0.3),
+                                               (2, 2, 0.2),
+                                               (3, 2, 0.3),
+                                               (2, 3, 0.3),
+                                               (3, 3, 0.2),
+                                               (3, 4, 0.3)]),
+                                  9)
+
+    def test_connect_sparse(self, sim=sim):
+        projections = []
+        for sparse in (False, True):
+            rd = random.RandomDistribution('uniform', (0, 1), rng=MockRNG(delta=0.1, parallel_safe=True))
+            syn = sim.StaticSynapse(weight=rd, delay="0.2 + 0.1*d")
+            C = connectors.DistanceDependentProbabilityConnector(d_expression="d<1.5",
+                                                                 rng=MockRNG(delta=0.01))
+            C.sparse = sparse
+            C.column_block_size = 2
+            projections.append(sim.Projection(self.p1, self.p2, C, syn))
+        assert_array_almost_equal(numpy.array(projections[0].get(["weight", "delay"], format='list')),
+                                  numpy.array(projections[1].get(["weight", "delay"], format='list')),
+                                  9)
+
 
 @register_class()
 class TestFromListConnector(unittest.TestCase):
@@ -508,6 +588,18 @@ class TestFromListConnector(unittest.TestCase):
         syn = sim.StaticSynapse()
         self.assertRaises(errors.ConnectionError, sim.Projection, self.p1, self.p2, C, syn)
 
+    def test_connect_in_blocks(self, sim=sim):
+        connection_list = [(i % 4, (7 * i) % 5, 0.01 * i, 0.2) for i in range(40)]
+        C = connectors.FromListConnector(connection_list)
+        C.block_size = 3  # blocks are extended to contain all the connections of a target
+        C.callback = Mock()
+        syn = sim.StaticSynapse()
+        prj = sim.Projection(self.p1, self.p2, C, syn)
+        expected = sorted(connection_list, key=lambda c: c[1])  # stable
+        self.assertEqual(prj.get(["weight", "delay"], format='list'), expected)
+        self.assertEqual(C.callback.call_count, 5)
+        self.assertEqual(C.callback.call_args[0][0], 1.0)
+
     @register()
     def test_with_plastic_synapse(self, sim=sim):
         connection_list = [
@@ -563,6 +655,20 @@ class TestFromFileConnector(unittest.TestCase):
                           (2, 3, 0.3, 0.12)])
 
     @register()
+    def test_connect_with_binary_file(self, sim=sim):
+        file = recording.files.BinaryConnectionFile("test.connections", mode='wb')
+        file.write(self.connection_list, {"columns": ["i", "j", "weight", "delay"]})
+        C = connectors.FromFileConnector("test.connections")
+        self.assertIsInstance(C.file, recording.files.BinaryConnectionFile)
+        syn = sim.StaticSynapse()
+        prj = sim.Projection(self.p1, self.p2, C, syn)
+        self.assertEqual(prj.get(["weight", "delay"], format='list'),
+                         [(0, 0, 0.1, 0.1),
+                          (3, 0, 0.2, 0.11),
+                          (0, 1, 0.5, 0.14),
+                          (2, 2, 0.4, 0.13),
+                          (2, 3, 0.3, 0.12)])
+    @register()
     def test_with_plastic_synapses_not_distributed(self, sim=sim):
         connection_list = [
             (0, 0, 0.1, 0.1,  100, 100),
@@ -761,23 +867,21 @@ class TestFixedNumberPreConnector(unittest.TestCase):
         syn = sim.StaticSynapse()
         prj = sim.Projection(self.p2, self.p2, C, syn)
         self.assertEqual(prj.get(["weight", "delay"], format='list'),  
-                         [(2, 0, 0.0, 0.123),  # [2, 3, 4] --> [2, 3, 4]
-                          (3, 0, 0.0, 0.123),
+                         [(3, 0, 0.0, 0.123),  # [2, 3, 0] --> [3, 4, 1]
                           (4, 0, 0.0, 0.123),
-                          (0, 1, 0.0, 0.123),   # [0, 1, 2] --> [0, 3, 2]
-                          #(1, 1, 0.0, 0.123),
+                          (1, 0, 0.0, 0.123),
+                          (2, 1, 0.0, 0.123),  # [1, 2, 3] --> [2, 3, 4]
                           (3, 1, 0.0, 0.123),
-                          (2, 1, 0.0, 0.123),
-                          (4, 2, 0.0, 0.123),  # [4, 0, 1] --> [4, 0, 1]
-                          (0, 2, 0.0, 0.123),
+                          (4, 1, 0.0, 0.123),
+                          (0, 2, 0.0, 0.123),  # [0, 1, 2] --> [0, 1, 3]
                           (1, 2, 0.0, 0.123),
-                          (2, 3, 0.0, 0.123),   # [2, 3, 4] --> [2, 0, 4]
-                          #(3, 3, 0.0, 0.123),
+                          (3, 2, 0.0, 0.123),
+                          (4, 3, 0.0, 0.123),  # [3, 0, 1] --> [4, 0, 1]
                           (0, 3, 0.0, 0.123),
-                          (4, 3, 0.0, 0.123),
-                          (1, 4, 0.0, 0.123),
-                          (2, 4, 0.0, 0.123),
+                          (1, 3, 0.0, 0.123),
+                          (2, 4, 0.0, 0.123),  # [2, 3, 0] --> [2, 3, 0]
                           (3, 4, 0.0, 0.123),
+                          (0, 4, 0.0, 0.123),
                           ])
 
     @register()
@@ -804,6 +908,29 @@ class TestFixedNumberPreConnector(unittest.TestCase):
                           (2, 4, 0.0, 0.123),
                           (1, 4, 0.0, 0.123)])
 
+    def test_sample_without_replacement(self):
+        rng = random.NumpyRNG(seed=98765)
+        subsets = connectors._sample_without_replacement(rng, 20, [10, 0, 3, 10, 1])
+        self.assertEqual([s.size for s in subsets], [10, 0, 3, 10, 1])
+        for subset in subsets:
+            self.assertEqual(numpy.unique(subset).size, subset.size)
+            self.assertTrue(numpy.all((subset >= 0) & (subset < 20)))
+
+    def test_no_replacement_large_population(self, sim=sim):
+        p = sim.Population(200, sim.IF_cond_exp())
+        connection_lists = []
+        for i in range(2):
+            C = connectors.FixedNumberPreConnector(n=60, allow_self_connections=False,
+                                                   rng=random.NumpyRNG(seed=2345))
+            prj = sim.Projection(p, p, C, sim.StaticSynapse())
+            connections = numpy.array(prj.get("weight", format='list'))[:, :2].astype(int)
+            for j in range(p.size):
+                sources = connections[connections[:, 1] == j, 0]
+                self.assertEqual(numpy.unique(sources).size, 60)
+                self.assertNotIn(j, sources)
+            connection_lists.append(connections)
+        assert_array_equal(connection_lists[0], connection_lists[1])
+
     @register()
     #TOCHECK
     def test_with_replacement_parallel_unsafe(self, sim=sim):
@@ -850,6 +977,110 @@ class TestFixedNumberPreConnector(unittest.TestCase):
                           (1, 4, 0.0, 0.123),])
 
 
+@register_class()
+class TestFixedNumberPostConnector(unittest.TestCase):
+
+    def setUp(self, sim=sim, **extra):
+        sim.setup(min_delay=0.123, **extra)
+        self.p1 = sim.Population(4, sim.IF_cond_exp(), structure=space.Line())
+        self.p2 = sim.Population(5, sim.HH_cond_exp(), structure=space.Line())
+
+    def tearDown(self, sim=sim):
+        sim.end()
+
+    @register()
+    def test_with_n_smaller_than_population_size(self, sim=sim):
+        C = connectors.FixedNumberPostConnector(n=3, rng=MockRNG(delta=1))
+        syn = sim.StaticSynapse()
+        prj = sim.Projection(self.p1, self.p2, C, syn)
+        # MockRNG.permutation reverses the order, so all sources connect to [4, 3, 2]
+        self.assertEqual(prj.get(["weight", "delay"], format='list'),
+                         [(0, 2, 0.0, 0.123),
+                          (1, 2, 0.0, 0.123),
+                          (2, 2, 0.0, 0.123),
+                          (3, 2, 0.0, 0.123),
+                          (0, 3, 0.0, 0.123),
+                          (1, 3, 0.0, 0.123),
+                          (2, 3, 0.0, 0.123),
+                          (3, 3, 0.0, 0.123),
+                          (0, 4, 0.0, 0.123),
+                          (1, 4, 0.0, 0.123),
+                          (2, 4, 0.0, 0.123),
+                          (3, 4, 0.0, 0.123)])
+
+    @register()
+    def test_with_replacement(self, sim=sim):
+        C = connectors.FixedNumberPostConnector(n=3, with_replacement=True, rng=MockRNG(delta=1))
+        syn = sim.StaticSynapse()
+        prj = sim.Projection(self.p1, self.p2, C, syn)
+        # targets: [0, 1, 2], [3, 4, 0], [1, 2, 3], [4, 0, 1]
+        self.assertEqual(prj.get(["weight", "delay"], format='list'),
+                         [(0, 0, 0.0, 0.123),
+                          (1, 0, 0.0, 0.123),
+                          (3, 0, 0.0, 0.123),
+                          (0, 1, 0.0, 0.123),
+                          (2, 1, 0.0, 0.123),
+                          (3, 1, 0.0, 0.123),
+                          (0, 2, 0.0, 0.123),
+                          (2, 2, 0.0, 0.123),
+                          (1, 3, 0.0, 0.123),
+                          (2, 3, 0.0, 0.123),
+                          (1, 4, 0.0, 0.123),
+                          (3, 4, 0.0, 0.123)])
+
+    def test_no_self_connections(self, sim=sim):
+        p = sim.Population(100, sim.IF_cond_exp())
+        C = connectors.FixedNumberPostConnector(n=30, allow_self_connections=False,
+                                                rng=random.NumpyRNG(seed=7654))
+        prj = sim.Projection(p, p, C, sim.StaticSynapse())
+        connections = numpy.array(prj.get("weight", format='list'))[:, :2].astype(int)
+        for i in range(p.size):
+            targets = connections[connections[:, 0] == i, 1]
+            self.assertEqual(numpy.unique(targets).size, 30)
+            self.assertNotIn(i, targets)
+
+
+@register_class()
+class TestSmallWorldConnector(unittest.TestCase):
+
+    def setUp(self, sim=sim, **extra):
+        sim.setup(min_delay=0.123, **extra)
+        self.p = sim.Population(20, sim.IF_cond_exp(), structure=space.Line())
+
+    def tearDown(self, sim=sim):
+        sim.end()
+
+    @register()
+    def test_no_rewiring(self, sim=sim):
+        C = connectors.SmallWorldConnector(degree=1.5, rewiring=0.0, allow_self_connections=False,
+                                           rng=random.NumpyRNG(seed=1))
+        prj = sim.Projection(self.p, self.p, C, sim.StaticSynapse())
+        connections = set((int(i), int(j)) for i, j, w in prj.get("weight", format='list'))
+        self.assertEqual(connections,
+                         set((i, j) for i in range(20) for j in range(20) if abs(i - j) == 1))
+
+    @register()
+    def test_n_connections(self, sim=sim):
+        C = connectors.SmallWorldConnector(degree=5.0, rewiring=0.0, n_connections=2,
+                                           rng=random.NumpyRNG(seed=1))
+        prj = sim.Projection(self.p, self.p, C, sim.StaticSynapse())
+        connections = set((int(i), int(j)) for i, j, w in prj.get("weight", format='list'))
+        self.assertEqual(connections,
+                         set([(i, i) for i in range(20)] + [(0, 1)] + [(i, i - 1) for i in range(1, 20)]))
+
+    @register()
+    def test_full_rewiring(self, sim=sim):
+        C = connectors.SmallWorldConnector(degree=2.5, rewiring=1.0, allow_self_connections=False,
+                                           rng=random.NumpyRNG(seed=1))
+        prj = sim.Projection(self.p, self.p, C, sim.StaticSynapse())
+        connections = numpy.array(prj.get("weight", format='list'))[:, :2].astype(int)
+        self.assertEqual(connections.shape[0], 4 * 20 - 6)  # the same number as without rewiring
+        self.assertFalse((connections[:, 0] == connections[:, 1]).any())
+        self.assertTrue((abs(connections[:, 0] - connections[:, 1]) > 2).any())
+        self.assertEqual(numpy.bincount(connections[:, 0], minlength=20).tolist(),
+                         [2, 3] + [4] * 16 + [3, 2])
+
+
 @register_class()
 class TestArrayConnector(unittest.TestCase):
 
@@ -900,6 +1131,27 @@ class TestArrayConnector(unittest.TestCase):
                           (2, 2, 4.0, 1.4),
                           (1, 3, 5.0, 1.5)]) 
 
+    def test_connect_sparse(self, sim=sim):
+        rd_w = random.RandomDistribution('uniform', (0, 1), rng=MockRNG(delta=1.0, parallel_safe=True))
+        syn = sim.StaticSynapse(weight=rd_w, delay=0.5)
+        connections = numpy.array([
+                [0, 1, 1, 0],
+                [1, 1, 0, 1],
+                [0, 0, 1, 0],
+            ], dtype=bool)
+        C = connectors.ArrayConnector(connections, safe=False)
+        C.sparse = True
+        C.column_block_size = 3
+        prj = sim.Projection(self.p1, self.p2, C, syn)
+        rec = prj.get(["weight", "delay"], format='list')
+        assert_array_almost_equal([tuple(r) for r in rec],
+                         [(1, 0, 0.0, 0.5),
+                          (0, 1, 1.0, 0.5),
+                          (1, 1, 2.0, 0.5),
+                          (0, 2, 3.0, 0.5),
+                          (2, 2, 4.0, 0.5),
+                          (1, 3, 5.0, 0.5)])
+
 
 
 @register_class()
@@ -1020,6 +1272,71 @@ class TestIndexBasedProbabilityConnector(unittest.TestCase):
                           (3, 3, 1., 7),
                           (2, 4, 1., 7)])
 
+    def test_block_and_column_evaluation_agree(self, sim=sim):
+        syn = sim.StaticSynapse(weight=self.IndexBasedWeights(), delay=2)
+        C_block = connectors.IndexBasedProbabilityConnector(self.IndexBasedProbability(),
+                                                            rng=random.NumpyRNG(seed=3))
+        prj_block = sim.Projection(self.p1, self.p2, C_block, syn)
+        self.assertTrue(C_block._get_column_block_size(prj_block) > 1)
+        C_column = connectors.IndexBasedProbabilityConnector(self.IndexBasedProbability(),
+                                                             rng=random.NumpyRNG(seed=3))
+        C_column.column_block_size = 1
+        prj_column = sim.Projection(self.p1, self.p2, C_column, syn)
+        self.assertEqual(prj_block.get(["weight", "delay"], format='list'),
+                         prj_column.get(["weight", "delay"], format='list'))
+
+    def test_check_vectorized(self, sim=sim):
+
+        class NotVectorized(connectors.IndexBasedExpression):
+            def __call__(self, i, j):
+                return 0.5 if i < j else 0.0
+
+        syn = sim.StaticSynapse(weight=1.0, delay=2)
+        C = connectors.IndexBasedProbabilityConnector(NotVectorized(), check_vectorized=True)
+        self.assertRaises(errors.InvalidParameterValueError,
+                          sim.Projection, self.p1, self.p2, C, syn)
+        C = connectors.IndexBasedProbabilityConnector(self.IndexBasedProbability(),
+                                                      check_vectorized=True)
+        syn = sim.StaticSynapse(weight=NotVectorized(), delay=2)
+        self.assertRaises(errors.InvalidParameterValueError,
+                          sim.Projection, self.p1, self.p2, C, syn)
+
+    def test_column_wise_expression_falls_back_to_columns(self, sim=sim):
+
+        class ColumnWiseProbability(connectors.IndexBasedExpression):
+            # written for a 1D array of pre-synaptic indices and a single post-synaptic index
+            def __call__(self, i, j):
+                return numpy.array([float((ii + j) % 3 == 0) for ii in i])
+
+        class ColumnWiseWeights(connectors.IndexBasedExpression):
+            def __call__(self, i, j):
+                return numpy.array([float(ii * j + 1) for ii in i])
+
+        syn = sim.StaticSynapse(weight=ColumnWiseWeights(), delay=2)
+        C = connectors.IndexBasedProbabilityConnector(ColumnWiseProbability())
+        prj = sim.Projection(self.p1, self.p2, C, syn)
+        self.assertEqual(C._get_column_block_size(prj), 1)
+        self.assertEqual(prj.get(["weight", "delay"], format='list'),
+                         [(0, 0, 1., 2),
+                          (3, 0, 1., 2),
+                          (2, 1, 3., 2),
+                          (1, 2, 3., 2),
+                          (4, 2, 9., 2),
+                          (0, 3, 1., 2),
+                          (3, 3, 10., 2),
+                          (2, 4, 9., 2)])
+
+    def test_displacement_expression_caches_positions(self, sim=sim):
+        expression = connectors.DisplacementDependentProbabilityConnector.DisplacementExpression(
+            lambda d: d[0])
+        expression.projection = Mock(pre=self.p1, post=self.p2)
+        i, j = numpy.meshgrid(numpy.arange(5), numpy.arange(5), indexing='ij')
+        assert_array_almost_equal(expression(i, j), (self.p2.positions[0][j] - self.p1.positions[0][i]))
+        self.p2.positions = self.p2.positions + 1.0
+        assert_array_almost_equal(expression(i, j), (self.p2.positions[0][j] - self.p1.positions[0][i] - 1.0))
+        expression.projection = Mock(pre=self.p1, post=self.p2)  # a new projection
+        assert_array_almost_equal(expression(i, j), (self.p2.positions[0][j] - self.p1.positions[0][i]))
+
 
 #TOCHECK, not included
 #class TestDisplacementDependentProbabilityConnector(unittest.TestCase):
@@ -1,5 +1,6 @@
-from pyNN.core import is_listlike
+from pyNN.core import is_listlike, SparseMatrix
 import numpy
+from numpy.testing import assert_array_equal
 
 
 def test_is_list_like_with_tuple():
@@ -20,6 +21,15 @@ def test_is_list_like_with_numpy_array():
 def test_is_list_like_with_string():
     assert not is_listlike("abcdefg")
 
+def test_sparse_matrix_sums_duplicates():
+    m = SparseMatrix([1.0, 2.0, 3.0, 4.0], [1, 0, 1, 0], [2, 1, 2, 0], (2, 3))
+    assert_array_equal(m.row, [0, 0, 1])
+    assert_array_equal(m.col, [0, 1, 2])
+    assert_array_equal(m.data, [4.0, 2.0, 4.0])
+    assert m.nnz == 3
+    assert_array_equal(m.toarray(), [[4.0, 2.0, 0.0],
+                                      [0.0, 0.0, 4.0]])
+
 #def test_is_list_like_with_file():
 #    f = file()
 #    assert not is_listlike(f)
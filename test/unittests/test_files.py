@@ -113,3 +113,51 @@ def test_HDF5ArrayFile():
         h5f.close()
     
         os.remove("tmp.h5")
+
+
+def test_StandardTextFile_read_chunks():
+    stf = files.StandardTextFile("tmp.txt", "wb")
+    data = numpy.arange(35.0).reshape((7, 5))
+    stf.write(data, {'columns': ['i', 'j', 'weight', 'delay', 'U']})
+    stf = files.StandardTextFile("tmp.txt", "r")
+    chunks = list(stf.read_chunks(chunk_size=3))
+    assert_equal([chunk.shape for chunk in chunks], [(3, 5), (3, 5), (1, 5)])
+    assert_arrays_equal(numpy.vstack(chunks), data)
+    assert_equal(stf.get_metadata()['columns'], ['i', 'j', 'weight', 'delay', 'U'])
+    stf.close()
+    os.remove("tmp.txt")
+
+
+def test_BinaryConnectionFile():
+    data = numpy.array([(0, 3, 0.1, 1.0),
+                        (1, 0, 0.2, 1.5),
+                        (2, 3, 0.3, 2.0),
+                        (2, 1, 0.4, 2.5)])
+    metadata = {'columns': ['i', 'j', 'weight', 'delay']}
+    bcf = files.BinaryConnectionFile("tmp.bin", "wb")
+    bcf.write(data, metadata)
+    assert files.BinaryConnectionFile.is_connection_file("tmp.bin")
+
+    bcf = files.BinaryConnectionFile("tmp.bin", "rb")
+    assert_equal(bcf.get_metadata(), metadata)
+    # rows are sorted by target, keeping the original order for each target
+    assert_arrays_equal(bcf.read(), data[[1, 3, 0, 2]])
+    assert_arrays_equal(bcf.read_targets([1, 3]), data[[3, 0, 2]])
+    assert_arrays_equal(bcf.read_targets([2, 5]), numpy.zeros((0, 4)))
+    bcf.close()
+    os.remove("tmp.bin")
+
+
+def test_BinaryConnectionFile_write_chunks():
+    rng = numpy.random.RandomState(123)
+    data = numpy.vstack((rng.randint(0, 50, size=1000),
+                         rng.randint(0, 20, size=1000),
+                         rng.uniform(size=1000))).T
+    bcf = files.BinaryConnectionFile("tmp.bin", "wb")
+    bcf.write_chunks(lambda: iter(numpy.array_split(data, 7)), {}, n_targets=25)
+    bcf = files.BinaryConnectionFile("tmp.bin", "rb")
+    order = numpy.argsort(data[:, 1], kind='mergesort')
+    assert_arrays_equal(bcf.read(), data[order])
+    assert_arrays_equal(bcf.read_targets([24]), numpy.zeros((0, 3)))
+    bcf.close()
+    os.remove("tmp.bin")
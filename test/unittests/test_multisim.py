@@ -0,0 +1,71 @@
+"""
+Tests of the parameter sweep runner, using the pyNN.mock backend.
+
+:copyright: Copyright 2006-2013 by the PyNN team, see AUTHORS.
+:license: CeCILL, see LICENSE for details.
+"""
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+import os
+import shutil
+import tempfile
+import numpy
+import pyNN.mock as sim
+from pyNN.multisim import ParameterSweep
+
+
+def network(sim, parameters, seed):
+    p = sim.Population(parameters["n"], sim.IF_cond_exp())
+    sim.run(parameters["t"])
+    return {"size": p.size, "t": sim.get_current_time(), "seed": seed,
+            "random": numpy.random.uniform(size=2)}
+
+
+class TestParameterSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.checkpoint_dir = tempfile.mkdtemp()
+        self.jobs = [(network, {"n": n, "t": 10.0*n}, seed)
+                     for n in (1, 2) for seed in (11, 12)]
+
+    def tearDown(self):
+        shutil.rmtree(self.checkpoint_dir)
+
+    def test_run(self):
+        sweep = ParameterSweep(sim, processes=2)
+        results = list(sweep.run(self.jobs))
+        sweep.end()
+        self.assertEqual(len(results), 4)
+        for (model, parameters, seed), data in results:
+            self.assertEqual(data["size"], parameters["n"])
+            self.assertEqual(data["t"], parameters["t"])
+            self.assertEqual(data["seed"], seed)
+            self.assertIsInstance(data["random"], numpy.ndarray)
+
+    def test_job_key_independent_of_dict_order(self):
+        sweep = ParameterSweep("pyNN.mock", processes=1)
+        sweep.end()
+        self.assertEqual(sweep.job_key(network, {"n": 1, "t": 2.0}, 3),
+                         sweep.job_key(network, dict([("t", 2.0), ("n", 1)]), 3))
+        self.assertNotEqual(sweep.job_key(network, {"n": 1, "t": 2.0}, 3),
+                            sweep.job_key(network, {"n": 1, "t": 2.0}, 4))
+
+    def test_resume_from_checkpoint(self):
+        sweep = ParameterSweep(sim, processes=2, checkpoint_dir=self.checkpoint_dir)
+        first = dict((seed + 100*parameters["n"], data["random"])
+                     for (model, parameters, seed), data in sweep.run(self.jobs[:3]))
+        self.assertEqual(len(os.listdir(self.checkpoint_dir)), 3)
+        second = dict((seed + 100*parameters["n"], data["random"])
+                      for (model, parameters, seed), data in sweep.run(self.jobs))
+        sweep.end()
+        self.assertEqual(len(os.listdir(self.checkpoint_dir)), 4)
+        # completed jobs are not run again
+        for key, values in first.items():
+            self.assertTrue((second[key] == values).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
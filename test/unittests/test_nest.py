@@ -4,6 +4,12 @@ try:
 except ImportError:
     nest = False
 from pyNN.standardmodels import StandardCellType
+from pyNN.random import RandomDistribution
+from pyNN.parameters import LazyArray
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
 try:
     import unittest2 as unittest
 except ImportError:
@@ -181,5 +187,114 @@ class TestProjection(unittest.TestCase):
         prj.set(weight=weight_array)
         self.assertTrue((weight_array == prj.get("weight", format="array")).all())
 
+@unittest.skipUnless(nest, "Requires NEST")
+class TestNESTConnectionRules(unittest.TestCase):
+    """Connectors which are equivalent to NEST connection rules use these."""
+
+    def setUp(self):
+        sim.setup()
+        self.p1 = sim.Population(5, sim.IF_cond_exp())
+        self.p2 = sim.Population(5, sim.IF_cond_exp())
+        self.p3 = sim.Population(3, sim.IF_cond_exp())
+        self.prj = sim.Projection(self.p1, self.p2, sim.OneToOneConnector())
+        self.native_rng = sim.NativeRNG()
+        self.numpy_rng = sim.NumpyRNG(seed=8658764)
+
+    def test_all_to_all(self):
+        self.assertEqual(sim.AllToAllConnector(allow_self_connections=False).rule_parameters(self.prj),
+                         {'rule': 'all_to_all', 'autapses': False, 'multapses': False})
+        self.assertEqual(sim.AllToAllConnector(allow_self_connections='NoMutual').rule_parameters(self.prj),
+                         None)
+
+    def test_fixed_probability(self):
+        connector = sim.FixedProbabilityConnector(0.3, rng=self.native_rng)
+        self.assertEqual(connector.rule_parameters(self.prj),
+                         {'rule': 'pairwise_bernoulli', 'autapses': True, 'p': 0.3})
+        connector = sim.FixedProbabilityConnector(0.3, rng=self.numpy_rng)
+        self.assertEqual(connector.rule_parameters(self.prj), None)
+
+    def test_one_to_one(self):
+        self.assertEqual(sim.OneToOneConnector().rule_parameters(self.prj),
+                         {'rule': 'one_to_one'})
+        prj = sim.Projection(self.p1, self.p3, sim.AllToAllConnector())
+        self.assertEqual(sim.OneToOneConnector().rule_parameters(prj), None)
+
+    def test_fixed_number_pre(self):
+        connector = sim.FixedNumberPreConnector(2, rng=self.native_rng)
+        self.assertEqual(connector.rule_parameters(self.prj),
+                         {'rule': 'fixed_indegree', 'autapses': True, 'multapses': False,
+                          'indegree': 2})
+        n = RandomDistribution('uniform_int', low=1, high=3, rng=self.numpy_rng)
+        self.assertEqual(sim.FixedNumberPreConnector(n, rng=self.native_rng).rule_parameters(self.prj),
+                         None)
+        self.assertEqual(sim.FixedNumberPreConnector(2, rng=self.numpy_rng).rule_parameters(self.prj),
+                         None)
+
+    def test_fixed_number_post(self):
+        connector = sim.FixedNumberPostConnector(2, allow_self_connections=False,
+                                                 with_replacement=True, rng=self.native_rng)
+        self.assertEqual(connector.rule_parameters(self.prj),
+                         {'rule': 'fixed_outdegree', 'autapses': False, 'multapses': True,
+                          'outdegree': 2})
+        self.assertEqual(sim.FixedNumberPostConnector(2, rng=self.numpy_rng).rule_parameters(self.prj),
+                         None)
+
+    def test_fixed_total_number(self):
+        connector = sim.FixedTotalNumberConnector(10, rng=self.native_rng)
+        self.assertEqual(connector.rule_parameters(self.prj),
+                         {'rule': 'fixed_total_number', 'autapses': True, 'multapses': True,
+                          'N': 10})
+        self.assertEqual(sim.FixedTotalNumberConnector(10, rng=self.numpy_rng).rule_parameters(self.prj),
+                         None)
+
+    def test_native_distribution_scaling(self):
+        connector = sim.AllToAllConnector()
+        value = LazyArray(RandomDistribution('normal', mu=0.5, sigma=0.1, rng=self.native_rng))
+        self.assertEqual(connector._native_distribution(value),
+                         {'distribution': 'normal', 'mu': 0.5, 'sigma': 0.1})
+        parameters = connector._native_distribution(1000.0 * value, scale=2.0)  # e.g. unit conversion
+        self.assertEqual(parameters['distribution'], 'normal')
+        self.assertAlmostEqual(parameters['mu'], 1000.0)
+        self.assertAlmostEqual(parameters['sigma'], 200.0)
+
+    def test_native_distribution_rejected(self):
+        connector = sim.AllToAllConnector()
+        value = LazyArray(RandomDistribution('normal', mu=0.5, sigma=0.1, rng=self.native_rng))
+        self.assertEqual(connector._native_distribution(value, scale=-1.0), None)
+        self.assertEqual(connector._native_distribution(value + 1.0), None)
+        exponential = LazyArray(RandomDistribution('exponential', beta=2.0, rng=self.native_rng))
+        self.assertEqual(connector._native_distribution(exponential),
+                         {'distribution': 'exponential', 'lambda': 2.0})
+        self.assertEqual(connector._native_distribution(exponential, scale=2.0), None)
+        pynn_rng = LazyArray(RandomDistribution('normal', mu=0.5, sigma=0.1, rng=self.numpy_rng))
+        self.assertEqual(connector._native_distribution(pynn_rng), None)
+
+    def test_connect_with_native_rule(self):
+        with patch.object(sim.Projection, '_connect') as _connect:
+            sim.Projection(self.p1, self.p2, sim.AllToAllConnector(),
+                           sim.StaticSynapse(weight=0.1, delay=0.5))
+        self.assertEqual(_connect.call_count, 1)
+        rule_params, syn_params = _connect.call_args[0]
+        self.assertEqual(rule_params['rule'], 'all_to_all')
+        self.assertAlmostEqual(syn_params['weight'], 100.0)  # nS in NEST
+        self.assertAlmostEqual(syn_params['delay'], 0.5)
+        prj = sim.Projection(self.p1, self.p2, sim.AllToAllConnector(),
+                             sim.StaticSynapse(weight=0.1, delay=0.5))
+        self.assertEqual(len(prj), 25)
+        assert_array_almost_equal(prj.get('weight', format='array'), 0.1 * numpy.ones((5, 5)))
+
+    def test_fallback_to_generic_connect(self):
+        # a weight which is a function of distance cannot be handled by NEST
+        synapse = sim.StaticSynapse(weight=lambda d: 0.1 + 0.01 * d, delay=0.5)
+        # a PyNN RNG cannot be used by NEST
+        connector = sim.FixedProbabilityConnector(0.5, rng=self.numpy_rng)
+        for connector, synapse_type in ((sim.AllToAllConnector(), synapse),
+                                        (connector, sim.StaticSynapse(weight=0.1))):
+            with patch.object(sim.Projection, '_connect') as _connect:
+                prj = sim.Projection(self.p1, self.p2, connector, synapse_type)
+            self.assertEqual(_connect.call_count, 0)
+            self.assertTrue(len(prj) > 0)
+
+
 if __name__ == '__main__':
     unittest.main()
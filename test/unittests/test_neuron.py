@@ -14,6 +14,7 @@ try:
     import pyNN.neuron as sim
     from pyNN.neuron.standardmodels import electrodes
     from pyNN.neuron import recording, simulator, cells
+    from pyNN.neuron import populations as neuron_populations
 except ImportError:
     sim = False
     h = Mock()
@@ -337,6 +338,97 @@ class TestProjection(unittest.TestCase):
                              synapse_type=sim.TsodyksMarkramSynapse())
 
 
+@unittest.skipUnless(sim, "Requires NEURON")
+class TestBulkProjection(unittest.TestCase):
+    """Static connections are held in a hoc List of NetCons and NumPy arrays."""
+
+    def setUp(self):
+        sim.setup()
+        self.p1 = sim.Population(3, sim.IF_cond_exp())
+        self.p2 = sim.Population(2, sim.IF_cond_exp())
+        self.p3 = sim.Population(2, sim.IF_curr_alpha())
+        self.connector = sim.FromListConnector([(0, 1, 0.1, 0.5), (2, 0, 0.2, 0.7)])
+
+    def assertNetConsMatchArrays(self, prj):
+        data = prj._connection_data
+        self.assertEqual(prj._netcons.count(), data['weight'].size)
+        for i in range(len(prj)):
+            nc = prj._netcons.o(i)
+            self.assertAlmostEqual(nc.weight[0], data['weight'][i], places=12)
+            self.assertAlmostEqual(nc.delay, data['delay'][i], places=12)
+            self.assertEqual(int(nc.srcgid()), int(prj.pre[data['presynaptic_index'][i]]))
+
+    def test_connect_block(self):
+        prj = sim.Projection(self.p1, self.p2, self.connector, sim.StaticSynapse())
+        self.assertTrue(prj._bulk)
+        self.assertEqual(len(prj), 2)
+        self.assertEqual(prj._connections, {0: {}, 1: {}})  # no per-connection objects
+        self.assertNetConsMatchArrays(prj)
+        assert_array_almost_equal(sorted(prj.get(['weight', 'delay'], format='list')),
+                                  [(0, 1, 0.1, 0.5), (2, 0, 0.2, 0.7)])
+
+    def test_convergent_connect(self):
+        prj = sim.Projection(self.p1, self.p2, sim.AllToAllConnector(),
+                             sim.StaticSynapse(weight=0.1, delay=0.5))
+        self.assertEqual(len(prj), 6)
+        prj._convergent_connect(numpy.array([0, 1]), 0, weight=numpy.array([0.3, 0.4]), delay=0.6)
+        self.assertEqual(len(prj), 8)
+        self.assertEqual(prj._connections, {0: {}, 1: {}})
+        self.assertEqual([(c.presynaptic_index, c.postsynaptic_index) for c in prj[6:8]],
+                         [(0, 0), (1, 0)])
+        self.assertAlmostEqual(prj[7].weight, 0.4, places=12)
+        self.assertAlmostEqual(prj[7].delay, 0.6, places=12)
+        self.assertNetConsMatchArrays(prj)
+
+    def test_getitem_and_iteration(self):
+        prj = sim.Projection(self.p1, self.p2, self.connector, sim.StaticSynapse())
+        connections = list(prj.connections)
+        self.assertEqual(len(connections), 2)
+        for i, connection in enumerate(connections):
+            self.assertIsInstance(connection, simulator.ConnectionView)
+            self.assertIsInstance(prj[i], simulator.ConnectionView)
+            self.assertEqual(prj[i].as_tuple('presynaptic_index', 'postsynaptic_index', 'weight', 'delay'),
+                             connection.as_tuple('presynaptic_index', 'postsynaptic_index', 'weight', 'delay'))
+        self.assertEqual(sorted((c.presynaptic_cell, c.postsynaptic_cell, c.weight, c.delay)
+                                for c in connections),
+                         [(self.p1[0], self.p2[1], 0.1, 0.5), (self.p1[2], self.p2[0], 0.2, 0.7)])
+        self.assertRaises(IndexError, prj.__getitem__, 2)
+        connections[0].weight = 0.9
+        connections[0].delay = 1.1
+        self.assertEqual(prj._connection_data['weight'][0], 0.9)
+        self.assertNetConsMatchArrays(prj)
+
+    def test_get_reads_arrays(self):
+        prj = sim.Projection(self.p1, self.p2, self.connector, sim.StaticSynapse())
+        prj._connection_data['weight'][:] = [0.3, 0.4]
+        weights = prj.get('weight', format='array')
+        self.assertEqual(weights.shape, (3, 2))
+        self.assertEqual(numpy.isnan(weights).sum(), 4)
+        self.assertEqual(sorted(weights[~numpy.isnan(weights)]), [0.3, 0.4])
+        self.assertEqual(sorted(prj.get('delay', format='list', with_address=False)), [0.5, 0.7])
+
+    def test_set_changes_only_existing_connections(self):
+        prj = sim.Projection(self.p1, self.p2, self.connector, sim.StaticSynapse())
+        prj.set(weight=numpy.array([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]]), delay=0.8)
+        self.assertEqual(len(prj), 2)
+        assert_array_equal(prj.get('weight', format='array'),
+                           numpy.array([[numpy.nan, 2.0], [numpy.nan, numpy.nan], [5.0, numpy.nan]]))
+        assert_array_almost_equal(prj.get('delay', format='list', with_address=False), [0.8, 0.8])
+        self.assertNetConsMatchArrays(prj)
+
+    def test_set_inhibitory_weights(self):
+        prj = sim.Projection(self.p1, self.p3, sim.AllToAllConnector(),
+                             sim.StaticSynapse(weight=-0.2, delay=0.5),
+                             receptor_type='inhibitory')
+        assert_array_almost_equal(prj.get('weight', format='list', with_address=False),
+                                  -0.2 * numpy.ones(6))
+        prj.set(weight=-0.5)
+        assert_array_almost_equal(prj.get('weight', format='list', with_address=False),
+                                  -0.5 * numpy.ones(6))
+        self.assertNetConsMatchArrays(prj)
+        self.assertTrue(all(prj._netcons.o(i).weight[0] < 0 for i in range(len(prj))))
+
+
 @unittest.skipUnless(sim, "Requires NEURON")
 class TestCurrentSources(unittest.TestCase):
 
@@ -434,5 +526,36 @@ class TestStandardIF(unittest.TestCase):
         self.assertAlmostEqual(cell.c_m, 0.246, places=10)
 
 
+
+@unittest.skipUnless(sim, "Requires NEURON")
+class TestMembInitPointers(unittest.TestCase):
+
+    class Cell(object):
+        def memb_init(self):
+            pass
+        def memb_init_pointers(self):
+            return {'v': 1}
+
+    def test_pointers_used_when_defined_together(self):
+        class SubCell(self.Cell):
+            pass
+        self.assertEqual(neuron_populations._memb_init_pointers(SubCell()), {'v': 1})
+
+    def test_no_pointers_if_memb_init_overridden(self):
+        class ExtraStateCell(self.Cell):
+            def memb_init(self):
+                self.w = 0.0
+        self.assertIs(neuron_populations._memb_init_pointers(ExtraStateCell()), None)
+
+        class ExtraStatePointersCell(ExtraStateCell):
+            def memb_init_pointers(self):
+                return {'v': 1, 'w': 2}
+        self.assertEqual(neuron_populations._memb_init_pointers(ExtraStatePointersCell()),
+                         {'v': 1, 'w': 2})
+
+    def test_no_pointers_for_cells_without_the_method(self):
+        self.assertIs(neuron_populations._memb_init_pointers(object()), None)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,189 @@
+import pyNN.numpy_sim as sim
+from pyNN.standardmodels import StandardCellType
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+try:
+    basestring
+except NameError:
+    basestring = str
+import numpy
+from numpy.testing import assert_array_equal, assert_array_almost_equal
+
+
+class TestFunctions(unittest.TestCase):
+
+    def tearDown(self):
+        sim.setup()
+
+    def test_list_standard_models(self):
+        cell_types = sim.list_standard_models()
+        self.assertTrue(len(cell_types) >= 6)
+        self.assertIsInstance(cell_types[0], basestring)
+
+    def test_setup(self):
+        sim.setup(timestep=0.05, min_delay=0.1, max_delay=1.0, rng_seed=87)
+        self.assertEqual(sim.get_time_step(), 0.05)
+        self.assertEqual(sim.get_min_delay(), 0.1)
+        self.assertEqual(sim.get_current_time(), 0.0)
+        self.assertEqual(sim.simulator.state.rng.uniform(),
+                         numpy.random.RandomState(87).uniform())
+
+    def test_run(self):
+        sim.setup(timestep=0.1)
+        sim.run(12.3)
+        self.assertAlmostEqual(sim.get_current_time(), 12.3)
+        self.assertEqual(sim.simulator.state.n_steps, 123)
+        sim.reset()
+        self.assertEqual(sim.get_current_time(), 0.0)
+
+
+class TestSimulation(unittest.TestCase):
+
+    def setUp(self):
+        sim.setup(timestep=0.1, min_delay=0.1, rng_seed=29)
+
+    def test_regular_firing(self):
+        """With constant input current, the interspike interval should match the analytical value."""
+        p = sim.Population(3, sim.IF_curr_exp(i_offset=[1.0, 1.5, 2.0], tau_refrac=2.0,
+                                              v_rest=-65.0, v_reset=-65.0, v_thresh=-50.0,
+                                              tau_m=20.0, cm=1.0))
+        p.record('spikes')
+        sim.run(500.0)
+        spiketrains = p.get_data().segments[0].spiketrains
+        for i_offset, spiketrain in zip([1.0, 1.5, 2.0], spiketrains):
+            R = 20.0/1.0
+            expected_isi = 2.0 + 20.0*numpy.log(R*i_offset/(R*i_offset - 15.0))
+            isi = numpy.diff(spiketrain.magnitude)
+            self.assertTrue(numpy.all(abs(isi - expected_isi) <= 0.1 + 1e-9))
+
+    def test_record_v(self):
+        p = sim.Population(2, sim.IF_cond_alpha(v_rest=-60.0))
+        p.initialize(v=-70.0)
+        p.record('v', sampling_interval=1.0)
+        sim.run(50.0)
+        v = p.recorder._get_all_signals('v', p.all_cells)
+        self.assertEqual(v.shape, (51, 2))
+        assert_array_equal(v[0], [-70.0, -70.0])
+        self.assertTrue(numpy.all(numpy.diff(v[:, 0]) > 0))
+        self.assertTrue(abs(v[-1, 0] + 60.0) < 1.0)
+
+    def test_synaptic_delay(self):
+        pre = sim.Population(1, sim.IF_curr_exp(i_offset=1.0))
+        post = sim.Population(2, sim.IF_cond_exp())
+        prj = sim.Projection(pre, post, sim.AllToAllConnector(),
+                             sim.StaticSynapse(weight=0.5, delay=[[2.0, 4.0]]))
+        post.record('gsyn_exc')
+        pre.record('spikes')
+        sim.run(40.0)
+        t_spike = float(pre.get_data().segments[0].spiketrains[0][0])
+        gsyn = post.recorder._get_all_signals('gsyn_exc', post.all_cells)
+        arrival = gsyn.argmax(axis=0) * 0.1
+        assert_array_almost_equal(arrival, [t_spike + 2.0, t_spike + 4.0])
+        # the conductance has already decayed for one time step when it is sampled
+        assert_array_almost_equal(gsyn.max(axis=0), 0.5*numpy.exp(-0.1/5.0)*numpy.ones(2))
+
+    def test_projection_attributes(self):
+        pre = sim.Population(3, sim.SpikeSourcePoisson())
+        post = sim.Population(2, sim.IF_cond_exp())
+        prj = sim.Projection(pre, post, sim.AllToAllConnector(),
+                             sim.StaticSynapse(weight=0.1, delay=0.5))
+        self.assertEqual(len(prj), 6)
+        prj.set(weight=lambda d: 0.2)
+        weights = prj.get('weight', format='array')
+        assert_array_equal(weights, 0.2*numpy.ones((3, 2)))
+        self.assertEqual(prj[0].delay, 0.5)
+        connection = prj[3]
+        self.assertEqual(connection.presynaptic_cell, pre[connection.presynaptic_index])
+        connection.weight = 0.7
+        self.assertEqual(prj.get('weight', format='array')[connection.presynaptic_index,
+                                                           connection.postsynaptic_index], 0.7)
+
+    def _record_network(self, run, **record_options):
+        sim.setup(timestep=0.1, min_delay=0.1, rng_seed=29)
+        p = sim.Population(3, sim.IF_curr_exp(i_offset=[1.0, 1.5, 2.0], tau_refrac=2.0,
+                                              v_rest=-65.0, v_reset=-65.0, v_thresh=-50.0))
+        p.record(['spikes', 'v'], **record_options)
+        run()
+        return p.get_data().segments[0]
+
+    def assertSegmentsEqual(self, segment, expected):
+        self.assertEqual(len(segment.spiketrains), len(expected.spiketrains))
+        for st, expected_st in zip(segment.spiketrains, expected.spiketrains):
+            self.assertEqual(st.annotations['source_id'], expected_st.annotations['source_id'])
+            self.assertEqual(float(st.t_start), float(expected_st.t_start))
+            self.assertEqual(float(st.t_stop), float(expected_st.t_stop))
+            assert_array_equal(st.magnitude, expected_st.magnitude)
+        v, = segment.analogsignalarrays
+        expected_v, = expected.analogsignalarrays
+        self.assertEqual(float(v.t_start), float(expected_v.t_start))
+        assert_array_equal(v.channel_index, expected_v.channel_index)
+        assert_array_equal(v.magnitude, expected_v.magnitude)
+
+    def test_streamed_data_match_unstreamed(self):
+        def run():
+            sim.run(23.0)  # not a multiple of the stream interval, so data are
+            sim.run(22.0)  # left in the simulator at the end
+        expected = self._record_network(run)
+        self.assertTrue(sum(st.size for st in expected.spiketrains) > 3)
+        segment = self._record_network(run, stream_interval=10.0)
+        self.assertEqual(segment.analogsignalarrays[0].shape, (451, 3))
+        self.assertSegmentsEqual(segment, expected)
+
+    def test_streamed_data_match_unstreamed_with_sampling_interval(self):
+        expected = self._record_network(lambda: sim.run(45.0), sampling_interval=1.0)
+        segment = self._record_network(lambda: sim.run(45.0), sampling_interval=1.0,
+                                       stream_interval=10.0)
+        self.assertEqual(segment.analogsignalarrays[0].shape, (46, 3))
+        self.assertSegmentsEqual(segment, expected)
+
+    def test_run_async_data_match_run(self):
+        expected = self._record_network(lambda: sim.run(45.0))
+        chunks = []
+        def run():
+            chunks.extend(sim.run_async(45.0, chunk=10.0))
+        segment = self._record_network(run)
+        population = list(chunks[0].segments)[0]
+        self.assertEqual(len(chunks), 5)
+        self.assertSegmentsEqual(segment, expected)
+        # the data in the chunks, put together, are the same as those from get_data()
+        spikes = [numpy.hstack([chunk_segment.spiketrains[i].magnitude
+                                for chunk in chunks
+                                for chunk_segment in chunk.segments[population]])
+                  for i in range(3)]
+        for st, expected_st in zip(spikes, expected.spiketrains):
+            assert_array_equal(st, expected_st.magnitude)
+
+    def test_set_does_not_change_shared_arrays(self):
+        tau_m = numpy.array([10.0, 20.0, 30.0])
+        celltype = sim.IF_curr_exp(tau_m=tau_m)
+        p = sim.Population(3, celltype)
+        q = sim.Population(3, celltype)
+        p[0:2].set(tau_m=99.0)
+        assert_array_equal(p.get('tau_m'), [99.0, 99.0, 30.0])
+        assert_array_equal(tau_m, [10.0, 20.0, 30.0])
+        assert_array_equal(q.get('tau_m'), [10.0, 20.0, 30.0])
+
+    def test_poisson_rate(self):
+        p = sim.Population(200, sim.SpikeSourcePoisson(rate=20.0))
+        p.record('spikes')
+        sim.run(1000.0)
+        counts = p.get_spike_counts()
+        mean_rate = numpy.mean(list(counts.values()))
+        self.assertTrue(17.0 < mean_rate < 23.0)
+
+    def test_dc_source(self):
+        p = sim.Population(2, sim.IF_curr_exp(v_thresh=0.0))
+        source = sim.DCSource(amplitude=0.5, start=10.0, stop=30.0)
+        p[0:1].inject(source)
+        p.record('v')
+        sim.run(40.0)
+        v = p.recorder._get_all_signals('v', p.all_cells)
+        self.assertEqual(v[100, 0], -65.0)
+        self.assertTrue(v[300, 0] > -60.0)
+        assert_array_equal(v[:, 1], -65.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -123,6 +123,30 @@ def test_columnwise_iteration_with_random_array_parallel_safe_with_mask():
     assert_array_almost_equal(cols[0], copy_input.next(12, mask_local=False)[8:], 15)
     random.get_mpi_config = orig_get_mpi_config
 
+def test_columnwise_iteration_in_blocks_with_function():
+    input = lambda i,j: 2*i + j
+    m = LazyArray(input, shape=(4,3))
+    cols = [col for col in m.by_column(block_size=2)]
+    assert_equal(len(cols), 3)
+    assert_array_equal(cols[0], np.array([0, 2, 4, 6]))
+    assert_array_equal(cols[2], np.array([2, 4, 6, 8]))
+
+def test_columnwise_iteration_in_blocks_with_random_array_parallel_safe_with_mask():
+    orig_get_mpi_config = random.get_mpi_config
+    random.get_mpi_config = lambda: (0, 2)
+    input = random.RandomDistribution('uniform', (0, 1), rng=MockRNG(parallel_safe=True))
+    copy_input = random.RandomDistribution('gamma', (2, 3), rng=MockRNG(parallel_safe=True))
+    m = LazyArray(input, shape=(4,3))
+    mask = np.array([True, False, True])
+    blocks = [block for block in m.by_column_block(2, mask=mask)]
+    expected = copy_input.next(12, mask_local=False)
+    assert_equal(len(blocks), 2)
+    assert_array_equal(blocks[0][0], np.array([0]))
+    assert_array_almost_equal(blocks[0][1], expected[0:4].reshape((4, 1)), 15)
+    assert_array_equal(blocks[1][0], np.array([2]))
+    assert_array_almost_equal(blocks[1][1], expected[8:].reshape((4, 1)), 15)
+    random.get_mpi_config = orig_get_mpi_config
+
 def test_evaluate_with_flat_array():
     m = LazyArray(5, shape=(4,3))
     assert_array_equal(m.evaluate(), 5*np.ones((4,3)))
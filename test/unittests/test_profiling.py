@@ -0,0 +1,105 @@
+import os
+import time
+import tempfile
+from pyNN import profiling
+import pyNN.mock as sim
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+
+class TestSpans(unittest.TestCase):
+
+    def setUp(self):
+        profiling.clear()
+        profiling.enable(track_memory=False)
+
+    def tearDown(self):
+        profiling.disable()
+        profiling.clear()
+
+    def test_disabled(self):
+        profiling.disable()
+        with profiling.span("a"):
+            pass
+        self.assertEqual(profiling.get_stats(), {})
+
+    def test_count_and_time(self):
+        for i in range(3):
+            with profiling.span("a"):
+                time.sleep(0.01)
+        stats = profiling.get_stats()["a"]
+        self.assertEqual(stats["count"], 3)
+        self.assertTrue(stats["total_time"] >= 0.03)
+        self.assertAlmostEqual(stats["self_time"], stats["total_time"])
+
+    def test_nested_spans(self):
+        with profiling.span("outer"):
+            with profiling.span("inner"):
+                time.sleep(0.02)
+        stats = profiling.get_stats()
+        self.assertTrue(stats["outer"]["total_time"] >= stats["inner"]["total_time"])
+        self.assertTrue(stats["outer"]["self_time"] < 0.01)
+
+    def test_reentrant_span_counted_once(self):
+
+        @profiling.profiled("f")
+        def f(n):
+            if n > 0:
+                f(n - 1)
+
+        f(3)
+        self.assertEqual(profiling.get_stats()["f"]["count"], 1)
+
+    def test_track_memory(self):
+        if profiling.tracemalloc is None:
+            self.skipTest("requires tracemalloc")
+        profiling.enable(track_memory=True)
+        with profiling.span("alloc"):
+            x = bytearray(10**6)
+        self.assertTrue(profiling.get_stats()["alloc"]["memory"] >= 10**6)
+
+    def test_memory_tracking_is_opt_in(self):
+        self.assertFalse(profiling._track_memory)
+
+    def test_disable_leaves_user_tracemalloc_running(self):
+        if profiling.tracemalloc is None:
+            self.skipTest("requires tracemalloc")
+        tracemalloc = profiling.tracemalloc
+        tracemalloc.start()
+        try:
+            profiling.enable(track_memory=True)
+            profiling.disable()
+            self.assertTrue(tracemalloc.is_tracing())
+        finally:
+            tracemalloc.stop()
+        profiling.enable(track_memory=True)
+        self.assertTrue(tracemalloc.is_tracing())
+        profiling.disable()
+        self.assertFalse(tracemalloc.is_tracing())
+
+
+class TestReport(unittest.TestCase):
+
+    def tearDown(self):
+        profiling.disable()
+        profiling.clear()
+
+    def test_setup_and_end(self):
+        fd, filename = tempfile.mkstemp()
+        os.close(fd)
+        sim.setup(profile=filename, profile_memory=False)
+        p = sim.Population(10, sim.IF_cond_exp())
+        prj = sim.Projection(p, p, sim.FixedProbabilityConnector(0.5), sim.StaticSynapse())
+        sim.run(10.0)
+        stats = profiling.get_stats()
+        for name in ("Population.__init__", "Population._create_cells",
+                     "Connector.connect", "StandardModelType.translate", "run_until"):
+            self.assertIn(name, stats)
+        self.assertEqual(stats["Population.__init__"]["count"], 1)
+        sim.end()
+        with open(filename) as fp:
+            report = fp.read()
+        os.remove(filename)
+        self.assertIn("Connector.connect", report)
@@ -184,6 +184,32 @@ class ProjectionTest(unittest.TestCase):
         weights = prj.get("weight", format="array", gather=False)  # use gather False because we are faking the MPI
         assert_array_equal(weights, target)
 
+    @register()
+    def test_get_weights_as_arrays(self, sim=sim):
+        prj = sim.Projection(self.p1, self.p2, connector=self.all2all, synapse_type=self.syn2)
+        i, j, weights = prj.get("weight", format="arrays", gather=False)
+        target = numpy.array(prj.get("weight", format="list", gather=False))
+        assert_array_equal(i, target[:, 0])
+        assert_array_equal(j, target[:, 1])
+        assert_array_equal(weights, target[:, 2])
+        self.assertEqual(i.dtype.kind, 'i')
+
+    @register()
+    def test_get_weights_as_arrays_no_address(self, sim=sim):
+        prj = sim.Projection(self.p1, self.p2, connector=self.all2all, synapse_type=self.syn2)
+        weights = prj.get("weight", format="arrays", gather=False, with_address=False)
+        assert_array_equal(weights, 0.012*numpy.ones((self.p1.size*self.p2.size,)))
+
+    @register()
+    def test_get_weights_as_sparse_with_multapses(self, sim=sim):
+        C = sim.FixedNumberPreConnector(n=7, rng=MockRNG(delta=1))
+        prj = sim.Projection(self.p2, self.p3, C, synapse_type=self.syn1)
+        weights = prj.get("weight", format="sparse", gather=False)
+        self.assertEqual(weights.shape, (self.p2.size, self.p3.size))
+        self.assertEqual(weights.nnz, self.p2.size*self.p3.size)
+        assert_array_equal(weights.toarray(),
+                           prj.get("weight", format="array", gather=False))
+
     @register()
     def test_synapse_with_lambda_parameter(self, sim=sim):
         syn = sim.StaticSynapse(weight=lambda d: 0.01+0.001*d)
@@ -171,3 +171,235 @@ def test_metadata_property():
 
 #def test_count__other():
 
+
+
+class MockBarrier(object):
+    """
+    Re-usable barrier for `parties` threads (threading.Barrier is not
+    available in Python 2).
+    """
+
+    def __init__(self, parties):
+        import threading
+        self.parties = parties
+        self.count = 0
+        self.generation = 0
+        self.condition = threading.Condition()
+
+    def wait(self):
+        with self.condition:
+            generation = self.generation
+            self.count += 1
+            if self.count == self.parties:
+                self.count = 0
+                self.generation += 1
+                self.condition.notify_all()
+            else:
+                while generation == self.generation:
+                    self.condition.wait()
+
+
+class MockMPIComm(object):
+    """
+    Emulates the collective operations of an MPI communicator, for a group of
+    threads which each play the part of one MPI node.
+    """
+
+    def __init__(self, rank, size, shared):
+        self.rank = rank
+        self.size = size
+        self.shared = shared
+
+    def _exchange(self, obj):
+        self.shared['barrier'].wait()
+        self.shared['slots'][self.rank] = obj
+        self.shared['barrier'].wait()
+        result = list(self.shared['slots'])
+        self.shared['barrier'].wait()
+        return result
+
+    def gather(self, obj, root=0):
+        result = self._exchange(obj)
+        return result if self.rank == root else None
+
+    def allgather(self, obj):
+        return self._exchange(obj)
+
+    def _fill(self, sendbuf, recvbuf):
+        parts = self._exchange(numpy.array(sendbuf[0]))
+        if recvbuf is not None:
+            buffer, (counts, displacements), mpi_type = recvbuf
+            for part, displacement in zip(parts, displacements):
+                buffer[displacement:displacement + part.size] = part
+
+    def Gatherv(self, sendbuf, recvbuf, root=0):
+        self._fill(sendbuf, recvbuf if self.rank == root else None)
+
+    def Allgatherv(self, sendbuf, recvbuf):
+        self._fill(sendbuf, recvbuf)
+
+
+def _run_on_mock_nodes(func, local_data):
+    import threading
+    size = len(local_data)
+    shared = {'barrier': MockBarrier(size), 'slots': [None] * size}
+    results = [None] * size
+    orig_get_mpi_comm = recording.get_mpi_comm
+    thread_comm = threading.local()
+    recording.get_mpi_comm = lambda: (thread_comm.comm, {'DOUBLE': 'd', 'INT64': 'q'})
+
+    def node(rank):
+        thread_comm.comm = MockMPIComm(rank, size, shared)
+        results[rank] = func(*local_data[rank])
+    threads = [threading.Thread(target=node, args=(rank,)) for rank in range(size)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        recording.get_mpi_comm = orig_get_mpi_comm
+    return results
+
+
+def test_gather_arrays():
+    local_data = [([numpy.array([0, 1]), numpy.array([0.5, 1.5])],),
+                  ([numpy.array([], dtype=int), numpy.array([])],),
+                  ([numpy.array([2, 3, 4]), numpy.array([2.5, 3.5, 4.5])],)]
+    results = _run_on_mock_nodes(recording.gather_arrays, local_data)
+    ids, values = results[0]
+    assert_equal(ids.dtype.kind, 'i')
+    assert_arrays_equal(ids, numpy.arange(5))
+    assert_arrays_equal(values, numpy.arange(5) + 0.5)
+    # non-root nodes get their own data back
+    assert_arrays_equal(results[2][0], numpy.array([2, 3, 4]))
+
+
+def test_gather_arrays_all():
+    local_data = [([numpy.array([1.0, 2.0])], True),
+                  ([numpy.array([3.0])], True)]
+    results = _run_on_mock_nodes(recording.gather_arrays, local_data)
+    for (values,) in results:
+        assert_arrays_equal(values, numpy.array([1.0, 2.0, 3.0]))
+
+
+def test_streaming_store_signals():
+    import tempfile
+    from pyNN.recording.streaming import StreamingStore
+    store = StreamingStore(tempfile.mkdtemp())
+    ids = numpy.array([3, 5, 7])
+    store.append_signal('v', ids, numpy.arange(12.0).reshape((4, 3)), 0.0, 0.5)
+    # the second chunk starts with the last time point of the first one
+    store.append_signal('v', ids, numpy.arange(9.0, 18.0).reshape((3, 3)), 1.5, 0.5)
+    assert_equal(store.signals['v']['n_samples'], 6)
+    assert_arrays_equal(store.get_signal('v'), numpy.arange(18.0).reshape((6, 3)))
+    assert_arrays_equal(store.get_signal('v', [5]), numpy.arange(1.0, 18.0, 3).reshape((6, 1)))
+    assert_raises(ValueError, store.append_signal, 'v', ids[:2], numpy.zeros((2, 2)), 2.5, 0.5)
+    store.clear()
+    assert_equal(store.signals, {})
+    assert_equal(store.t_start, None)
+
+
+def test_streaming_store_spikes():
+    import tempfile
+    from pyNN.recording.streaming import StreamingStore
+    store = StreamingStore(tempfile.mkdtemp())
+    store.append_spikes([1, 2, 1], [0.5, 0.7, 0.9], 0.0)
+    store.append_spikes([2, 1], [1.2, 1.4], 1.0)
+    assert_equal(store.n_spikes, 5)
+    ids, times = store.get_spikes()
+    spiketimes = recording.split_by_id(ids, times, [1, 2, 3])
+    assert_arrays_equal(spiketimes[0], numpy.array([0.5, 0.9, 1.4]))
+    assert_arrays_equal(spiketimes[1], numpy.array([0.7, 1.2]))
+    assert_equal(spiketimes[2].size, 0)
+
+
+def test_split_by_id():
+    senders = numpy.array([3, 1, 2, 3, 1, 3])
+    times = numpy.array([0.1, 0.2, 0.3, 0.4, 0.5, 0.6])
+    values = recording.split_by_id(senders, times, [1, 3, 4, 2])
+    assert_arrays_equal(values[0], numpy.array([0.2, 0.5]))
+    assert_arrays_equal(values[1], numpy.array([0.1, 0.4, 0.6]))  # original order is kept
+    assert_equal(values[2].size, 0)
+    assert_arrays_equal(values[3], numpy.array([0.3]))
+
+
+def test_count_by_id():
+    senders = numpy.array([3, 1, 2, 3, 1, 3])
+    assert_equal(recording.count_by_id(senders, [1, 2, 3, 4]),
+                 {1: 2, 2: 1, 3: 3, 4: 0})
+    assert_equal(recording.count_by_id(numpy.array([], dtype=int), [1]), {1: 0})
+
+
+def test_stream_flushes_during_run():
+    import pyNN.mock as sim
+    sim.setup()
+    p = sim.Population(3, sim.IF_cond_exp())
+    p.record('spikes', stream_interval=10.0)
+    p.recorder.flush = Mock()
+    sim.run(35.0)
+    assert_equal(p.recorder.flush.call_count, 3)
+    assert_equal(sim.get_current_time(), 35.0)
+    sim.end()
+
+
+def test_stop_streaming_keeps_streamed_data_until_end_of_segment():
+    import pyNN.mock as sim
+    sim.setup()
+    p = sim.Population(3, sim.IF_cond_exp())
+    p.record('spikes', stream_interval=10.0)
+    recorder = p.recorder
+    recorder._stream.append_spikes([int(p[0])], [1.5], 0.0)
+    directory = recorder._stream.directory
+    recorder.stop_streaming()
+    assert not recorder.streaming
+    assert_equal(recorder._stream.n_spikes, 1)  # still returned by get()
+    recorder.flush = Mock()
+    sim.run(35.0)
+    assert_equal(recorder.flush.call_count, 0)
+    recorder.clear()
+    assert_equal(recorder._stream, None)
+    assert not os.path.exists(directory)
+    sim.end()
+
+
+def test_DataCache_spills_to_disk():
+    import neo
+    cache = recording.DataCache(max_in_memory=2)
+    segments = [neo.Segment(name="segment%d" % i) for i in range(5)]
+    for segment in segments:
+        cache.store(segment)
+    cache.store(segments[-1])  # storing the same segment twice has no effect
+    assert_equal(len(cache), 5)
+    assert_equal(len(cache._in_memory), 2)
+    assert_equal(len(cache._on_disk), 3)
+    assert_equal([segment.name for segment in cache],
+                 ["segment%d" % i for i in range(5)])
+    assert_equal(len(cache._in_memory), 2)
+    filenames = list(cache._on_disk.values())
+    cache.clear()
+    assert_equal(len(cache), 0)
+    assert not any(os.path.exists(filename) for filename in filenames)
+
+
+def test_DataCache_without_limit():
+    import neo
+    assert_equal(recording.DataCache().max_in_memory, recording.DataCache.max_in_memory)
+    cache = recording.DataCache(max_in_memory=None)
+    for i in range(recording.DataCache.max_in_memory + 5):
+        cache.store(neo.Segment(name="segment%d" % i))
+    assert_equal(len(cache._in_memory), len(cache))
+    assert_equal(cache._on_disk, {})
+
+
+def test_record_sets_cache_size():
+    import pyNN.mock as sim
+    sim.setup()
+    p = sim.Population(3, sim.IF_cond_exp())
+    p.record('v', max_in_memory=None)
+    assert_equal(p.recorder.cache.max_in_memory, None)
+    p.record('spikes')
+    assert_equal(p.recorder.cache.max_in_memory, None)
+    p.record('spikes', max_in_memory=3)
+    assert_equal(p.recorder.cache.max_in_memory, 3)
+    sim.end()
@@ -10,7 +10,12 @@ try:
     import unittest2 as unittest
 except ImportError:
     import unittest
+try:
+    from unittest.mock import Mock
+except ImportError:
+    from mock import Mock
 import pyNN.mock as sim    
+from pyNN.common import PeriodicCallback
 
 try:
     from mpi4py import MPI
@@ -131,6 +136,128 @@ class TestSimulationControl(unittest.TestCase):
         
         sim.end()
     
+    @register(exclude=['hardware.brainscales'])
+    def test_periodic_callbacks(self, sim=sim):
+        times = []
+        callback = PeriodicCallback(times.append, 10.0, start=5.0)
+        sim.setup(timestep=0.1, min_delay=0.1, **self.extra)
+        sim.run_until(100.0, callbacks=[callback])
+        self.assertEqual(times, [5.0 + 10*i for i in range(10)])
+        sim.end()
+
+    def test_periodic_callbacks_across_runs(self, sim=sim):
+        # a callback keeps its phase when the simulation is run in several steps
+        times = []
+        monitor_times = []
+        callback = PeriodicCallback(times.append, 10.0, start=5.0)
+        monitor = PeriodicCallback(monitor_times.append, 10.0, start=5.0, coalesce=True)
+        sim.setup(timestep=0.1, min_delay=0.1, **self.extra)
+        sim.run_until(50.0, callbacks=[callback, monitor])
+        sim.run_until(100.0, callbacks=[callback, monitor])
+        self.assertEqual(times, [5.0 + 10*i for i in range(10)])
+        self.assertEqual(monitor_times, [5.0 + 10*i for i in range(10)])
+        sim.end()
+
+    def test_coalesced_callbacks(self, sim=sim):
+        # coalesced callbacks are called for every interval, but only stop the
+        # simulation when another callback does
+        sim.setup(timestep=0.1, min_delay=0.1, **self.extra)
+        stops = []
+        def run_until(tstop):
+            stops.append(tstop)
+            sim.simulator.state.t = tstop
+        sim.simulator.state.run_until = run_until
+        try:
+            monitor_times = []
+            monitor = PeriodicCallback(monitor_times.append, 5.0, coalesce=True)
+            sim.run_until(50.0, callbacks=[monitor, PeriodicCallback(lambda t: None, 20.0)])
+        finally:
+            del sim.simulator.state.run_until
+        self.assertEqual(stops, [20.0, 40.0, 50.0])
+        self.assertEqual(monitor_times, [5.0*i for i in range(11)])
+        sim.end()
+
+    def test_callback_statistics(self, sim=sim):
+        def monitor(t):
+            return t + 10.0
+        sim.setup(timestep=0.1, min_delay=0.1, **self.extra)
+        sim.simulator.state.callback_statistics.clear()
+        sim.run_until(100.0, callbacks=[monitor])
+        self.assertEqual(sim.simulator.state.callback_statistics["monitor"].count, 11)
+        sim.end()
+
+    def test_run_async(self, sim=sim):
+        sim.setup(timestep=0.1, min_delay=0.1, **self.extra)
+        p = sim.Population(3, sim.IF_cond_exp(), label="p")
+        p.record('spikes')
+        recorder = p.recorder
+        def flush():  # stands in for moving the data to the streaming store
+            recorder._flushed_segments.append(sim.get_current_time())
+            recorder._recording_start_time = sim.get_current_time()
+        recorder.flush = flush
+        handle = sim.run_async(35.0, chunk=10.0)
+        chunks = list(handle)
+        self.assertEqual([(chunk.t_start, chunk.t_stop) for chunk in chunks],
+                         [(0.0, 10.0), (10.0, 20.0), (20.0, 30.0), (30.0, 35.0)])
+        # each chunk's data are flushed exactly once
+        self.assertEqual([chunk.segments[p] for chunk in chunks],
+                         [[10.0], [20.0], [30.0], [35.0]])
+        self.assertEqual(recorder._flushed_segments, None)
+        self.assertEqual(handle.wait(), 35.0)
+        self.assertTrue(handle.done())
+        self.assertEqual(sim.get_current_time(), 35.0)
+        sim.end()
+
+    def test_run_async_restores_streaming_mode(self, sim=sim):
+        sim.setup(timestep=0.1, min_delay=0.1, **self.extra)
+        p = sim.Population(3, sim.IF_cond_exp(), label="p")
+        q = sim.Population(3, sim.IF_cond_exp(), label="q")
+        p.record('spikes')
+        q.record('spikes', stream_interval=5.0)
+        for population in (p, q):
+            population.recorder.flush = Mock()
+        sim.run_async(20.0, chunk=10.0).wait()
+        self.assertFalse(p.recorder.streaming)  # switched on by run_async() only
+        self.assertEqual(p.recorder._stream, None)
+        self.assertTrue(q.recorder.streaming)   # switched on by the user
+        self.assertEqual(q.recorder.stream_interval, 5.0)
+        p.recorder.flush.reset_mock()
+        sim.run(30.0)
+        self.assertEqual(p.recorder.flush.call_count, 0)
+        sim.end()
+
+    def test_run_async_keeps_callback_schedule(self, sim=sim):
+        times = []
+        def callback(t):
+            times.append(t)
+            return t + 100.0
+        sim.setup(timestep=0.1, min_delay=0.1, **self.extra)
+        handle = sim.run_async(50.0, chunk=10.0, callbacks=[callback])
+        self.assertEqual(handle.wait(), 50.0)
+        self.assertEqual(times, [0.0])
+        sim.end()
+
+    def test_run_async_populations_with_same_label(self, sim=sim):
+        sim.setup(timestep=0.1, min_delay=0.1, **self.extra)
+        p = sim.Population(3, sim.IF_cond_exp(), label="p")
+        q = sim.Population(3, sim.IF_cond_exp(), label="p")
+        for population in (p, q):
+            population.record('spikes')
+            population.recorder.flush = lambda: None
+        chunks = list(sim.run_async(20.0, chunk=10.0))
+        self.assertEqual([set(chunk.segments) for chunk in chunks], [set([p, q])] * 2)
+        sim.end()
+
+    def test_run_async_raises_worker_exception(self, sim=sim):
+        def failing_callback(t):
+            if t > 15.0:
+                raise ValueError("callback failed")
+            return t + 10.0
+        sim.setup(timestep=0.1, min_delay=0.1, **self.extra)
+        handle = sim.run_async(50.0, chunk=10.0, callbacks=[failing_callback])
+        self.assertRaises(ValueError, handle.wait)
+        sim.end()
+
     @unittest.skipUnless(MPI, "test requires mpi4py")
     def test_num_processes(self, sim=sim):
         self.assertEqual(sim.num_processes(), mpi_comm.size)
@@ -93,6 +93,13 @@ class SpaceTest(unittest.TestCase):
                                          (sqrt(3), sqrt(12), 0.0, sqrt(50.0)),
                                          (sqrt(29), sqrt(14), sqrt(50.0), 0.0)]))
 
+    def test_generator_with_paired_indices(self):
+        s = space.Space()
+        f = lambda i: self.ABCD[i]
+        g = lambda j: self.ABCD[j]
+        self.assertArraysEqual(s.distance_generator(f, g)(numpy.array([0, 1, 3]), numpy.array([1, 1, 2])),
+                               numpy.array([sqrt(3), 0.0, sqrt(50.0)]))
+
     def test_infinite_space_with_collapsed_axes(self):
         s_x = space.Space(axes='x')
         s_xy = space.Space(axes='xy')
@@ -126,6 +133,40 @@ class SpaceTest(unittest.TestCase):
         self.assertArraysEqual(s.distances(self.C, self.ABCD),
                                numpy.array([sqrt(3), sqrt(4+4+4), 0.0, sqrt(4+1+0)]))
 
+    def test_neighbours(self):
+        s = space.Space(scale_factor=2.0, offset=0.5)
+        i, j, d = s.neighbours(self.ABCD, self.ABCD, 3.5)
+        D = s.distances(self.ABCD, self.ABCD).reshape(4, 4)
+        jj, ii = numpy.nonzero(D.T <= 3.5)
+        self.assertArraysEqual(i, ii)
+        self.assertArraysEqual(j, jj)
+        assert_arrays_almost_equal(d, D[ii, jj], 1e-12)
+
+    def test_neighbours_in_cylindrical_space(self):
+        s = space.Space(axes='xy', periodic_boundaries=((-1.0, 4.0), (-1.0, 4.0), None))
+        i, j, d = s.neighbours(self.ABCD, self.ABCD[:1], 2.0)
+        self.assertArraysEqual(i, numpy.array([0, 1, 2]))
+        self.assertArraysEqual(j, numpy.array([0, 0, 0]))
+        assert_arrays_almost_equal(d, numpy.array([0.0, sqrt(2), sqrt(2)]), 1e-12)
+
+    def test_spatial_index_is_cached(self):
+        s = space.Space()
+        index = s.spatial_index(self.ABCD, 1.0)
+        self.assertIs(s.spatial_index(self.ABCD.copy(), 1.0), index)
+        self.assertIsNot(s.spatial_index(self.ABCD, 2.0), index)
+
+    def test_spatial_index_depends_on_topology(self):
+        s = space.Space()
+        index = s.spatial_index(self.ABCD, 1.0)
+        s.scale_factor = 2.0
+        self.assertIsNot(s.spatial_index(self.ABCD, 1.0), index)
+        index = s.spatial_index(self.ABCD, 1.0)
+        s.offset = numpy.array([1.0, 0.0, 0.0])
+        self.assertIsNot(s.spatial_index(self.ABCD, 1.0), index)
+        index = s.spatial_index(self.ABCD, 1.0)
+        s.periodic_boundaries = ((0, 10), None, None)
+        self.assertIsNot(s.spatial_index(self.ABCD, 1.0), index)
+
 
 class LineTest(unittest.TestCase):
 
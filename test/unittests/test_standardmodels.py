@@ -22,13 +22,17 @@ def test_build_translations():
         )
     assert_equal(set(t.keys()), set(['a', 'b', 'c']))
     assert_equal(set(t['a'].keys()),
-                 set(['translated_name', 'forward_transform', 'reverse_transform']))
+                 set(['translated_name', 'forward_transform', 'reverse_transform', 'scale_factor']))
     assert_equal(t['a']['translated_name'], 'A')
     assert_equal(t['a']['forward_transform'], 'a')
     assert_equal(t['a']['reverse_transform'], 'A')
+    assert_equal(t['a']['scale_factor'], 1)
     assert_equal(t['b']['translated_name'], 'B')
     assert_equal(t['b']['forward_transform'], 'float(1000)*b')
     assert_equal(t['b']['reverse_transform'], 'B/float(1000)')
+    assert_equal(t['b']['scale_factor'], 1000.0)
+    assert_equal(set(t['c'].keys()),
+                 set(['translated_name', 'forward_transform', 'reverse_transform']))
     assert_equal(t['c']['translated_name'], 'C')
     assert_equal(t['c']['forward_transform'], 'c + a')
     assert_equal(t['c']['reverse_transform'], 'C - A')
@@ -125,6 +129,31 @@ def test_reverse_translate_with_invalid_transformation():
                   M().reverse_translate,
                   {'A': 23.4, 'B': 34.5})
 
+def test_reverse_translate_selected_names():
+    M = StandardModelType
+    M.default_parameters = {'a': 22.2, 'b': 33.3, 'c': 44.4}
+    M.translations = build_translations(
+            ('a', 'A'),
+            ('b', 'B', 1000.0),
+            ('c', 'C', 'c + a', 'C - A'),
+        )
+    assert_equal(_parameter_space_to_dict(M().reverse_translate(ParameterSpace({'B': 34500.0}), names=['b']), 88),
+                 {'b': 34.5})
+    assert_equal(_parameter_space_to_dict(M().reverse_translate(ParameterSpace({'A': 23.4, 'C': 69.0}), names=['c']), 88),
+                 {'c': 45.6})
+
+def test_get_native_dependencies():
+    M = StandardModelType
+    M.default_parameters = {'a': 22.2, 'b': 33.3, 'c': 44.4}
+    M.translations = build_translations(
+            ('a', 'A'),
+            ('b', 'B', 1000.0),
+            ('c', 'C', 'c + a', 'C - A'),
+        )
+    assert_equal(M().get_native_dependencies('b'), ['B'])
+    assert_equal(sorted(M().get_native_dependencies('c')), ['A', 'C'])
+    assert_equal(sorted(M().get_native_dependencies('a', 'c')), ['A', 'C'])
+
 def test_simple_parameters():
     M = StandardModelType
     M.default_parameters = {'a': 22.2, 'b': 33.3, 'c': 44.4}